@@ -0,0 +1,58 @@
+"""
+Score history archiver.
+Run with: uv run python app/archive_scores.py [--older-than-days 90] [--dry-run]
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.database import Database
+
+
+def main():
+    """Roll old scores into daily summaries and delete the raw rows."""
+    parser = argparse.ArgumentParser(
+        description="Archive Snake Showdown scores into daily summaries"
+    )
+    parser.add_argument(
+        "--older-than-days",
+        type=int,
+        default=settings.score_archive_after_days,
+        help="Archive scores played more than this many days ago"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.score_archive_batch_size,
+        help="Score rows archived per transaction"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only report how many scores would be archived"
+    )
+
+    args = parser.parse_args()
+
+    cutoff = datetime.now(UTC) - timedelta(days=args.older_than_days)
+
+    with Database() as database:
+        if args.dry_run:
+            count = database.count_archivable_scores(cutoff)
+            print(f"🔎 {count} scores played before {cutoff:%Y-%m-%d %H:%M} UTC would be archived")
+            return
+
+        print(f"📦 Archiving scores played before {cutoff:%Y-%m-%d %H:%M} UTC...")
+        archived = database.archive_scores(cutoff, args.batch_size)
+        print(f"✅ Archived {archived} scores")
+
+    print("🎉 Done!")
+
+
+if __name__ == "__main__":
+    main()
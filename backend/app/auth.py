@@ -1,6 +1,9 @@
 """
 Authentication utilities for JWT token handling.
 """
+import hashlib
+import time
+import uuid
 from datetime import datetime, timedelta, UTC
 from typing import Optional
 from jose import JWTError, jwt
@@ -8,16 +11,21 @@ from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
+from app.cache import LRUCache
 from app.config import settings
-from app.database import get_db, Database
+from app.database import get_db, Database, user_cache
+from app.revocation import token_revocations
 
 # Security scheme
 security = HTTPBearer()
 
+# sha256 of a token -> its verified payload, kept until the token expires
+token_cache = LRUCache(settings.token_cache_size)
+
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
-    """Create JWT access token."""
-    to_encode = data.copy()
+    """Create JWT access token with a unique jti, so it can be revoked."""
+    to_encode = {"jti": uuid.uuid4().hex, **data}
     if expires_delta:
         expire = datetime.now(UTC) + expires_delta
     else:
@@ -29,10 +37,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 
 def decode_token(token: str) -> dict:
-    """Decode and validate JWT token."""
+    """
+    Decode and validate JWT token.
+    A token verified before is served from token_cache until it expires;
+    the payload returned is shared, so callers must not modify it.
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(digest)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -40,6 +56,12 @@ def decode_token(token: str) -> dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Tokens without an expiry are never cached
+    lifetime = payload.get("exp", 0) - time.time()
+    if lifetime > 0:
+        token_cache.set(digest, payload, lifetime)
+    return payload
+
 
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -56,6 +78,21 @@ def get_current_user(
             detail="Could not validate credentials",
         )
     
+    if token_revocations.is_revoked(payload.get("jti")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    if settings.auth_trust_token_claims and "username" in payload and "email" in payload:
+        # Signed by us at login, so as good as the database's copy
+        return {"id": user_id, "username": payload["username"], "email": payload["email"]}
+    
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+    
     database = Database(db)
     user = database.get_user_by_id(user_id)
     if user is None:
@@ -64,4 +101,7 @@ def get_current_user(
             detail="User not found",
         )
     
+    # Routes only need who the user is; keep password hashes out of memory
+    user = {"id": user["id"], "email": user["email"], "username": user["username"]}
+    user_cache.set(user_id, user)
     return user
@@ -0,0 +1,22 @@
+"""
+Background jobs run alongside the API process.
+"""
+import asyncio
+import logging
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(name: str, interval_seconds: float, job: Callable[[], object]):
+    """
+    Run a blocking job every interval_seconds until cancelled.
+    The job runs in a worker thread so it never blocks the event loop, and a
+    failed run is logged without stopping later runs.
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            await asyncio.to_thread(job)
+        except Exception:
+            logger.exception("Background job %s failed", name)
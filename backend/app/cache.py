@@ -0,0 +1,105 @@
+"""
+In-process caching helpers.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Bounded least-recently-used cache with optional per-entry expiry.
+    Thread-safe, and counts hits and misses for metrics.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: Optional[float] = None):
+        """
+        Initialize cache.
+
+        Args:
+            max_size: Maximum number of entries kept
+            ttl_seconds: Default lifetime of an entry, or None to never expire
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[Any, Optional[float]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a value, or default if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a value, evicting the least recently used entry when full."""
+        ttl = ttl_seconds if ttl_seconds is not None else self.ttl_seconds
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """Remove and return a value."""
+        with self._lock:
+            entry = self._entries.pop(key, _MISSING)
+            return default if entry is _MISSING else entry[0]
+
+    def clear(self):
+        """Remove all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        """Size and hit-rate counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class VersionCounter:
+    """
+    Monotonic version per key. Writers bump a key when the data behind it
+    changes; cached values remember the version they were computed at.
+    """
+
+    def __init__(self):
+        self._versions: dict[Hashable, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> int:
+        """Current version for a key."""
+        return self._versions.get(key, 0)
+
+    def bump(self, key: Hashable) -> int:
+        """Advance the version for a key and return the new value."""
+        with self._lock:
+            version = self._versions.get(key, 0) + 1
+            self._versions[key] = version
+            return version
@@ -4,18 +4,60 @@ Provides same interface as the previous MockDatabase for compatibility with serv
 """
 
 from datetime import datetime, timedelta, UTC
+from pathlib import Path
 from typing import Optional, Generator
+import logging
 import uuid
-import bcrypt
 
-from sqlalchemy import create_engine, select, func
+from alembic import command
+from alembic.config import Config
+
+from sqlalchemy import (
+    create_engine,
+    select,
+    func,
+    insert,
+    delete,
+    and_,
+    or_,
+    literal,
+    cast,
+    case,
+    update,
+    union_all,
+    text,
+    DateTime,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
 
+from app.cache import LRUCache, VersionCounter
 from app.config import settings
-from app.db_models import Base, User, Player, Score
-from app.models import GameMode
-
+from app.db_models import (
+    Base,
+    User,
+    Player,
+    Score,
+    PlayerModeBest,
+    PlayerWindowBest,
+    ScoreDailyRollup,
+    RevokedToken,
+)
+from app.event_log import (
+    EVENT_ARCHIVED_DAY,
+    EVENT_SCORE,
+    ScoreEvent,
+    mark_gaps,
+    score_event_log,
+)
+from app.leaderboard_index import NOT_ON_BOARD, leaderboard_index
+from app.passwords import check_password, hash_password
+from app.rank_histogram import rank_histograms
+from app.models import GameMode, LeaderboardWindow
+
+logger = logging.getLogger(__name__)
 
 # Create engine with appropriate configuration
 if settings.database_url.startswith("sqlite"):
@@ -38,6 +80,25 @@ else:
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Scores ranked per query by Database.get_ranks
+RANK_BATCH_SIZE = 100
+
+# Rows merged or matched per statement by Database.archive_scores and
+# Database.load_projections
+ROLLUP_BATCH_SIZE = 1000
+
+# Version per leaderboard, bumped whenever a best score on it changes.
+# All-time boards are keyed by mode (None for all modes), windowed boards by
+# (window, mode).
+leaderboard_versions = VersionCounter()
+
+# (mode, score) -> (version, rank) for ranks computed in SQL
+rank_cache = LRUCache(settings.rank_cache_size, settings.rank_cache_ttl_seconds)
+
+# user_id -> user record (no password hash) for authenticated requests;
+# entries are dropped whenever the user changes
+user_cache = LRUCache(settings.user_cache_size, settings.user_cache_ttl_seconds)
+
 
 def get_db() -> Generator[Session, None, None]:
     """
@@ -51,14 +112,81 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def alembic_config() -> Config:
+    """Alembic configuration for the backend, independent of the working directory."""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    return config
+
+
+def migrate_db(bind=None, revision: str = "head"):
+    """Apply schema migrations up to revision in a single transaction."""
+    config = alembic_config()
+    with (bind or engine).begin() as connection:
+        config.attributes["connection"] = connection
+        command.upgrade(config, revision)
+
+
 def init_db():
     """Initialize database tables."""
-    Base.metadata.create_all(bind=engine)
+    migrate_db()
+
+    # Backfill best scores for databases created before the table existed
+    with Database() as database:
+        has_bests = database.session.execute(
+            select(PlayerModeBest.user_id).limit(1)
+        ).first()
+        if not has_bests:
+            database.rebuild_player_mode_bests()
+
+        has_window_bests = database.session.execute(
+            select(PlayerWindowBest.user_id).limit(1)
+        ).first()
+        if not has_window_bests:
+            database.rebuild_window_bests()
 
 
 def drop_db():
     """Drop all database tables (use with caution!)."""
     Base.metadata.drop_all(bind=engine)
+    # Forget the applied migrations so init_db recreates the schema
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE IF EXISTS alembic_version"))
+
+
+def _naive_utc(at: datetime) -> datetime:
+    """Convert to naive UTC, the form datetimes are stored in."""
+    if at.tzinfo:
+        return at.astimezone(UTC).replace(tzinfo=None)
+    return at
+
+
+def window_start(window: LeaderboardWindow, at: datetime) -> datetime:
+    """Start (naive UTC) of the day/week/month bucket containing at."""
+    at = _naive_utc(at)
+    day = at.replace(hour=0, minute=0, second=0, microsecond=0)
+    if window == LeaderboardWindow.DAY:
+        return day
+    if window == LeaderboardWindow.WEEK:
+        return day - timedelta(days=day.weekday())
+    return day.replace(day=1)
+
+
+def leaderboard_version(
+    mode: Optional[GameMode], window: Optional[LeaderboardWindow] = None
+) -> int:
+    """Current version of a leaderboard."""
+    return leaderboard_versions.get((window, mode) if window else mode)
+
+
+def upsert_statement(session: Session, model):
+    """INSERT statement supporting ON CONFLICT for the session's dialect."""
+    if session.get_bind().dialect.name == "postgresql":
+        return postgresql.insert(model)
+    return sqlite.insert(model)
 
 
 class Database:
@@ -131,27 +259,45 @@ class Database:
             "password_hash": user.password_hash,
         }
 
-    def create_user(self, email: str, username: str, password: str) -> dict:
-        """Create a new user."""
+    def check_user_available(self, email: str, username: str):
+        """
+        Check that neither the email nor the username is taken.
+
+        Raises:
+            ValueError: If email or username already exists
+        """
         # Check if email already exists
         existing_email = self.session.execute(
-            select(User).where(User.email == email)
-        ).scalar_one_or_none()
+            select(User.id).where(User.email == email)
+        ).first()
 
         if existing_email:
             raise ValueError("Email already exists")
 
         # Check if username already exists
         existing_username = self.session.execute(
-            select(User).where(User.username == username)
-        ).scalar_one_or_none()
+            select(User.id).where(User.username == username)
+        ).first()
 
         if existing_username:
             raise ValueError("Username already exists")
 
-        # Hash password
-        password_bytes = password.encode("utf-8")
-        hashed = bcrypt.hashpw(password_bytes, bcrypt.gensalt())
+    def create_user(
+        self,
+        email: str,
+        username: str,
+        password: str,
+        password_hash: Optional[str] = None,
+    ) -> dict:
+        """
+        Create a new user.
+        Pass password_hash when the password was already hashed elsewhere
+        (see app.passwords.password_executor); password is then not used.
+        """
+        self.check_user_available(email, username)
+
+        if password_hash is None:
+            password_hash = hash_password(password)
 
         # Create user
         user_id = str(uuid.uuid4())
@@ -159,7 +305,7 @@ class Database:
             id=user_id,
             email=email,
             username=username,
-            password_hash=hashed.decode("utf-8"),
+            password_hash=password_hash,
         )
         self.session.add(user)
 
@@ -180,9 +326,51 @@ class Database:
 
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify password against hash."""
-        password_bytes = plain_password.encode("utf-8")
-        hashed_bytes = hashed_password.encode("utf-8")
-        return bcrypt.checkpw(password_bytes, hashed_bytes)
+        return check_password(plain_password, hashed_password)
+
+    def update_password_hash(self, user_id: str, password_hash: str):
+        """Replace a user's stored password hash (e.g. rehashed at a new cost)."""
+        self.session.execute(
+            update(User).where(User.id == user_id).values(password_hash=password_hash)
+        )
+        self.session.commit()
+        user_cache.pop(user_id)
+
+    # Token revocation operations
+    def revoke_token(self, jti: str, user_id: str, expires_at: datetime):
+        """Record a token as revoked until it expires; revoking twice is a no-op."""
+        stmt = upsert_statement(self.session, RevokedToken).values(
+            jti=jti,
+            user_id=user_id,
+            expires_at=_naive_utc(expires_at),
+            revoked_at=_naive_utc(datetime.now(UTC)),
+        )
+        self.session.execute(stmt.on_conflict_do_nothing(index_elements=["jti"]))
+        self.session.commit()
+
+    def get_revoked_tokens(self, since: Optional[datetime] = None) -> list[dict]:
+        """
+        Revoked tokens that have not expired yet, optionally only those
+        revoked at or after since.
+        """
+        stmt = select(
+            RevokedToken.jti, RevokedToken.expires_at, RevokedToken.revoked_at
+        ).where(RevokedToken.expires_at > _naive_utc(datetime.now(UTC)))
+        if since is not None:
+            stmt = stmt.where(RevokedToken.revoked_at >= _naive_utc(since))
+        return [
+            {"jti": row.jti, "expires_at": row.expires_at, "revoked_at": row.revoked_at}
+            for row in self.session.execute(stmt)
+        ]
+
+    def purge_expired_revoked_tokens(self, now: Optional[datetime] = None) -> int:
+        """Delete revocations of tokens that have expired anyway."""
+        now = now or datetime.now(UTC)
+        result = self.session.execute(
+            delete(RevokedToken).where(RevokedToken.expires_at <= _naive_utc(now))
+        )
+        self.session.commit()
+        return result.rowcount
 
     # Player operations
     def get_player(self, user_id: str) -> Optional[dict]:
@@ -203,98 +391,1158 @@ class Database:
         }
 
     # Score operations
-    def add_score(self, user_id: str, score: int, mode: GameMode) -> dict:
-        """Add a score for a user."""
-        player = self.session.execute(
-            select(Player).where(Player.id == user_id)
-        ).scalar_one_or_none()
+    def add_score(
+        self,
+        user_id: str,
+        score: int,
+        mode: GameMode,
+        request_key: Optional[str] = None,
+        played_at: Optional[datetime] = None,
+        defer_rank: bool = False,
+    ) -> dict:
+        """
+        Add a score for a user.
 
-        if not player:
-            raise ValueError("Player not found")
+        A request_key (the client's Idempotency-Key) the player has already
+        submitted with returns the earlier score's result and writes nothing.
+        played_at defaults to now; the score journal passes the time the
+        score was submitted. With defer_rank, exact ranks are not counted:
+        the result has rank_pending set instead (see app.rank_worker).
+        """
+        try:
+            applied = self._apply_score(user_id, score, mode, request_key, played_at)
+            self._flush_score_ids([applied])
+            self.session.commit()
+        except IntegrityError:
+            # Another session committed the same request key first
+            self.session.rollback()
+            applied = self._replayed_score(user_id, request_key) if request_key else None
+            if applied is None:
+                raise
+        self._publish_score(applied)
+        self._log_scores([applied])
+        return self._score_results([applied], defer_rank)[0]
+
+    def add_scores(self, submissions: list[tuple], defer_rank: bool = False) -> list:
+        """
+        Add many scores in a single transaction (group commit).
+
+        Args:
+            submissions: (user_id, score, mode) tuples, optionally followed
+                by add_score's request_key and played_at, applied in order
+            defer_rank: Leave exact ranks pending, as in add_score
+
+        Returns:
+            One item per submission: the dict add_score would have returned,
+            or the ValueError that rejected it (unknown player)
+        """
+        outcomes = []
+        try:
+            for user_id, score, mode, *options in submissions:
+                try:
+                    outcomes.append(self._apply_score(user_id, score, mode, *options))
+                except ValueError as e:
+                    outcomes.append(e)
+
+            applied = [outcome for outcome in outcomes if isinstance(outcome, dict)]
+            self._flush_score_ids(applied)
+            self.session.commit()
+        except IntegrityError:
+            # A request key in the batch was committed concurrently: fall back
+            # to one transaction per score so only that one is replayed
+            self.session.rollback()
+            return [
+                self._add_score_or_error(*submission, defer_rank=defer_rank)
+                for submission in submissions
+            ]
+
+        for item in applied:
+            self._publish_score(item)
+        self._log_scores(applied)
+        results = iter(self._score_results(applied, defer_rank))
+
+        return [
+            next(results) if isinstance(outcome, dict) else outcome
+            for outcome in outcomes
+        ]
 
-        # Update player stats
-        player.games_played += 1
-        is_new_high_score = score > player.high_score
-        if is_new_high_score:
-            player.high_score = score
+    def _add_score_or_error(self, *submission, defer_rank: bool = False):
+        try:
+            return self.add_score(*submission, defer_rank=defer_rank)
+        except ValueError as e:
+            return e
+
+    def _apply_score(
+        self,
+        user_id: str,
+        score: int,
+        mode: GameMode,
+        request_key: Optional[str] = None,
+        played_at: Optional[datetime] = None,
+    ) -> dict:
+        """
+        Write a score and the stats derived from it (caller commits).
+        Returns what _publish_score and _score_results need afterwards.
+        """
+        if request_key is not None:
+            replayed = self._replayed_score(user_id, request_key)
+            if replayed:
+                return replayed
+
+        username, is_new_high_score = self._record_player_game(user_id, score)
+        previous_best = self._previous_best(user_id, mode)
 
         # Add score record
+        played_at = played_at or datetime.now(UTC)
         score_record = Score(
-            user_id=user_id, username=player.username, score=score, mode=mode
+            user_id=user_id,
+            score=score,
+            mode=mode,
+            created_at=played_at,
+            request_key=request_key,
         )
         self.session.add(score_record)
 
+        return {
+            "replayed": False,
+            "record": score_record,
+            "user_id": user_id,
+            "username": username,
+            "score": score,
+            "mode": mode,
+            "played_at": played_at,
+            "is_new_high_score": is_new_high_score,
+            "previous_best": previous_best,
+            "mode_best_changed": self._record_mode_best(
+                user_id, username, score, mode, played_at
+            ),
+            "windows_changed": self._record_window_bests(
+                user_id, username, score, mode, played_at
+            ),
+        }
+
+    def add_score_batch(
+        self, user_id: str, submissions: list[tuple[int, GameMode]]
+    ) -> list[dict]:
+        """
+        Add many scores for one player in a single transaction.
+        Score rows go in with one bulk INSERT, and the player's stats and
+        best scores are updated once per mode rather than once per score.
+
+        Args:
+            user_id: User ID
+            submissions: (score, mode) tuples in the order they were played
+
+        Returns:
+            One dict per submission, as add_score returns; ranks are
+            computed after the whole batch is committed
+
+        Raises:
+            ValueError: If player not found
+        """
+        # Lock the player row so the flags below see the high score the
+        # update is applied to
+        player = self.session.execute(
+            select(Player.username, Player.high_score)
+            .where(Player.id == user_id)
+            .with_for_update()
+        ).first()
+
+        if not player:
+            raise ValueError("Player not found")
+
+        # Flag high scores as if the games had been submitted one by one
+        flags = []
+        running_best = player.high_score
+        for score, _ in submissions:
+            flags.append(score > running_best)
+            running_best = max(running_best, score)
+
+        batch_best = max(score for score, _ in submissions)
+        self.session.execute(
+            update(Player)
+            .where(Player.id == user_id)
+            .values(
+                games_played=Player.games_played + len(submissions),
+                high_score=case(
+                    (Player.high_score < batch_best, batch_best),
+                    else_=Player.high_score,
+                ),
+            )
+        )
+
+        played_at = datetime.now(UTC)
+        username = player.username
+        score_ids = self.session.scalars(
+            insert(Score).returning(Score.id, sort_by_parameter_order=True),
+            [
+                {
+                    "user_id": user_id,
+                    "score": score,
+                    "mode": mode,
+                    "created_at": played_at,
+                }
+                for score, mode in submissions
+            ],
+        ).all()
+
+        mode_bests: dict[GameMode, int] = {}
+        for score, mode in submissions:
+            mode_bests[mode] = max(score, mode_bests.get(mode, score))
+
+        applied = [
+            {
+                "replayed": False,
+                "user_id": user_id,
+                "username": username,
+                "score": best,
+                "mode": mode,
+                "played_at": played_at,
+                "previous_best": self._previous_best(user_id, mode),
+                "mode_best_changed": self._record_mode_best(
+                    user_id, username, best, mode, played_at
+                ),
+                "windows_changed": self._record_window_bests(
+                    user_id, username, best, mode, played_at
+                ),
+            }
+            for mode, best in mode_bests.items()
+        ]
+
         self.session.commit()
 
-        # Calculate rank
-        rank = self.get_rank(score, mode)
+        for item in applied:
+            self._publish_score(item)
+        scores = [
+            {
+                "score_id": score_id,
+                "user_id": user_id,
+                "username": username,
+                "score": score,
+                "mode": mode,
+                "played_at": played_at,
+                "is_new_high_score": flag,
+            }
+            for score_id, (score, mode), flag in zip(score_ids, submissions, flags)
+        ]
+        self._log_scores(scores)
+
+        return self._score_results(scores)
+
+    def _record_player_game(self, user_id: str, score: int) -> tuple[str, bool]:
+        """
+        Count a game in the player's stats with atomic UPDATE ... RETURNING
+        statements, so concurrent submissions never lose an update.
+
+        Returns:
+            Tuple of (username, whether the score is a new high score)
+
+        Raises:
+            ValueError: If player not found
+        """
+        # Most games are not a new high score, so try that update first
+        # (one round trip). A high score only ever rises, so if the second
+        # update misses too, a concurrent game just raised it past this
+        # score and the first update is now certain to match.
+        for new_high_score in (False, True, False):
+            stmt = update(Player).where(Player.id == user_id)
+            if new_high_score:
+                stmt = stmt.where(Player.high_score < score).values(
+                    games_played=Player.games_played + 1, high_score=score
+                )
+            else:
+                stmt = stmt.where(Player.high_score >= score).values(
+                    games_played=Player.games_played + 1
+                )
+            username = self.session.execute(
+                stmt.returning(Player.username)
+            ).scalar_one_or_none()
+            if username is not None:
+                return username, new_high_score
+
+        raise ValueError("Player not found")
+
+    def _previous_best(self, user_id: str, mode: GameMode) -> Optional[int]:
+        """
+        Player's current best in a mode, read only while the histograms are
+        warm since they move players between buckets and need the old best.
+        """
+        if not rank_histograms.is_warm:
+            return None
+        return self.session.execute(
+            select(PlayerModeBest.best_score).where(
+                PlayerModeBest.user_id == user_id, PlayerModeBest.mode == mode
+            )
+        ).scalar_one_or_none()
+
+    def _replayed_score(self, user_id: str, request_key: str) -> Optional[dict]:
+        """
+        The score a player already submitted with a request key, shaped like
+        _apply_score's result, or None. Its high score flag is worked out
+        again from the games the player had played before it.
+        """
+        original = self.session.execute(
+            select(Score.id, Score.score, Score.mode, Score.created_at).where(
+                Score.user_id == user_id, Score.request_key == request_key
+            )
+        ).first()
+
+        if not original:
+            return None
+
+        history = self._score_history()
+        earlier_best = self.session.execute(
+            select(func.max(history.c.score)).where(
+                history.c.user_id == user_id,
+                history.c.created_at < original.created_at,
+            )
+        ).scalar_one()
 
         return {
-            "is_new_high_score": is_new_high_score,
-            "rank": rank,
+            "replayed": True,
+            "score_id": original.id,
+            "user_id": user_id,
+            "score": original.score,
+            "mode": original.mode,
+            "played_at": original.created_at,
+            "is_new_high_score": original.score > (earlier_best or 0),
         }
 
+    def _publish_score(self, applied: dict):
+        """Update in-process leaderboard state after a score is committed."""
+        if applied["replayed"]:
+            return
+        mode = applied["mode"]
+        if applied["mode_best_changed"]:
+            leaderboard_versions.bump(mode)
+            leaderboard_versions.bump(None)
+            rank_histograms.record_best(
+                mode, applied["previous_best"], applied["score"]
+            )
+        for window in applied["windows_changed"]:
+            leaderboard_versions.bump((window, mode))
+            leaderboard_versions.bump((window, None))
+        leaderboard_index.record_score(
+            applied["user_id"],
+            applied["username"],
+            applied["score"],
+            mode,
+            applied["played_at"],
+        )
+
+    def _log_scores(self, scores: list[dict]):
+        """
+        Append committed scores to the score event log, if it is open.
+        The scores are already stored, so a failed append is only logged,
+        and the log recorded as missing scores.
+        """
+        if not score_event_log.is_open:
+            return
+        events = [
+            ScoreEvent(
+                kind=EVENT_SCORE,
+                score_id=item["score_id"],
+                user_id=item["user_id"],
+                username=item["username"],
+                mode=item["mode"],
+                score=item["score"],
+                played_at=item["played_at"],
+            )
+            for item in scores
+            if not item.get("replayed")
+        ]
+        if not events:
+            return
+        try:
+            score_event_log.append(events)
+        except Exception:
+            logger.exception("Failed to log %d scores to the event log", len(events))
+            mark_gaps(score_event_log.directory)
+
+    def _flush_score_ids(self, applied: list[dict]):
+        """Insert pending score rows now so their ids can be returned."""
+        self.session.flush()
+        for item in applied:
+            record = item.pop("record", None)
+            if record is not None:
+                item["score_id"] = record.id
+
+    def _score_results(self, applied: list[dict], defer_rank: bool = False) -> list[dict]:
+        """
+        High score flags and ranks for committed scores, in order.
+        With defer_rank, exact ranks are left pending; approximate ones cost
+        no query and are still filled in.
+        """
+        results = []
+        exact = {}
+        for item in applied:
+            mode = item["mode"]
+            result = {
+                "score_id": item.get("score_id"),
+                "is_new_high_score": item["is_new_high_score"],
+                "rank": None,
+                "rank_is_approximate": False,
+                "rank_pending": False,
+                "percentile": None,
+            }
+
+            # Approximate ranks for very large boards
+            if (
+                settings.rank_approx_enabled
+                and rank_histograms.player_count(mode) >= settings.rank_approx_min_players
+            ):
+                rank, percentile = rank_histograms.get_rank(item["score"], mode)
+                result.update(
+                    rank=rank, rank_is_approximate=True, percentile=percentile
+                )
+            elif defer_rank:
+                result["rank_pending"] = True
+            else:
+                exact.setdefault(mode, []).append(item["score"])
+            results.append(result)
+
+        ranks = {mode: self.get_ranks(scores, mode) for mode, scores in exact.items()}
+        for item, result in zip(applied, results):
+            if not (result["rank_is_approximate"] or result["rank_pending"]):
+                result["rank"] = ranks[item["mode"]][item["score"]]
+
+        return results
+
+    def _upsert_best(
+        self,
+        model,
+        key: dict,
+        username: str,
+        score: int,
+        played_at: datetime,
+    ) -> bool:
+        """
+        Insert a best score row or raise it if this score beats it.
+        Returns whether the row was written.
+        """
+        stmt = upsert_statement(self.session, model).values(
+            **key,
+            username=username,
+            best_score=score,
+            best_score_at=played_at,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={
+                "username": stmt.excluded.username,
+                "best_score": stmt.excluded.best_score,
+                "best_score_at": stmt.excluded.best_score_at,
+            },
+            where=model.best_score < stmt.excluded.best_score,
+        ).returning(model.best_score)
+        return self.session.execute(stmt).first() is not None
+
+    def _record_mode_best(
+        self,
+        user_id: str,
+        username: str,
+        score: int,
+        mode: GameMode,
+        played_at: datetime,
+    ) -> bool:
+        """
+        Upsert the player's best score for a mode (caller commits).
+        Returns whether the best changed.
+        """
+        return self._upsert_best(
+            PlayerModeBest,
+            {"user_id": user_id, "mode": mode},
+            username,
+            score,
+            played_at,
+        )
+
+    def _record_window_bests(
+        self,
+        user_id: str,
+        username: str,
+        score: int,
+        mode: GameMode,
+        played_at: datetime,
+    ) -> list[LeaderboardWindow]:
+        """
+        Upsert the player's best score for each current time window.
+        Returns the windows whose best changed.
+        """
+        changed = []
+        for window in LeaderboardWindow:
+            if self._upsert_best(
+                PlayerWindowBest,
+                {
+                    "period": window,
+                    "bucket_start": window_start(window, played_at),
+                    "mode": mode,
+                    "user_id": user_id,
+                },
+                username,
+                score,
+                played_at,
+            ):
+                changed.append(window)
+        return changed
+
+    @staticmethod
+    def _score_history():
+        """
+        Every game that can set a best score, as (user_id, mode, username,
+        score, created_at): raw score rows plus the best game of each
+        archived day, which is all best score rebuilds need from archives.
+        """
+        return union_all(
+            select(
+                Score.user_id,
+                Score.mode,
+                Player.username,
+                Score.score,
+                Score.created_at,
+            ).join(Player, Player.id == Score.user_id),
+            select(
+                ScoreDailyRollup.user_id,
+                ScoreDailyRollup.mode,
+                ScoreDailyRollup.username,
+                ScoreDailyRollup.best_score,
+                ScoreDailyRollup.best_score_at,
+            ),
+        ).subquery()
+
+    def rebuild_player_mode_bests(self):
+        """Recompute the best score table from the full score history."""
+        history = self._score_history()
+        ranked = select(
+            history.c.user_id,
+            history.c.mode,
+            history.c.username,
+            history.c.score,
+            history.c.created_at,
+            func.row_number()
+            .over(
+                partition_by=(history.c.user_id, history.c.mode),
+                order_by=(history.c.score.desc(), history.c.created_at),
+            )
+            .label("position"),
+        ).subquery()
+
+        self.session.execute(delete(PlayerModeBest))
+        self.session.execute(
+            insert(PlayerModeBest).from_select(
+                ["user_id", "mode", "username", "best_score", "best_score_at"],
+                select(
+                    ranked.c.user_id,
+                    ranked.c.mode,
+                    ranked.c.username,
+                    ranked.c.score,
+                    ranked.c.created_at,
+                ).where(ranked.c.position == 1),
+            )
+        )
+        self.session.commit()
+
     def get_rank(self, score: int, mode: GameMode) -> int:
         """Calculate rank for a score."""
-        # Count scores higher than this one in the same mode
-        # Group by user, take max score per user
-        subquery = (
-            select(Score.user_id, func.max(Score.score).label("max_score"))
-            .where(Score.mode == mode)
-            .group_by(Score.user_id)
-            .subquery()
+        return self.get_ranks([score], mode)[score]
+
+    def get_score_rank(self, user_id: str, score_id: int) -> Optional[dict]:
+        """
+        Current rank of one of a player's scores in its mode.
+
+        Returns:
+            Dict with score_id, score, mode and rank, or None if the score
+            does not exist or belongs to another player
+        """
+        row = self.session.execute(
+            select(Score.score, Score.mode).where(
+                Score.id == score_id, Score.user_id == user_id
+            )
+        ).first()
+
+        if not row:
+            return None
+
+        return {
+            "score_id": score_id,
+            "score": row.score,
+            "mode": row.mode,
+            "rank": self.get_ranks([row.score], row.mode)[row.score],
+        }
+
+    def get_ranks(self, scores: list[int], mode: GameMode) -> dict[int, int]:
+        """
+        Calculate ranks for many scores in one pass.
+
+        Args:
+            scores: Score values to rank
+            mode: Game mode
+
+        Returns:
+            Mapping of score to rank
+        """
+        indexed = leaderboard_index.get_ranks(scores, mode)
+        if indexed is not None:
+            return indexed
+
+        # Index is cold: serve what we can from the rank cache
+        ranks = {}
+        version = leaderboard_versions.get(mode)
+        missing = []
+        for score in set(scores):
+            cached = rank_cache.get((mode, score))
+            if cached is not None and cached[0] == version:
+                ranks[score] = cached[1]
+            else:
+                missing.append(score)
+
+        # Count players whose best score in this mode beats each score,
+        # one scalar subquery per score in a single round trip
+        for start in range(0, len(missing), RANK_BATCH_SIZE):
+            batch = missing[start : start + RANK_BATCH_SIZE]
+            counts = self.session.execute(
+                select(
+                    *[
+                        select(func.count())
+                        .select_from(PlayerModeBest)
+                        .where(
+                            PlayerModeBest.mode == mode,
+                            PlayerModeBest.best_score > score,
+                        )
+                        .scalar_subquery()
+                        for score in batch
+                    ]
+                )
+            ).one()
+            for score, higher_scores in zip(batch, counts):
+                ranks[score] = higher_scores + 1
+                rank_cache.set((mode, score), (version, higher_scores + 1))
+
+        return ranks
+
+    def rebuild_window_bests(self, now: Optional[datetime] = None):
+        """
+        Recompute the current day/week/month buckets from the score history.
+        Only used to backfill; add_score maintains the buckets afterwards.
+        """
+        now = now or datetime.now(UTC)
+        period_type = PlayerWindowBest.period.type
+        self.session.execute(delete(PlayerWindowBest))
+
+        for window in LeaderboardWindow:
+            bucket_start = window_start(window, now)
+            history = self._score_history()
+            ranked = (
+                select(
+                    history.c.user_id,
+                    history.c.mode,
+                    history.c.username,
+                    history.c.score,
+                    history.c.created_at,
+                    func.row_number()
+                    .over(
+                        partition_by=(history.c.user_id, history.c.mode),
+                        order_by=(history.c.score.desc(), history.c.created_at),
+                    )
+                    .label("position"),
+                )
+                .where(history.c.created_at >= bucket_start)
+                .subquery()
+            )
+            self.session.execute(
+                insert(PlayerWindowBest).from_select(
+                    [
+                        "period",
+                        "bucket_start",
+                        "user_id",
+                        "mode",
+                        "username",
+                        "best_score",
+                        "best_score_at",
+                    ],
+                    select(
+                        cast(literal(window, period_type), period_type),
+                        literal(bucket_start, DateTime),
+                        ranked.c.user_id,
+                        ranked.c.mode,
+                        ranked.c.username,
+                        ranked.c.score,
+                        ranked.c.created_at,
+                    ).where(ranked.c.position == 1),
+                )
+            )
+
+        self.session.commit()
+
+    def latest_score_id(self) -> Optional[int]:
+        """Id of the newest stored score, if any."""
+        return self.session.execute(select(func.max(Score.id))).scalar()
+
+    def has_score_history(self) -> bool:
+        """Whether any scores or archived score summaries are stored."""
+        return any(
+            self.session.execute(select(model).limit(1)).first() is not None
+            for model in (Score.id, ScoreDailyRollup.user_id)
         )
 
-        higher_scores = self.session.execute(
+    def iter_score_events(self, batch_size: int = 5000) -> Generator[ScoreEvent, None, None]:
+        """
+        The stored score history as event log events, oldest first within
+        each source: a summary event per archived day, then every score row.
+        Used to bootstrap the event log from an existing database.
+        """
+        rollups = self.session.execute(
+            select(ScoreDailyRollup).order_by(ScoreDailyRollup.day)
+        ).yield_per(batch_size)
+        for rollup in rollups.scalars():
+            yield ScoreEvent(
+                kind=EVENT_ARCHIVED_DAY,
+                score_id=0,
+                user_id=rollup.user_id,
+                username=rollup.username,
+                mode=rollup.mode,
+                score=rollup.best_score,
+                played_at=rollup.best_score_at,
+                games=rollup.games,
+            )
+
+        scores = self.session.execute(
+            select(
+                Score.id,
+                Score.user_id,
+                Player.username,
+                Score.mode,
+                Score.score,
+                Score.created_at,
+            )
+            .join(Player, Player.id == Score.user_id)
+            .order_by(Score.id)
+        ).yield_per(batch_size)
+        for row in scores:
+            yield ScoreEvent(
+                kind=EVENT_SCORE,
+                score_id=row.id,
+                user_id=row.user_id,
+                username=row.username,
+                mode=row.mode,
+                score=row.score,
+                played_at=row.created_at,
+            )
+
+    def load_projections(
+        self,
+        players: list[dict],
+        mode_bests: list[dict],
+        window_bests: list[dict],
+    ):
+        """
+        Replace derived tables with rows rebuilt from the score event log
+        (app.projections), in one transaction. Only players with events in
+        the log are rewritten: players with none (scores seeded directly, or
+        whose appends failed) keep their stats and best scores. Rows for
+        players unknown to this database are skipped.
+        """
+        known = set(self.session.scalars(select(Player.id)))
+        players = [row for row in players if row["id"] in known]
+        mode_bests = [row for row in mode_bests if row["user_id"] in known]
+        window_bests = [row for row in window_bests if row["user_id"] in known]
+        replayed = [row["id"] for row in players]
+
+        if players:
+            # ORM bulk UPDATE by primary key
+            self.session.execute(update(Player), players)
+        for start in range(0, len(replayed), ROLLUP_BATCH_SIZE):
+            batch = replayed[start : start + ROLLUP_BATCH_SIZE]
+            self.session.execute(
+                delete(PlayerModeBest).where(PlayerModeBest.user_id.in_(batch))
+            )
+            self.session.execute(
+                delete(PlayerWindowBest).where(PlayerWindowBest.user_id.in_(batch))
+            )
+        if mode_bests:
+            self.session.execute(insert(PlayerModeBest), mode_bests)
+        if window_bests:
+            self.session.execute(insert(PlayerWindowBest), window_bests)
+        self.session.commit()
+
+    def purge_expired_window_bests(self, now: Optional[datetime] = None) -> int:
+        """Delete buckets older than each window's current bucket."""
+        now = now or datetime.now(UTC)
+        deleted = 0
+        for window in LeaderboardWindow:
+            result = self.session.execute(
+                delete(PlayerWindowBest).where(
+                    PlayerWindowBest.period == window,
+                    PlayerWindowBest.bucket_start < window_start(window, now),
+                )
+            )
+            deleted += result.rowcount
+        self.session.commit()
+        return deleted
+
+    def count_archivable_scores(self, before: datetime) -> int:
+        """Number of score rows archive_scores would roll up for a cutoff."""
+        return self.session.execute(
             select(func.count())
-            .select_from(subquery)
-            .where(subquery.c.max_score > score)
-        ).scalar()
+            .select_from(Score)
+            .where(Score.created_at < _naive_utc(before))
+        ).scalar_one()
 
-        return higher_scores + 1
+    def archive_scores(self, before: datetime, batch_size: int = 5000) -> int:
+        """
+        Roll scores played before a cutoff into daily summaries and delete them.
+        Each batch of at most batch_size rows is summarized and deleted in its
+        own transaction, so locks stay short and the job can stop anywhere.
+        Best score tables are left alone, and each summary keeps its day's
+        best game so bests can still be rebuilt exactly.
 
-    def get_leaderboard(
-        self, mode: Optional[GameMode] = None, limit: int = 10, offset: int = 0
-    ) -> tuple[list[dict], int]:
-        """Get leaderboard entries."""
-        # Build query for best score per user
-        query = select(
-            Score.user_id,
-            Score.username,
-            func.max(Score.score).label("max_score"),
-            func.max(Score.created_at).label("latest_date"),
+        Args:
+            before: Scores created before this time are archived
+            batch_size: Most score rows handled per transaction
+
+        Returns:
+            Number of score rows archived
+        """
+        before = _naive_utc(before)
+        archived = 0
+
+        while True:
+            rows = self.session.execute(
+                select(
+                    Score.id,
+                    Score.user_id,
+                    Player.username,
+                    Score.mode,
+                    Score.score,
+                    Score.created_at,
+                )
+                .join(Player, Player.id == Score.user_id)
+                .where(Score.created_at < before)
+                .order_by(Score.created_at)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return archived
+
+            # Rows come oldest first, so the first game to reach the best
+            # keeps it
+            rollups = {}
+            for row in rows:
+                day = window_start(LeaderboardWindow.DAY, row.created_at)
+                rollup = rollups.get((row.user_id, row.mode, day))
+                if rollup is None:
+                    rollups[(row.user_id, row.mode, day)] = {
+                        "user_id": row.user_id,
+                        "mode": row.mode,
+                        "day": day,
+                        "username": row.username,
+                        "games": 1,
+                        "total_score": row.score,
+                        "best_score": row.score,
+                        "best_score_at": row.created_at,
+                    }
+                    continue
+                rollup["games"] += 1
+                rollup["total_score"] += row.score
+                if row.score > rollup["best_score"]:
+                    rollup["best_score"] = row.score
+                    rollup["best_score_at"] = row.created_at
+
+            self._merge_rollups(list(rollups.values()))
+            self.session.execute(
+                delete(Score).where(Score.id.in_([row.id for row in rows]))
+            )
+            self.session.commit()
+            archived += len(rows)
+
+    def _merge_rollups(self, rollups: list[dict]):
+        """Add summaries to existing rollup rows, creating missing ones."""
+        for start in range(0, len(rollups), ROLLUP_BATCH_SIZE):
+            stmt = upsert_statement(self.session, ScoreDailyRollup).values(
+                rollups[start : start + ROLLUP_BATCH_SIZE]
+            )
+            excluded = stmt.excluded
+            improves = excluded.best_score > ScoreDailyRollup.best_score
+            ties_earlier = and_(
+                excluded.best_score == ScoreDailyRollup.best_score,
+                excluded.best_score_at < ScoreDailyRollup.best_score_at,
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["user_id", "mode", "day"],
+                set_={
+                    "username": excluded.username,
+                    "games": ScoreDailyRollup.games + excluded.games,
+                    "total_score": ScoreDailyRollup.total_score + excluded.total_score,
+                    "best_score": case(
+                        (improves, excluded.best_score),
+                        else_=ScoreDailyRollup.best_score,
+                    ),
+                    "best_score_at": case(
+                        (or_(improves, ties_earlier), excluded.best_score_at),
+                        else_=ScoreDailyRollup.best_score_at,
+                    ),
+                },
+            )
+            self.session.execute(stmt)
+
+    def _best_scores(
+        self,
+        mode: Optional[GameMode],
+        window: Optional[LeaderboardWindow] = None,
+    ):
+        """Subquery with one best score row per player for a board."""
+        if window:
+            return self._window_best_scores(mode, window)
+
+        if mode:
+            return (
+                select(
+                    PlayerModeBest.user_id,
+                    PlayerModeBest.username,
+                    PlayerModeBest.best_score,
+                    PlayerModeBest.best_score_at,
+                )
+                .where(PlayerModeBest.mode == mode)
+                .subquery()
+            )
+
+        # All modes: a player's overall best is their profile high score, so
+        # rank players directly and look up when that best was reached
+        achieved_at = (
+            select(func.min(PlayerModeBest.best_score_at))
+            .where(
+                PlayerModeBest.user_id == Player.id,
+                PlayerModeBest.best_score == Player.high_score,
+            )
+            .correlate(Player)
+            .scalar_subquery()
+        )
+
+        return (
+            select(
+                Player.id.label("user_id"),
+                Player.username,
+                Player.high_score.label("best_score"),
+                achieved_at.label("best_score_at"),
+            )
+            .where(Player.games_played > 0)
+            .subquery()
+        )
+
+    def _window_best_scores(
+        self, mode: Optional[GameMode], window: LeaderboardWindow
+    ):
+        """Subquery with one best score row per player for the current bucket."""
+        bucket = and_(
+            PlayerWindowBest.period == window,
+            PlayerWindowBest.bucket_start == window_start(window, datetime.now(UTC)),
         )
 
-        # Filter by mode if specified
         if mode:
-            query = query.where(Score.mode == mode)
+            return (
+                select(
+                    PlayerWindowBest.user_id,
+                    PlayerWindowBest.username,
+                    PlayerWindowBest.best_score,
+                    PlayerWindowBest.best_score_at,
+                )
+                .where(bucket, PlayerWindowBest.mode == mode)
+                .subquery()
+            )
+
+        # All modes: keep each player's highest row across modes in the bucket
+        ranked = (
+            select(
+                PlayerWindowBest.user_id,
+                PlayerWindowBest.username,
+                PlayerWindowBest.best_score,
+                PlayerWindowBest.best_score_at,
+                func.row_number()
+                .over(
+                    partition_by=PlayerWindowBest.user_id,
+                    order_by=(
+                        PlayerWindowBest.best_score.desc(),
+                        PlayerWindowBest.best_score_at,
+                    ),
+                )
+                .label("position"),
+            )
+            .where(bucket)
+            .subquery()
+        )
+
+        return (
+            select(
+                ranked.c.user_id,
+                ranked.c.username,
+                ranked.c.best_score,
+                ranked.c.best_score_at,
+            )
+            .where(ranked.c.position == 1)
+            .subquery()
+        )
+
+    def get_leaderboard(
+        self,
+        mode: Optional[GameMode] = None,
+        limit: int = 10,
+        offset: int = 0,
+        after: Optional[tuple[int, str, int]] = None,
+        window: Optional[LeaderboardWindow] = None,
+    ) -> tuple[list[dict], int]:
+        """
+        Get leaderboard entries.
 
-        # Group by user
-        query = query.group_by(Score.user_id, Score.username)
+        Args:
+            mode: Optional game mode filter
+            limit: Number of entries
+            offset: Offset for pagination (ignored when after is given)
+            after: Keyset position (score, user_id, rank) of the last entry
+                of the previous page. The page starts right after it, and
+                is ranked from the position's current place on the board
+                rather than the rank it had then.
+            window: Optional time window (current day, week or month)
+        """
+        if window is None:
+            indexed = leaderboard_index.get_leaderboard(
+                mode, limit, offset, after[:2] if after else None
+            )
+            if indexed is not None:
+                return indexed
+
+        bests = self._best_scores(mode, window)
+        if after:
+            after_score, after_user_id, _ = after
+            # Entries at or ahead of the position in (best_score DESC, user_id) order
+            position = self.session.execute(
+                select(func.count())
+                .select_from(bests)
+                .where(
+                    or_(
+                        bests.c.best_score > after_score,
+                        and_(
+                            bests.c.best_score == after_score,
+                            bests.c.user_id <= after_user_id,
+                        ),
+                    )
+                )
+            ).scalar()
+            after = (after_score, after_user_id, position)
+        entries = self._leaderboard_page(bests, limit, offset, after)
+        total = self.session.execute(select(func.count()).select_from(bests)).scalar()
 
-        # Get all results to sort and paginate
-        results = self.session.execute(query).all()
+        return entries, total
 
-        # Sort by score descending
-        sorted_results = sorted(results, key=lambda x: x.max_score, reverse=True)
+    def _leaderboard_page(
+        self,
+        bests,
+        limit: int,
+        offset: int = 0,
+        after: Optional[tuple[int, str, int]] = None,
+    ) -> list[dict]:
+        """One page of a best score subquery, with positional ranks."""
+        # Sort by best score and paginate in the database.
+        # user_id breaks ties so pages are stable across requests.
+        query = select(bests).order_by(bests.c.best_score.desc(), bests.c.user_id)
+        if after:
+            after_score, after_user_id, after_rank = after
+            query = query.where(
+                or_(
+                    bests.c.best_score < after_score,
+                    and_(
+                        bests.c.best_score == after_score,
+                        bests.c.user_id > after_user_id,
+                    ),
+                )
+            )
+            start_rank = after_rank + 1
+        else:
+            query = query.offset(offset)
+            start_rank = offset + 1
 
-        # Paginate
-        total = len(sorted_results)
-        paginated_results = sorted_results[offset : offset + limit]
+        results = self.session.execute(query.limit(limit)).all()
 
         # Build entries with rank
         entries = []
-        for rank, result in enumerate(paginated_results, start=offset + 1):
+        for rank, result in enumerate(results, start=start_rank):
             entries.append(
                 {
                     "rank": rank,
+                    "user_id": result.user_id,
                     "username": result.username,
-                    "score": result.max_score,
-                    "date": result.latest_date,
+                    "score": result.best_score,
+                    "date": result.best_score_at,
                 }
             )
 
-        return entries, total
+        return entries
+
+    def get_leaderboard_around(
+        self, user_id: str, mode: Optional[GameMode] = None, radius: int = 5
+    ) -> Optional[tuple[int, list[dict]]]:
+        """
+        Get a player's leaderboard position with the entries around it.
+
+        Args:
+            user_id: Player to center on
+            mode: Optional game mode filter
+            radius: Entries to include above and below the player
+
+        Returns:
+            Tuple of (rank, entries), or None if the player has no score
+            on this board
+        """
+        indexed = leaderboard_index.get_leaderboard_around(user_id, mode, radius)
+        if indexed is NOT_ON_BOARD:
+            return None
+        if indexed is not None:
+            return indexed
+
+        bests = self._best_scores(mode)
+        own = self.session.execute(
+            select(bests.c.best_score).where(bests.c.user_id == user_id)
+        ).first()
+        if own is None:
+            return None
+
+        # Entries ahead of the player in (best_score DESC, user_id) order
+        ahead = or_(
+            bests.c.best_score > own.best_score,
+            and_(bests.c.best_score == own.best_score, bests.c.user_id < user_id),
+        )
+        rank = self.session.execute(
+            select(func.count()).select_from(bests).where(ahead)
+        ).scalar() + 1
+
+        above = self.session.execute(
+            select(bests)
+            .where(ahead)
+            .order_by(bests.c.best_score.asc(), bests.c.user_id.desc())
+            .limit(radius)
+        ).all()
+
+        entries = []
+        for offset, result in enumerate(reversed(above)):
+            entries.append(
+                {
+                    "rank": rank - len(above) + offset,
+                    "user_id": result.user_id,
+                    "username": result.username,
+                    "score": result.best_score,
+                    "date": result.best_score_at,
+                }
+            )
+
+        # The player and everyone below come from a keyset page starting
+        # right after the last entry above them
+        if above:
+            last = above[0]
+            after = (last.best_score, last.user_id, rank - 1)
+        else:
+            after = None
+        entries.extend(self._leaderboard_page(bests, radius + 1, after=after))
+
+        return rank, entries
 
     # Live game operations (mock for now)
     def get_live_games(
@@ -427,7 +1675,6 @@ def seed_db():
                 # Add high score
                 high_score_record = Score(
                     user_id=user_id,
-                    username=data["username"],
                     score=data["high_score"],
                     mode=data["mode"],
                     created_at=datetime.now(UTC)
@@ -440,7 +1687,6 @@ def seed_db():
                     past_score = int(data["high_score"] * random.uniform(0.4, 0.9))
                     past_score_record = Score(
                         user_id=user_id,
-                        username=data["username"],
                         score=past_score,
                         mode=data["mode"],
                         created_at=datetime.now(UTC)
@@ -455,4 +1701,10 @@ def seed_db():
                 database.session.rollback()
                 continue
 
+        # Seeded scores bypass add_score, so derive best scores from them
+        database.rebuild_player_mode_bests()
+        database.rebuild_window_bests()
+        # ...and the score event log
+        mark_gaps(settings.score_event_log_dir)
+
         print(f"✅ Database seeded with {len(mock_players_data)} players")
@@ -5,9 +5,21 @@ from datetime import datetime, UTC
 from typing import Optional
 import uuid
 
-from sqlalchemy import String, Integer, DateTime, Enum, ForeignKey, Index
+from sqlalchemy import (
+    String,
+    Integer,
+    BigInteger,
+    SmallInteger,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Identity,
+    Index,
+    TypeDecorator,
+    text,
+)
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from app.models import GameMode
+from app.models import GameMode, LeaderboardWindow
 
 
 class Base(DeclarativeBase):
@@ -15,6 +27,22 @@ class Base(DeclarativeBase):
     pass
 
 
+class GameModeCode(TypeDecorator):
+    """GameMode stored as a small integer rather than its name or a native enum."""
+    impl = SmallInteger
+    cache_ok = True
+    
+    # Stored codes are part of the schema: never renumber, only append
+    CODES = {GameMode.WALLS: 1, GameMode.PASSTHROUGH: 2}
+    MODES = {code: mode for mode, code in CODES.items()}
+    
+    def process_bind_param(self, value, dialect):
+        return None if value is None else self.CODES[GameMode(value)]
+    
+    def process_result_value(self, value, dialect):
+        return None if value is None else self.MODES[value]
+
+
 class User(Base):
     """User account model."""
     __tablename__ = "users"
@@ -28,6 +56,10 @@ class User(Base):
     # Relationships
     player: Mapped[Optional["Player"]] = relationship("Player", back_populates="user", uselist=False, cascade="all, delete-orphan")
     scores: Mapped[list["Score"]] = relationship("Score", back_populates="user", cascade="all, delete-orphan")
+    mode_bests: Mapped[list["PlayerModeBest"]] = relationship("PlayerModeBest", back_populates="user", cascade="all, delete-orphan")
+    window_bests: Mapped[list["PlayerWindowBest"]] = relationship("PlayerWindowBest", back_populates="user", cascade="all, delete-orphan")
+    daily_rollups: Mapped[list["ScoreDailyRollup"]] = relationship("ScoreDailyRollup", back_populates="user", cascade="all, delete-orphan")
+    revoked_tokens: Mapped[list["RevokedToken"]] = relationship("RevokedToken", back_populates="user", cascade="all, delete-orphan")
     
     def __repr__(self) -> str:
         return f"<User(id={self.id}, username={self.username}, email={self.email})>"
@@ -59,22 +91,120 @@ class Score(Base):
     """Score record model."""
     __tablename__ = "scores"
     
-    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    # SQLite only auto-increments INTEGER PRIMARY KEY columns
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), Identity(), primary_key=True)
     user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False)
-    username: Mapped[str] = mapped_column(String(20), nullable=False)
     score: Mapped[int] = mapped_column(Integer, nullable=False)
-    mode: Mapped[GameMode] = mapped_column(Enum(GameMode), nullable=False)
+    mode: Mapped[GameMode] = mapped_column(GameModeCode, nullable=False)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
+    # Client Idempotency-Key the score was submitted with, if any
+    request_key: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
     
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="scores")
     
-    # Indexes for leaderboard queries
+    # Leaderboards read the best score tables, so scores only need a per-player
+    # index (best score rebuilds, cascading deletes) and one for the archiver.
+    # The unique key stops a retried submission from being stored twice.
+    __table_args__ = (
+        Index('idx_score_user', 'user_id', 'mode', text('score DESC')),
+        Index('idx_score_created_at', 'created_at'),
+        Index('uq_score_request_key', 'user_id', 'request_key', unique=True),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<Score(id={self.id}, user_id={self.user_id}, score={self.score}, mode={self.mode})>"
+
+
+class PlayerModeBest(Base):
+    """Best score per player and game mode, maintained on every score write."""
+    __tablename__ = "player_mode_bests"
+    
+    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), primary_key=True)
+    mode: Mapped[GameMode] = mapped_column(GameModeCode, primary_key=True)
+    username: Mapped[str] = mapped_column(String(20), nullable=False)
+    best_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    best_score_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    
+    # Relationships
+    user: Mapped["User"] = relationship("User", back_populates="mode_bests")
+    
+    # Index for ranking: leaderboard pages and rank counts seek on
+    # (mode, best_score DESC) with user_id as the tie-breaker
+    __table_args__ = (
+        Index('idx_mode_best_score', 'mode', text('best_score DESC'), 'user_id'),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<PlayerModeBest(user_id={self.user_id}, mode={self.mode}, best_score={self.best_score})>"
+
+
+class PlayerWindowBest(Base):
+    """Best score per player and game mode within a day/week/month bucket."""
+    __tablename__ = "player_window_bests"
+    
+    period: Mapped[LeaderboardWindow] = mapped_column(Enum(LeaderboardWindow), primary_key=True)
+    bucket_start: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    mode: Mapped[GameMode] = mapped_column(GameModeCode, primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), primary_key=True)
+    username: Mapped[str] = mapped_column(String(20), nullable=False)
+    best_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    best_score_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    
+    # Relationships
+    user: Mapped["User"] = relationship("User", back_populates="window_bests")
+    
+    # Index for ranking within a bucket, same shape as idx_mode_best_score
+    __table_args__ = (
+        Index(
+            'idx_window_best_score',
+            'period', 'bucket_start', 'mode', text('best_score DESC'), 'user_id',
+        ),
+    )
+    
+    def __repr__(self) -> str:
+        return f"<PlayerWindowBest(user_id={self.user_id}, period={self.period}, bucket_start={self.bucket_start}, best_score={self.best_score})>"
+
+
+class ScoreDailyRollup(Base):
+    """Archived scores summarized per player, game mode and UTC day."""
+    __tablename__ = "score_daily_rollups"
+    
+    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), primary_key=True)
+    mode: Mapped[GameMode] = mapped_column(GameModeCode, primary_key=True)
+    day: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+    username: Mapped[str] = mapped_column(String(20), nullable=False)
+    games: Mapped[int] = mapped_column(Integer, nullable=False)
+    total_score: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    best_score: Mapped[int] = mapped_column(Integer, nullable=False)
+    best_score_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    
+    # Relationships
+    user: Mapped["User"] = relationship("User", back_populates="daily_rollups")
+    
+    def __repr__(self) -> str:
+        return f"<ScoreDailyRollup(user_id={self.user_id}, mode={self.mode}, day={self.day}, games={self.games})>"
+
+
+class RevokedToken(Base):
+    """Access token revoked before it expired (logout), by its jti claim."""
+    __tablename__ = "revoked_tokens"
+    
+    jti: Mapped[str] = mapped_column(String(36), primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(36), ForeignKey("users.id"), nullable=False)
+    # When the token would have expired anyway; the row is useless after that
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    revoked_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(UTC), nullable=False)
+    
+    # Relationships
+    user: Mapped["User"] = relationship("User", back_populates="revoked_tokens")
+    
+    # Workers poll for revocations newer than the last they saw, and expired
+    # rows are purged
     __table_args__ = (
-        Index('idx_user_scores', 'user_id', 'score'),
-        Index('idx_mode_scores', 'mode', 'score'),
-        Index('idx_score_date', 'score', 'created_at'),
+        Index('idx_revoked_token_revoked_at', 'revoked_at'),
+        Index('idx_revoked_token_expires_at', 'expires_at'),
     )
     
     def __repr__(self) -> str:
-        return f"<Score(id={self.id}, username={self.username}, score={self.score}, mode={self.mode})>"
+        return f"<RevokedToken(jti={self.jti}, user_id={self.user_id}, expires_at={self.expires_at})>"
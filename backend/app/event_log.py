@@ -0,0 +1,356 @@
+"""
+Append-only binary log of accepted scores, split into segment files.
+Every committed score is appended as an event. Projections (app.projections)
+rebuild leaderboards, player stats and window boards by replaying the log
+sequentially instead of running SQL over the scores table.
+
+Segments are named after the sequence number of their first event and hold
+records of
+
+    <length: u32> <crc32 of payload: u32> <payload>
+
+where payload is EVENT_HEADER (kind, score id, played_at in microseconds
+since the epoch, score, games, mode code) followed by user_id and username,
+each prefixed with a one-byte length. A record torn by a crash fails the
+length or CRC check: readers stop there and the writer cuts it off on open.
+
+A COVERAGE file next to the segments records how much of the score history
+the log holds (see read_coverage), so a log that started after scores were
+already stored, or that missed some, is never mistaken for the full history.
+"""
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from app.db_models import GameModeCode
+from app.models import GameMode
+
+logger = logging.getLogger(__name__)
+
+# One game
+EVENT_SCORE = 1
+# Summary of a player's archived games in one mode on one day (score is the
+# day's best, played_at when it was reached); written when bootstrapping the
+# log from a database whose old scores were rolled up
+EVENT_ARCHIVED_DAY = 2
+
+RECORD_HEADER = struct.Struct("<II")
+EVENT_HEADER = struct.Struct("<BqqiiB")
+SEGMENT_SUFFIX = ".seg"
+EPOCH = datetime(1970, 1, 1)
+COVERAGE_FILE = "COVERAGE"
+
+
+@dataclass(slots=True)
+class ScoreEvent:
+    """A score accepted into the database."""
+
+    kind: int
+    score_id: int
+    user_id: str
+    username: str
+    mode: GameMode
+    score: int
+    played_at: datetime
+    games: int = 1
+
+
+def encode_event(event: ScoreEvent) -> bytes:
+    """Serialize an event as a complete log record."""
+    played_at = event.played_at
+    if played_at.tzinfo:
+        played_at = played_at.astimezone(UTC).replace(tzinfo=None)
+    user_id = event.user_id.encode()
+    username = event.username.encode()
+    payload = b"".join(
+        (
+            EVENT_HEADER.pack(
+                event.kind,
+                event.score_id or 0,
+                (played_at - EPOCH) // timedelta(microseconds=1),
+                event.score,
+                event.games,
+                GameModeCode.CODES[event.mode],
+            ),
+            bytes((len(user_id),)),
+            user_id,
+            bytes((len(username),)),
+            username,
+        )
+    )
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def _decode_records(buffer, size: int) -> Iterator[tuple[ScoreEvent, int]]:
+    """
+    Events in a segment buffer with the offset after each; stops at a torn
+    record. Slicing an mmap copies out bytes, so no view of it outlives this.
+    """
+    unpack_record = RECORD_HEADER.unpack_from
+    unpack_event = EVENT_HEADER.unpack_from
+    modes = GameModeCode.MODES
+    microsecond = timedelta(microseconds=1)
+    # Players recur throughout a log: decode each id and name once
+    names: dict[bytes, str] = {}
+    offset = 0
+    while offset + RECORD_HEADER.size <= size:
+        length, checksum = unpack_record(buffer, offset)
+        start = offset + RECORD_HEADER.size
+        end = start + length
+        payload = buffer[start:end]
+        if end > size or zlib.crc32(payload) != checksum:
+            return
+
+        kind, score_id, played_us, score, games, mode = unpack_event(payload)
+        user_id_end = EVENT_HEADER.size + 1 + payload[EVENT_HEADER.size]
+        raw_user_id = payload[EVENT_HEADER.size + 1 : user_id_end]
+        raw_username = payload[user_id_end + 1 :]
+        user_id = names.get(raw_user_id)
+        if user_id is None:
+            user_id = names[raw_user_id] = raw_user_id.decode()
+        username = names.get(raw_username)
+        if username is None:
+            username = names[raw_username] = raw_username.decode()
+
+        yield ScoreEvent(
+            kind,
+            score_id,
+            user_id,
+            username,
+            modes[mode],
+            score,
+            EPOCH + played_us * microsecond,
+            games,
+        ), end
+        offset = end
+
+
+def segment_paths(directory: str) -> list[Path]:
+    """Segment files in replay order."""
+    directory = Path(directory)
+    if not directory.is_dir():
+        return []
+    return sorted(directory.glob(f"*{SEGMENT_SUFFIX}"))
+
+
+def read_events(directory: str) -> Iterator[ScoreEvent]:
+    """
+    Replay every event in a log, oldest first. Segments are memory-mapped
+    and read sequentially.
+    """
+    for path in segment_paths(directory):
+        with open(path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if not size:
+                continue
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                buffer.madvise(mmap.MADV_SEQUENTIAL)
+                for event, _ in _decode_records(buffer, size):
+                    yield event
+
+
+def read_coverage(directory: str) -> Optional[dict]:
+    """
+    How much of the score history a log holds, or None if never recorded
+    (e.g. a log written before coverage was tracked). Either
+
+    - {"complete": True, "score_id": N}: every score up to id N (bootstrapped
+      from the database, or started against an empty one), plus the scores
+      logged since
+    - {"complete": False, "score_id": N}: only scores logged after the log
+      was started against a database whose newest score had id N
+    - {"complete": False, "score_id": None}: scores are missing at unknown
+      points (a failed append, or scores stored without going through the log)
+    """
+    path = Path(directory) / COVERAGE_FILE
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return None
+
+
+def write_coverage(directory: str, complete: bool, score_id: Optional[int]):
+    """Record a log's coverage, replacing the file atomically."""
+    path = Path(directory) / COVERAGE_FILE
+    staging = path.with_suffix(".tmp")
+    staging.write_text(json.dumps({"complete": complete, "score_id": score_id}))
+    os.replace(staging, path)
+
+
+def mark_gaps(directory: str):
+    """Record that a log, if there is one, misses scores at unknown points."""
+    if read_coverage(directory) is not None:
+        write_coverage(directory, complete=False, score_id=None)
+
+
+def covers_history(directories: Iterable[str]) -> bool:
+    """
+    Whether replaying these logs together yields the full score history
+    exactly once: one complete log, and any others (other workers' logs)
+    started after everything it holds, so no score is in two of them.
+    """
+    coverages = [read_coverage(directory) for directory in directories]
+    if not coverages or any(
+        coverage is None or coverage["score_id"] is None for coverage in coverages
+    ):
+        return False
+    complete = [coverage for coverage in coverages if coverage["complete"]]
+    if len(complete) != 1:
+        return False
+    return all(
+        coverage["score_id"] >= complete[0]["score_id"]
+        for coverage in coverages
+        if not coverage["complete"]
+    )
+
+
+class ScoreEventLog:
+    """Writer for the score event log; one per directory, enforced with a file lock."""
+
+    def __init__(self):
+        self.directory: Optional[Path] = None
+        self.segment_max_bytes = 64 * 1024 * 1024
+        self.fsync = False
+        self.events_written = 0
+        self._file = None
+        self._lock_file = None
+        self._lock = threading.Lock()
+        self._segment_size = 0
+        # Sequence number the next event gets
+        self._next_sequence = 0
+
+    @property
+    def is_open(self) -> bool:
+        """Whether accepted scores are being logged."""
+        return self._file is not None
+
+    @property
+    def next_sequence(self) -> int:
+        """Number of events in the log."""
+        return self._next_sequence
+
+    def open(self, directory: str, segment_max_bytes: int, fsync: bool = False):
+        """
+        Open a log for appending, creating it if needed.
+
+        Args:
+            directory: Log directory
+            segment_max_bytes: Size after which a new segment is started
+            fsync: Sync every append to disk (otherwise only flushed to the OS)
+
+        Raises:
+            RuntimeError: If another process has the log open
+        """
+        if self._file is not None:
+            raise RuntimeError("Score event log is already open")
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        lock_file = open(directory / "LOCK", "a")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            raise RuntimeError(f"Score event log {directory} is in use by another process")
+
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync = fsync
+        self._lock_file = lock_file
+
+        segments = segment_paths(directory)
+        if segments:
+            self._open_segment(segments[-1], int(segments[-1].stem))
+        else:
+            self._open_segment(directory / f"{0:020d}{SEGMENT_SUFFIX}", 0)
+
+    def start_coverage(self, latest_score_id: Optional[int], has_history: bool):
+        """
+        Record coverage for a log that has none yet: complete when started
+        against a database with no scores, otherwise partial from the newest
+        stored score on. Logs that already record their coverage, or that
+        hold events written before coverage was tracked, are left alone.
+
+        Args:
+            latest_score_id: Id of the newest stored score, if any
+            has_history: Whether any scores (or archived summaries) are stored
+        """
+        if read_coverage(self.directory) is not None or self._next_sequence:
+            return
+        write_coverage(self.directory, not has_history, latest_score_id or 0)
+
+    def close(self):
+        """Close the log."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._lock_file is not None:
+                self._lock_file.close()
+                self._lock_file = None
+
+    def append(self, events: Iterable[ScoreEvent]) -> int:
+        """
+        Append events in one write.
+
+        Returns:
+            Sequence number of the first event appended
+        """
+        records = [encode_event(event) for event in events]
+        data = b"".join(records)
+        with self._lock:
+            if self._file is None:
+                raise RuntimeError("Score event log is not open")
+            if self._segment_size >= self.segment_max_bytes:
+                self._rotate()
+
+            first = self._next_sequence
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._segment_size += len(data)
+            self._next_sequence += len(records)
+            self.events_written += len(records)
+            return first
+
+    def _rotate(self):
+        """Finish the current segment and start the next one."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._open_segment(
+            self.directory / f"{self._next_sequence:020d}{SEGMENT_SUFFIX}",
+            self._next_sequence,
+        )
+
+    def _open_segment(self, path: Path, first_sequence: int):
+        """Open a segment for appending, cutting off a torn last record."""
+        file = open(path, "a+b")
+        size = os.fstat(file.fileno()).st_size
+        valid = 0
+        count = 0
+        if size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                for _, valid in _decode_records(buffer, size):
+                    count += 1
+        if valid < size:
+            logger.warning("Discarding %d bytes of a torn event in %s", size - valid, path)
+            file.truncate(valid)
+            os.fsync(file.fileno())
+
+        self._file = file
+        self._segment_size = valid
+        self._next_sequence = first_sequence + count
+
+
+# Global score event log instance
+score_event_log = ScoreEventLog()
@@ -0,0 +1,153 @@
+"""
+Group-commit score ingestion.
+Score submissions are queued and written by a single writer task in batches,
+one transaction (and one fsync) per batch instead of one per score. Each
+caller waits until the batch holding its score has been committed, so a
+resolved submission is as durable as one written by Database.add_score.
+"""
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.database import Database, SessionLocal
+from app.models import GameMode
+from app.rank_worker import rank_worker
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreIngestQueue:
+    """Buffers score submissions and commits them in batches."""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._session_factory: Callable[[], Session] = SessionLocal
+        self.max_batch_size = 500
+        self.max_delay_seconds = 0.005
+        self.batches_written = 0
+        self.scores_written = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Whether submissions are being accepted."""
+        return self._writer is not None
+
+    def start(
+        self,
+        max_batch_size: int,
+        max_delay_seconds: float,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        """
+        Start the writer task on the running event loop.
+
+        Args:
+            max_batch_size: Most scores committed in one transaction
+            max_delay_seconds: Longest a score waits for its batch to fill
+            session_factory: Creates the session each batch is written with
+        """
+        if self._writer is not None:
+            raise RuntimeError("Score ingestion is already running")
+        self.max_batch_size = max_batch_size
+        self.max_delay_seconds = max_delay_seconds
+        self._session_factory = session_factory
+        self._queue = asyncio.Queue()
+        self._writer = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop accepting submissions and wait until queued ones are written."""
+        if self._writer is None:
+            return
+        writer, self._writer = self._writer, None
+        # Everything queued before the sentinel is written before the writer exits
+        self._queue.put_nowait(None)
+        await writer
+
+    async def submit(
+        self,
+        user_id: str,
+        score: int,
+        mode: GameMode,
+        request_key: Optional[str] = None,
+    ) -> dict:
+        """
+        Queue a score and wait until it is committed.
+        request_key is passed to Database.add_score.
+
+        Returns:
+            The dict Database.add_score returns
+
+        Raises:
+            ValueError: If player not found
+            RuntimeError: If ingestion is not running
+        """
+        if self._writer is None:
+            raise RuntimeError("Score ingestion is not running")
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((user_id, score, mode, request_key, future))
+        return await future
+
+    async def _run(self):
+        """Collect submissions into batches and write them until stopped."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            # Wait briefly for more submissions to share the commit
+            batch = [item]
+            deadline = loop.time() + self.max_delay_seconds
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._write(batch)
+
+    def _write_batch(self, submissions: list[tuple]) -> list:
+        """Commit one batch (runs in a worker thread)."""
+        session = self._session_factory()
+        try:
+            return Database(session).add_scores(
+                submissions, defer_rank=rank_worker.is_running
+            )
+        finally:
+            session.close()
+
+    async def _write(self, batch: list):
+        """Write a batch and resolve each submitter's future."""
+        try:
+            outcomes = await asyncio.to_thread(
+                self._write_batch, [(u, s, m, k) for u, s, m, k, _ in batch]
+            )
+            self.batches_written += 1
+            self.scores_written += len(batch)
+        except Exception as e:
+            logger.exception("Failed to write a batch of %d scores", len(batch))
+            outcomes = [e] * len(batch)
+
+        for (*_, future), outcome in zip(batch, outcomes):
+            # The submitter may have given up (e.g. the client disconnected)
+            if future.done():
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+
+# Global ingestion queue instance
+score_ingest_queue = ScoreIngestQueue()
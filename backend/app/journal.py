@@ -0,0 +1,318 @@
+"""
+Local write-ahead journal for score submissions.
+When enabled, a submission is appended to a local file and fsynced, then
+acknowledged without waiting for the database, so a slow or unavailable
+database does not hold up requests. A background drainer replays the journal
+into the database in batches and checkpoints how far it got.
+
+Every record carries a request key (the client's Idempotency-Key, or one
+generated here), so a record replayed twice - e.g. after a crash between a
+database commit and its checkpoint - is only stored once (Database.add_score).
+"""
+import asyncio
+import fcntl
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, UTC
+from pathlib import Path
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.database import Database, SessionLocal
+from app.models import GameMode
+
+logger = logging.getLogger(__name__)
+
+
+class ScoreJournal:
+    """Append-only file of score submissions waiting to be written."""
+
+    def __init__(self):
+        self.path: Optional[Path] = None
+        self.batch_size = 500
+        self.retry_seconds = 1.0
+        self.records_appended = 0
+        self.records_drained = 0
+        self._file = None
+        self._lock = threading.Lock()
+        # Byte offset of the first record not yet written to the database
+        self._offset = 0
+        self._session_factory: Callable[[], Session] = SessionLocal
+        self._drainer: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping = False
+
+    @property
+    def is_open(self) -> bool:
+        """Whether submissions can be appended."""
+        return self._file is not None
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the drainer is replaying the journal into the database."""
+        return self._drainer is not None
+
+    @property
+    def checkpoint_path(self) -> Path:
+        return self.path.with_name(self.path.name + ".checkpoint")
+
+    def open(
+        self,
+        path: str,
+        batch_size: int = 500,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        """
+        Open (or create) the journal and recover it after a crash.
+
+        Args:
+            path: Journal file; one per process, enforced with a file lock
+            batch_size: Most records written to the database per transaction
+            session_factory: Creates the session each batch is written with
+
+        Raises:
+            RuntimeError: If another process has the journal open
+        """
+        if self._file is not None:
+            raise RuntimeError("Score journal is already open")
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        file = open(path, "a+b")
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            file.close()
+            raise RuntimeError(f"Score journal {path} is in use by another process")
+
+        self.path = path
+        self.batch_size = batch_size
+        self._session_factory = session_factory
+        self._file = file
+
+        size = self._discard_torn_record()
+        self._offset = self._read_checkpoint()
+        if self._offset > size:
+            # Crashed after emptying a fully drained journal, before
+            # resetting the checkpoint
+            self._offset = 0
+
+    def close(self):
+        """Close the journal; undrained records are replayed when it is reopened."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def append(
+        self,
+        user_id: str,
+        score: int,
+        mode: GameMode,
+        request_key: Optional[str] = None,
+    ) -> str:
+        """
+        Durably record a submission. Blocks for an fsync, so call it from a
+        worker thread in async code.
+
+        Returns:
+            The record's request key
+
+        Raises:
+            RuntimeError: If the journal is not open
+        """
+        if self._file is None:
+            raise RuntimeError("Score journal is not open")
+        record = {
+            "key": request_key or f"journal-{uuid.uuid4().hex}",
+            "user_id": user_id,
+            "score": score,
+            "mode": mode.value,
+            "played_at": datetime.now(UTC).isoformat(),
+        }
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode()
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.records_appended += 1
+
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return record["key"]
+
+    def pending(self, limit: int) -> tuple[list[dict], int]:
+        """Up to limit undrained records, and the offset just past them."""
+        records = []
+        with self._lock:
+            self._file.seek(self._offset)
+            offset = self._offset
+            for line in self._file:
+                if not line.endswith(b"\n"):
+                    break
+                records.append(json.loads(line))
+                offset += len(line)
+                if len(records) >= limit:
+                    break
+        return records, offset
+
+    def drain_once(self) -> int:
+        """
+        Write the next batch of records to the database and checkpoint it.
+        Empties the journal once everything in it has been written.
+
+        Returns:
+            Number of records drained
+        """
+        records, offset = self.pending(self.batch_size)
+        if not records:
+            self._truncate_drained()
+            return 0
+
+        session = self._session_factory()
+        try:
+            # Nobody is waiting for these ranks
+            outcomes = Database(session).add_scores(
+                [
+                    (
+                        record["user_id"],
+                        record["score"],
+                        GameMode(record["mode"]),
+                        record["key"],
+                        datetime.fromisoformat(record["played_at"]),
+                    )
+                    for record in records
+                ],
+                defer_rank=True,
+            )
+        finally:
+            session.close()
+
+        for record, outcome in zip(records, outcomes):
+            if isinstance(outcome, ValueError):
+                # Retrying cannot help (e.g. the account was deleted)
+                logger.warning(
+                    "Dropped journaled score %s: %s", record["key"], outcome
+                )
+
+        self._save_checkpoint(offset)
+        self.records_drained += len(records)
+        return len(records)
+
+    def start(
+        self,
+        path: str,
+        batch_size: int,
+        retry_seconds: float,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        """
+        Open the journal and start the drainer on the running event loop.
+
+        Args:
+            path: Journal file
+            batch_size: Most records written to the database per transaction
+            retry_seconds: Wait before retrying after the database fails
+            session_factory: Creates the session each batch is written with
+        """
+        if self._drainer is not None:
+            raise RuntimeError("Score journal is already running")
+        self.open(path, batch_size, session_factory)
+        self.retry_seconds = retry_seconds
+        self._stopping = False
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        # Replay whatever a previous run left behind
+        self._wakeup.set()
+        self._drainer = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the drainer after its current batch and close the journal."""
+        if self._drainer is None:
+            return
+        drainer, self._drainer = self._drainer, None
+        self._stopping = True
+        self._wakeup.set()
+        await drainer
+        self._loop = None
+        self.close()
+
+    async def _run(self):
+        """Drain new records as they arrive, retrying while the database fails."""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.retry_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            while not self._stopping:
+                try:
+                    drained = await asyncio.to_thread(self.drain_once)
+                except Exception:
+                    logger.exception(
+                        "Failed to drain score journal, retrying in %.1fs",
+                        self.retry_seconds,
+                    )
+                    break
+                if not drained:
+                    break
+
+    def _read_checkpoint(self) -> int:
+        try:
+            return int(self.checkpoint_path.read_text())
+        except FileNotFoundError:
+            return 0
+
+    def _save_checkpoint(self, offset: int):
+        """Atomically replace the checkpoint, then advance the drain offset."""
+        temporary = self.checkpoint_path.with_suffix(".tmp")
+        with open(temporary, "w") as file:
+            file.write(str(offset))
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, self.checkpoint_path)
+        self._offset = offset
+
+    def _truncate_drained(self):
+        """Empty the journal if every record in it has been drained."""
+        with self._lock:
+            size = os.fstat(self._file.fileno()).st_size
+            if size == 0 or self._offset < size:
+                return
+            self._file.truncate(0)
+            os.fsync(self._file.fileno())
+            self._save_checkpoint(0)
+
+    def _discard_torn_record(self) -> int:
+        """
+        Cut off a record left half-written by a crash during append.
+        It was never acknowledged, so the client retries it.
+
+        Returns:
+            Journal size afterwards
+        """
+        fileno = self._file.fileno()
+        size = os.fstat(fileno).st_size
+        end = size
+        while end > 0:
+            start = max(0, end - 4096)
+            chunk = os.pread(fileno, end - start, start)
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+
+        if end < size:
+            logger.warning("Discarding %d bytes of a torn journal record", size - end)
+            os.truncate(fileno, end)
+            os.fsync(fileno)
+        return end
+
+
+# Global score journal instance
+score_journal = ScoreJournal()
@@ -0,0 +1,359 @@
+"""
+In-process ranked leaderboard index.
+Keeps each player's best score per game mode in an indexable skip list so
+leaderboard pages and rank lookups are answered in O(log n) without
+querying the database.
+
+The index is process-local: it is built from the database at startup and
+updated by Database.add_score. Run a single API worker per database when it
+is enabled, otherwise writes handled by other workers will not be reflected.
+"""
+import random
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db_models import PlayerModeBest
+from app.models import GameMode
+
+
+_MAX_LEVELS = 32
+
+# Returned by LeaderboardIndex.get_leaderboard_around when the index is warm
+# and the player has no score on the board, as opposed to None for a cold
+# index; the index answers that case instead of falling back to SQL
+NOT_ON_BOARD = object()
+
+
+class _Node:
+    """Skip list node."""
+
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key, levels: int):
+        self.key = key
+        self.next: list[Optional["_Node"]] = [None] * levels
+        self.width: list[int] = [1] * levels
+
+
+class IndexableSkipList:
+    """
+    Sorted collection with O(log n) insert, remove, rank and positional access.
+    Each link stores how many bottom-level positions it spans, which is what
+    makes rank (count of smaller keys) and indexing logarithmic.
+    """
+
+    def __init__(self):
+        self._head = _Node(None, _MAX_LEVELS)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _random_level() -> int:
+        level = 1
+        while level < _MAX_LEVELS and random.random() < 0.5:
+            level += 1
+        return level
+
+    def insert(self, key) -> None:
+        """Insert a key (duplicates are allowed)."""
+        chain: list[_Node] = [self._head] * _MAX_LEVELS
+        steps_at_level = [0] * _MAX_LEVELS
+        node = self._head
+        for level in reversed(range(_MAX_LEVELS)):
+            nxt = node.next[level]
+            while nxt is not None and nxt.key <= key:
+                steps_at_level[level] += node.width[level]
+                node = nxt
+                nxt = node.next[level]
+            chain[level] = node
+
+        levels = self._random_level()
+        new_node = _Node(key, levels)
+        steps = 0
+        for level in range(levels):
+            prev = chain[level]
+            new_node.next[level] = prev.next[level]
+            prev.next[level] = new_node
+            new_node.width[level] = prev.width[level] - steps
+            prev.width[level] = steps + 1
+            steps += steps_at_level[level]
+        for level in range(levels, _MAX_LEVELS):
+            chain[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key) -> None:
+        """Remove one occurrence of key. Raises KeyError if missing."""
+        chain: list[_Node] = [self._head] * _MAX_LEVELS
+        node = self._head
+        for level in reversed(range(_MAX_LEVELS)):
+            nxt = node.next[level]
+            while nxt is not None and nxt.key < key:
+                node = nxt
+                nxt = node.next[level]
+            chain[level] = node
+
+        target = chain[0].next[0]
+        if target is None or target.key != key:
+            raise KeyError(key)
+
+        for level in range(len(target.next)):
+            prev = chain[level]
+            prev.width[level] += target.width[level] - 1
+            prev.next[level] = target.next[level]
+        for level in range(len(target.next), _MAX_LEVELS):
+            chain[level].width[level] -= 1
+        self._size -= 1
+
+    def count_less(self, key, inclusive: bool = False) -> int:
+        """Number of keys smaller than key (or equal to it when inclusive)."""
+        position = 0
+        node = self._head
+        for level in reversed(range(_MAX_LEVELS)):
+            nxt = node.next[level]
+            while nxt is not None and (
+                nxt.key < key or (inclusive and nxt.key == key)
+            ):
+                position += node.width[level]
+                node = nxt
+                nxt = node.next[level]
+        return position
+
+    def slice(self, start: int, count: int) -> list:
+        """Return up to count keys starting at zero-based position start."""
+        if start >= self._size or count <= 0:
+            return []
+
+        # Walk down to the node at position start (head is position -1)
+        remaining = start + 1
+        node = self._head
+        for level in reversed(range(_MAX_LEVELS)):
+            while node.next[level] is not None and node.width[level] <= remaining:
+                remaining -= node.width[level]
+                node = node.next[level]
+
+        keys = []
+        while node is not None and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+@dataclass
+class _PlayerBest:
+    """Best score and when it was achieved for one player on one board."""
+
+    username: str
+    best: int
+    achieved_at: datetime
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Drop tzinfo so aware and database (naive UTC) datetimes compare."""
+    return value.replace(tzinfo=None) if value.tzinfo else value
+
+
+class RankedBoard:
+    """Best score per player for one board, ordered by score descending."""
+
+    def __init__(self):
+        # Keys are (-best, user_id): ascending order is best score first,
+        # with user_id breaking ties the same way the SQL leaderboard does
+        self._ranking = IndexableSkipList()
+        self._players: dict[str, _PlayerBest] = {}
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def record(self, user_id: str, username: str, score: int, played_at: datetime):
+        """Record a game result for a player."""
+        played_at = _naive_utc(played_at)
+        current = self._players.get(user_id)
+
+        if current is None:
+            self._players[user_id] = _PlayerBest(username, score, played_at)
+            self._ranking.insert((-score, user_id))
+            return
+
+        if score > current.best:
+            self._ranking.remove((-current.best, user_id))
+            self._ranking.insert((-score, user_id))
+            current.best = score
+            current.achieved_at = played_at
+        elif score == current.best and played_at < current.achieved_at:
+            # Ties keep the earliest time the best was reached
+            current.achieved_at = played_at
+
+    def rank(self, score: int) -> int:
+        """Rank a score would have: players with a strictly better best, plus one."""
+        # "" sorts before every user_id, so this counts bests > score only
+        return self._ranking.count_less((-score, "")) + 1
+
+    def page(
+        self, limit: int, offset: int, after: Optional[tuple[int, str]] = None
+    ) -> list[dict]:
+        """
+        Leaderboard entries for a page, in the same shape as Database.
+        When after (score, user_id) is given, the page starts right after that
+        position and offset is ignored.
+        """
+        if after is not None:
+            after_score, after_user_id = after
+            offset = self._ranking.count_less(
+                (-after_score, after_user_id), inclusive=True
+            )
+
+        entries = []
+        keys = self._ranking.slice(offset, limit)
+        for rank, (_, user_id) in enumerate(keys, start=offset + 1):
+            player = self._players[user_id]
+            entries.append(
+                {
+                    "rank": rank,
+                    "user_id": user_id,
+                    "username": player.username,
+                    "score": player.best,
+                    "date": player.achieved_at,
+                }
+            )
+        return entries
+
+
+    def around(self, user_id: str, radius: int) -> Optional[tuple[int, list[dict]]]:
+        """
+        Player's position and up to radius entries on each side of it,
+        or None if the player is not on this board.
+        """
+        player = self._players.get(user_id)
+        if player is None:
+            return None
+
+        position = self._ranking.count_less((-player.best, user_id))
+        start = max(position - radius, 0)
+        entries = self.page(position - start + radius + 1, start)
+        return position + 1, entries
+
+
+class LeaderboardIndex:
+    """
+    Ranked boards for every game mode plus the combined (all modes) board.
+    Reads return None while the index is cold so callers fall back to SQL.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._boards: Optional[dict[Optional[GameMode], RankedBoard]] = None
+
+    @property
+    def is_warm(self) -> bool:
+        """Whether the index has been built and can serve reads."""
+        return self._boards is not None
+
+    @staticmethod
+    def _empty_boards() -> dict[Optional[GameMode], RankedBoard]:
+        boards: dict[Optional[GameMode], RankedBoard] = {
+            mode: RankedBoard() for mode in GameMode
+        }
+        boards[None] = RankedBoard()
+        return boards
+
+    def warm(self, session: Session) -> None:
+        """Build the index from the best score table."""
+        self.load(
+            session.execute(
+                select(
+                    PlayerModeBest.user_id,
+                    PlayerModeBest.username,
+                    PlayerModeBest.mode,
+                    PlayerModeBest.best_score,
+                    PlayerModeBest.best_score_at,
+                )
+            ).all()
+        )
+
+    def load(self, bests: Iterable[tuple]) -> None:
+        """
+        Build the index from best scores, given as (user_id, username, mode,
+        best_score, best_score_at) - e.g. rebuilt from the score event log.
+        """
+        boards = self._empty_boards()
+        for user_id, username, mode, best_score, best_score_at in bests:
+            for board in (boards[mode], boards[None]):
+                board.record(user_id, username, best_score, best_score_at)
+
+        with self._lock:
+            self._boards = boards
+
+    def reset(self) -> None:
+        """Drop all data and mark the index cold."""
+        with self._lock:
+            self._boards = None
+
+    def record_score(
+        self,
+        user_id: str,
+        username: str,
+        score: int,
+        mode: GameMode,
+        played_at: datetime,
+    ) -> None:
+        """Apply a committed score. No-op while the index is cold."""
+        with self._lock:
+            if self._boards is None:
+                return
+            self._boards[mode].record(user_id, username, score, played_at)
+            self._boards[None].record(user_id, username, score, played_at)
+
+    def get_rank(self, score: int, mode: GameMode) -> Optional[int]:
+        """Rank for a score in a mode, or None if the index is cold."""
+        with self._lock:
+            if self._boards is None:
+                return None
+            return self._boards[mode].rank(score)
+
+    def get_ranks(
+        self, scores: list[int], mode: GameMode
+    ) -> Optional[dict[int, int]]:
+        """Ranks for many scores in a mode, or None if the index is cold."""
+        with self._lock:
+            if self._boards is None:
+                return None
+            board = self._boards[mode]
+            return {score: board.rank(score) for score in set(scores)}
+
+    def get_leaderboard_around(
+        self, user_id: str, mode: Optional[GameMode], radius: int
+    ) -> Optional[tuple[int, list[dict]] | object]:
+        """
+        Player's rank and neighbours, NOT_ON_BOARD if the player has no
+        score on the board, or None if the index is cold.
+        """
+        with self._lock:
+            if self._boards is None:
+                return None
+            around = self._boards[mode].around(user_id, radius)
+            return NOT_ON_BOARD if around is None else around
+
+    def get_leaderboard(
+        self,
+        mode: Optional[GameMode],
+        limit: int,
+        offset: int,
+        after: Optional[tuple[int, str]] = None,
+    ) -> Optional[tuple[list[dict], int]]:
+        """Leaderboard page and total, or None if the index is cold."""
+        with self._lock:
+            if self._boards is None:
+                return None
+            board = self._boards[mode]
+            return board.page(limit, offset, after), len(board)
+
+
+# Global index instance
+leaderboard_index = LeaderboardIndex()
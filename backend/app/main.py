@@ -2,17 +2,239 @@
 Main FastAPI application.
 Snake Showdown API backend.
 """
-from fastapi import FastAPI
+import asyncio
+import logging
+import secrets
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, UTC
+
+from fastapi import Depends, FastAPI, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.auth import token_cache
+from app.background import run_periodically
 from app.config import settings
+from app.database import Database, user_cache
+from app.event_log import covers_history, score_event_log
+from app.ingest import score_ingest_queue
+from app.passwords import password_executor
+from app.journal import score_journal
+from app.rank_worker import rank_worker
+from app.leaderboard_index import leaderboard_index
+from app.projections import ModeBestsProjection, replay
+from app.rank_histogram import rank_histograms
+from app.revocation import token_revocations
 from app.routes import auth, game, player
 
+logger = logging.getLogger(__name__)
+
+
+def warm_leaderboard_index():
+    """Build the in-process leaderboard index, leaving it cold on failure."""
+    try:
+        # A log missing some of the history would leave those players off
+        # the board, and reads never fall back to SQL once the index is warm
+        if settings.score_event_log_warm_index:
+            if covers_history([settings.score_event_log_dir]):
+                warm_leaderboard_index_from_log()
+                return
+            logger.warning(
+                "Score event log %s does not hold the full score history; "
+                "warming the leaderboard index from the database",
+                settings.score_event_log_dir,
+            )
+        with Database() as database:
+            leaderboard_index.warm(database.session)
+    except Exception:
+        # Reads fall back to SQL while the index is cold
+        logger.exception("Failed to warm leaderboard index")
+
+
+def warm_leaderboard_index_from_log():
+    """Build the leaderboard index by replaying the score event log."""
+    bests = ModeBestsProjection()
+    replayed = replay([settings.score_event_log_dir], [bests])
+    leaderboard_index.load(
+        (
+            row["user_id"],
+            row["username"],
+            row["mode"],
+            row["best_score"],
+            row["best_score_at"],
+        )
+        for row in bests.rows()
+    )
+    logger.info(
+        "Warmed leaderboard index from %d score events in %.2fs",
+        replayed["events"],
+        replayed["seconds"],
+    )
+
+
+def warm_rank_histograms():
+    """Build the approximate rank histograms, leaving them cold on failure."""
+    try:
+        with Database() as database:
+            rank_histograms.warm(
+                database.session,
+                settings.rank_histogram_bucket_width,
+                settings.rank_histogram_max_score,
+            )
+    except Exception:
+        # Submissions fall back to exact ranks while the histograms are cold
+        logger.exception("Failed to warm rank histograms")
+
+
+def sync_token_revocations():
+    """Load tokens revoked by other workers since the last sync."""
+    with Database() as database:
+        token_revocations.sync(database)
+
+
+def purge_expired_revoked_tokens():
+    """Delete revocations of tokens that have expired anyway."""
+    with Database() as database:
+        purged = database.purge_expired_revoked_tokens()
+    if purged:
+        logger.info("Purged %d expired token revocations", purged)
+
+
+def purge_expired_window_bests():
+    """Roll expired day/week/month leaderboard buckets off."""
+    with Database() as database:
+        database.purge_expired_window_bests()
+
+
+def archive_scores():
+    """Roll scores past the retention horizon into daily summaries."""
+    cutoff = datetime.now(UTC) - timedelta(days=settings.score_archive_after_days)
+    with Database() as database:
+        archived = database.archive_scores(cutoff, settings.score_archive_batch_size)
+    if archived:
+        logger.info("Archived %d scores played before %s", archived, cutoff)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown."""
+    password_executor.start(
+        settings.password_executor_workers,
+        settings.password_executor_max_pending,
+        settings.password_executor_processes,
+    )
+
+    try:
+        sync_token_revocations()
+    except Exception:
+        # Logouts made before this start are picked up by the next sync
+        logger.exception("Failed to load token revocations")
+
+    if settings.score_event_log_enabled:
+        score_event_log.open(
+            settings.score_event_log_dir,
+            settings.score_event_log_segment_bytes,
+            settings.score_event_log_fsync,
+        )
+        try:
+            with Database() as database:
+                score_event_log.start_coverage(
+                    database.latest_score_id(), database.has_score_history()
+                )
+        except Exception:
+            # Without a recorded coverage the log is treated as partial
+            logger.exception("Failed to record score event log coverage")
+
+    if settings.leaderboard_index_enabled:
+        warm_leaderboard_index()
+    if settings.rank_approx_enabled:
+        warm_rank_histograms()
+
+    if settings.score_ingest_enabled:
+        score_ingest_queue.start(
+            settings.score_ingest_max_batch_size,
+            settings.score_ingest_max_delay_ms / 1000,
+        )
+
+    if settings.rank_deferred_enabled:
+        rank_worker.start(
+            settings.rank_worker_max_batch_size,
+            settings.rank_worker_max_delay_ms / 1000,
+            settings.rank_worker_cache_size,
+            settings.rank_worker_cache_ttl_seconds,
+        )
+
+    if settings.score_journal_enabled:
+        score_journal.start(
+            settings.score_journal_path,
+            settings.score_journal_batch_size,
+            settings.score_journal_retry_seconds,
+        )
+
+    tasks = []
+    if settings.token_revocation_sync_seconds > 0:
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(
+                    "sync_token_revocations",
+                    settings.token_revocation_sync_seconds,
+                    sync_token_revocations,
+                )
+            )
+        )
+    if settings.token_revocation_purge_interval_seconds > 0:
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(
+                    "purge_expired_revoked_tokens",
+                    settings.token_revocation_purge_interval_seconds,
+                    purge_expired_revoked_tokens,
+                )
+            )
+        )
+    if settings.leaderboard_window_purge_interval_seconds > 0:
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(
+                    "purge_expired_window_bests",
+                    settings.leaderboard_window_purge_interval_seconds,
+                    purge_expired_window_bests,
+                )
+            )
+        )
+    if settings.score_archive_interval_seconds > 0:
+        tasks.append(
+            asyncio.create_task(
+                run_periodically(
+                    "archive_scores",
+                    settings.score_archive_interval_seconds,
+                    archive_scores,
+                )
+            )
+        )
+
+    yield
+
+    # Flush queued submissions before anything they depend on is torn down;
+    # journaled ones not drained yet are replayed on the next start
+    await score_journal.stop()
+    await score_ingest_queue.stop()
+    await rank_worker.stop()
+    score_event_log.close()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    leaderboard_index.reset()
+    rank_histograms.reset()
+    password_executor.shutdown()
+
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.api_title,
     version=settings.api_version,
     description=settings.api_description,
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -46,6 +268,40 @@ async def health():
     return {"status": "healthy"}
 
 
+metrics_security = HTTPBearer(auto_error=False)
+
+
+def require_metrics_token(
+    credentials: HTTPAuthorizationCredentials = Depends(metrics_security),
+):
+    """Only serve metrics to scrapers bearing settings.metrics_token."""
+    if not settings.metrics_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    if credentials is None or not secrets.compare_digest(
+        credentials.credentials.encode("utf-8"), settings.metrics_token.encode("utf-8")
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid metrics token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@app.get(
+    "/metrics",
+    include_in_schema=False,
+    dependencies=[Depends(require_metrics_token)],
+)
+async def metrics():
+    """In-process counters for this worker."""
+    return {
+        "password_executor": password_executor.stats(),
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "token_revocations": token_revocations.stats(),
+    }
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=3000)
@@ -14,6 +14,13 @@ class GameMode(str, Enum):
     PASSTHROUGH = "passthrough"
 
 
+class LeaderboardWindow(str, Enum):
+    """Leaderboard time window."""
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
 class Direction(str, Enum):
     """Snake direction."""
     UP = "UP"
@@ -99,14 +106,53 @@ class ScoreSubmission(BaseModel):
 
 
 class ScoreResponse(BaseModel):
-    """Score submission response."""
+    """
+    Score submission response.
+    rankPending means rank is null and can be fetched later from
+    GET /game/score/{scoreId}/rank. Scores accepted into the local journal
+    are not written yet: they have no scoreId and isNewHighScore is false.
+    """
     message: str
+    score_id: Optional[int] = Field(default=None, alias="scoreId")
+    is_new_high_score: bool = Field(alias="isNewHighScore")
+    rank: Optional[int] = None
+    rank_is_approximate: bool = Field(default=False, alias="rankApproximate")
+    rank_pending: bool = Field(default=False, alias="rankPending")
+    percentile: Optional[float] = None
+    
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+
+class ScoreRankResponse(BaseModel):
+    """Rank of a submitted score, or rankPending while it is being computed."""
+    score_id: int = Field(alias="scoreId")
+    rank: Optional[int] = None
+    rank_pending: bool = Field(default=False, alias="rankPending")
+    
+    model_config = ConfigDict(from_attributes=True, populate_by_name=True)
+
+
+class ScoreBatchSubmission(BaseModel):
+    """Scores played offline or buffered by the client, in play order."""
+    scores: list[ScoreSubmission] = Field(min_length=1, max_length=100)
+
+
+class ScoreBatchResult(BaseModel):
+    """Outcome of one score in a batch submission."""
     is_new_high_score: bool = Field(alias="isNewHighScore")
     rank: int
+    rank_is_approximate: bool = Field(default=False, alias="rankApproximate")
+    percentile: Optional[float] = None
     
     model_config = ConfigDict(from_attributes=True, populate_by_name=True)
 
 
+class ScoreBatchResponse(BaseModel):
+    """Batch score submission response."""
+    message: str
+    results: list[ScoreBatchResult]
+
+
 class LeaderboardEntry(BaseModel):
     """Leaderboard entry."""
     rank: int = Field(ge=1)
@@ -121,6 +167,15 @@ class LeaderboardResponse(BaseModel):
     """Leaderboard response."""
     entries: list[LeaderboardEntry]
     total: int
+    next_cursor: Optional[str] = Field(default=None, alias="nextCursor")
+    
+    model_config = ConfigDict(populate_by_name=True)
+
+
+class AroundMeResponse(BaseModel):
+    """Leaderboard entries around the current player."""
+    rank: int = Field(ge=1)
+    entries: list[LeaderboardEntry]
 
 
 class LiveGame(BaseModel):
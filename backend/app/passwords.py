@@ -0,0 +1,163 @@
+"""
+Password hashing and verification.
+bcrypt is deliberately slow - a hash or check costs a few hundred
+milliseconds of CPU - so async routes hand it to a dedicated, bounded
+executor instead of running it on the event loop thread, where it would
+stall every other request on the worker. bcrypt releases the GIL while it
+works, so a thread pool runs checks in parallel; a process pool is
+available for bcrypt builds that do not.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional
+
+import bcrypt
+
+from app.config import settings
+
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    """Hash a password with a fresh salt at the configured cost."""
+    salt = bcrypt.gensalt(rounds=rounds or settings.bcrypt_rounds)
+    return bcrypt.hashpw(password.encode("utf-8"), salt).decode("utf-8")
+
+
+def check_password(password: str, password_hash: str) -> bool:
+    """Check a password against a stored hash."""
+    return bcrypt.checkpw(password.encode("utf-8"), password_hash.encode("utf-8"))
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """
+    Whether a stored hash was made at a cost other than the configured one.
+    bcrypt hashes read $2b$<cost>$<salt and digest>.
+    """
+    try:
+        return int(password_hash.split("$")[2]) != settings.bcrypt_rounds
+    except (IndexError, ValueError):
+        return True
+
+
+class PasswordExecutorBusy(Exception):
+    """Raised when too much password work is already waiting."""
+
+
+class PasswordExecutor:
+    """
+    Bounded pool for password work. At most max_pending operations are
+    queued or running at once; beyond that callers are turned away at once
+    rather than piling up behind a login storm.
+    """
+
+    def __init__(self):
+        self.workers = 4
+        self.max_pending = 64
+        self.use_processes = False
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._busy_seconds = 0.0
+
+    @property
+    def is_running(self) -> bool:
+        return self._executor is not None
+
+    def start(self, workers: int, max_pending: int, use_processes: bool = False):
+        """
+        Create the pool.
+
+        Args:
+            workers: Threads (or processes) hashing in parallel
+            max_pending: Most operations queued or running at once
+            use_processes: Use a process pool instead of threads
+        """
+        if self._executor is not None:
+            raise RuntimeError("Password executor is already running")
+        self.workers = workers
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+        self._executor = self._create_executor()
+
+    def shutdown(self):
+        """Wait for running operations and release the pool."""
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    async def hash(self, password: str) -> str:
+        """Hash a password on the pool."""
+        # Pass the cost along: a process pool may not share settings
+        return await self._run(hash_password, password, settings.bcrypt_rounds)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        """Check a password on the pool."""
+        return await self._run(check_password, password, password_hash)
+
+    def stats(self) -> dict:
+        """Queue depth and throughput counters."""
+        return {
+            "workers": self.workers,
+            "processes": self.use_processes,
+            "pending": self.pending,
+            "peak_pending": self.peak_pending,
+            "max_pending": self.max_pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "average_ms": (
+                round(self._busy_seconds / self.completed * 1000, 1)
+                if self.completed else None
+            ),
+        }
+
+    def reset_stats(self):
+        """Reset counters (the pool keeps running)."""
+        with self._lock:
+            self.peak_pending = self.pending
+            self.completed = 0
+            self.rejected = 0
+            self._busy_seconds = 0.0
+
+    async def _run(self, function: Callable, *args):
+        """
+        Run one operation on the pool, creating it with the defaults if it
+        was never started (e.g. outside the app lifespan).
+
+        Raises:
+            PasswordExecutorBusy: If max_pending operations are in flight
+        """
+        with self._lock:
+            if self.pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordExecutorBusy("Too many password operations in progress")
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+            if self._executor is None:
+                self._executor = self._create_executor()
+            executor = self._executor
+
+        submitted = time.perf_counter()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(
+                executor, function, *args
+            )
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+                self._busy_seconds += time.perf_counter() - submitted
+
+    def _create_executor(self) -> Executor:
+        if self.use_processes:
+            return ProcessPoolExecutor(max_workers=self.workers)
+        return ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="password"
+        )
+
+
+# Global password executor instance
+password_executor = PasswordExecutor()
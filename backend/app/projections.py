@@ -0,0 +1,115 @@
+"""
+Derived score state rebuilt by replaying the score event log (app.event_log).
+Each projection folds events into the rows of one derived table. Folding is
+order-independent - bests keep the earliest game to reach them, counts add
+up - so segments from several API workers' logs can be replayed one after
+another.
+"""
+import time
+from datetime import datetime, UTC
+from typing import Iterable, Optional
+
+from app.database import window_start
+from app.event_log import ScoreEvent, read_events
+from app.models import GameMode, LeaderboardWindow
+
+
+def _improves(best: Optional[dict], event: ScoreEvent) -> bool:
+    """Whether an event beats a best score row (ties go to the earlier game)."""
+    return best is None or event.score > best["best_score"] or (
+        event.score == best["best_score"] and event.played_at < best["best_score_at"]
+    )
+
+
+class PlayerStatsProjection:
+    """Games played and high score per player (the players table)."""
+
+    def __init__(self):
+        self.players: dict[str, dict] = {}
+
+    def apply(self, event: ScoreEvent):
+        player = self.players.get(event.user_id)
+        if player is None:
+            self.players[event.user_id] = {
+                "id": event.user_id,
+                "games_played": event.games,
+                "high_score": event.score,
+            }
+            return
+        player["games_played"] += event.games
+        player["high_score"] = max(player["high_score"], event.score)
+
+    def rows(self) -> list[dict]:
+        return list(self.players.values())
+
+
+class ModeBestsProjection:
+    """Best score per player and mode (player_mode_bests, the all-time boards)."""
+
+    def __init__(self):
+        self.bests: dict[tuple[str, GameMode], dict] = {}
+
+    def apply(self, event: ScoreEvent):
+        key = (event.user_id, event.mode)
+        if _improves(self.bests.get(key), event):
+            self.bests[key] = {
+                "user_id": event.user_id,
+                "mode": event.mode,
+                "username": event.username,
+                "best_score": event.score,
+                "best_score_at": event.played_at,
+            }
+
+    def rows(self) -> list[dict]:
+        return list(self.bests.values())
+
+
+class WindowBestsProjection:
+    """Best score per player and mode in the current day/week/month buckets."""
+
+    def __init__(self, now: Optional[datetime] = None):
+        now = now or datetime.now(UTC)
+        self.bucket_starts = {window: window_start(window, now) for window in LeaderboardWindow}
+        # The week can start in the previous month and the month in the
+        # previous week: anything before the earliest bucket is skipped
+        self.since = min(self.bucket_starts.values())
+        self.bests: dict[tuple, dict] = {}
+
+    def apply(self, event: ScoreEvent):
+        if event.played_at < self.since:
+            return
+        for window, bucket_start in self.bucket_starts.items():
+            if event.played_at < bucket_start:
+                continue
+            key = (window, event.user_id, event.mode)
+            if _improves(self.bests.get(key), event):
+                self.bests[key] = {
+                    "period": window,
+                    "bucket_start": bucket_start,
+                    "user_id": event.user_id,
+                    "mode": event.mode,
+                    "username": event.username,
+                    "best_score": event.score,
+                    "best_score_at": event.played_at,
+                }
+
+    def rows(self) -> list[dict]:
+        return list(self.bests.values())
+
+
+def replay(directories: Iterable[str], projections: list) -> dict:
+    """
+    Fold every event in one or more logs into projections.
+
+    Returns:
+        Dict with the number of events replayed and the seconds it took
+    """
+    started = time.perf_counter()
+    appliers = [projection.apply for projection in projections]
+    events = 0
+    for directory in directories:
+        for event in read_events(directory):
+            for apply in appliers:
+                apply(event)
+            events += 1
+    return {"events": events, "seconds": time.perf_counter() - started}
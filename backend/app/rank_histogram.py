@@ -0,0 +1,150 @@
+"""
+Approximate ranking from per-mode score histograms.
+Counts each player's best score per game mode in fixed-width buckets held in
+a Fenwick tree, so rank and percentile cost O(log S) in the number of buckets
+no matter how many players there are. Ranks are exact to the bucket and
+interpolated inside it.
+
+Like the leaderboard index this is process-local: it is built at startup and
+updated by Database.add_score.
+"""
+import threading
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db_models import PlayerModeBest
+from app.models import GameMode
+
+
+class FenwickTree:
+    """Binary indexed tree over counts with O(log n) update and prefix sum."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self._tree = [0] * (size + 1)
+
+    def add(self, index: int, delta: int):
+        """Add delta to the count at zero-based index."""
+        i = index + 1
+        while i <= self.size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index: int) -> int:
+        """Sum of counts at zero-based positions 0..index inclusive."""
+        total = 0
+        i = min(index, self.size - 1) + 1
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+
+class ScoreHistogram:
+    """Fixed-width bucket counts of player best scores for one mode."""
+
+    def __init__(self, bucket_width: int, max_score: int):
+        """
+        Initialize histogram.
+
+        Args:
+            bucket_width: Score range covered by each bucket
+            max_score: Scores at or above this share the last bucket
+        """
+        self.bucket_width = bucket_width
+        self._buckets = max_score // bucket_width + 1
+        self._tree = FenwickTree(self._buckets)
+        self.total = 0
+
+    def _bucket(self, score: int) -> int:
+        return min(score // self.bucket_width, self._buckets - 1)
+
+    def _count(self, bucket: int) -> int:
+        below = self._tree.prefix_sum(bucket - 1) if bucket > 0 else 0
+        return self._tree.prefix_sum(bucket) - below
+
+    def move(self, previous_best: Optional[int], new_best: int):
+        """Move a player from their previous best (None if new) to new_best."""
+        if previous_best is None:
+            self.total += 1
+        else:
+            self._tree.add(self._bucket(previous_best), -1)
+        self._tree.add(self._bucket(new_best), 1)
+
+    def rank(self, score: int) -> tuple[int, float]:
+        """
+        Approximate rank and percentile for a score.
+
+        Returns:
+            Tuple of (rank, percentile), where percentile is the share of
+            players whose best is not above the score
+        """
+        bucket = self._bucket(score)
+        above = self.total - self._tree.prefix_sum(bucket)
+
+        # Assume scores are spread evenly inside the score's own bucket,
+        # rounding down so a player's own best never counts against them
+        if bucket < self._buckets - 1:
+            bucket_top = (bucket + 1) * self.bucket_width - 1
+            share_above = (bucket_top - score) / self.bucket_width
+            above += int(self._count(bucket) * share_above)
+
+        percentile = 100.0 * (self.total - above) / self.total if self.total else 100.0
+        return above + 1, percentile
+
+
+class RankHistograms:
+    """Score histograms for every game mode."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms: Optional[dict[GameMode, ScoreHistogram]] = None
+
+    @property
+    def is_warm(self) -> bool:
+        """Whether the histograms have been built."""
+        return self._histograms is not None
+
+    def warm(self, session: Session, bucket_width: int, max_score: int):
+        """Build the histograms from the best score table."""
+        histograms = {mode: ScoreHistogram(bucket_width, max_score) for mode in GameMode}
+        rows = session.execute(
+            select(PlayerModeBest.mode, PlayerModeBest.best_score)
+        ).all()
+        for row in rows:
+            histograms[row.mode].move(None, row.best_score)
+
+        with self._lock:
+            self._histograms = histograms
+
+    def reset(self):
+        """Drop all data and mark the histograms cold."""
+        with self._lock:
+            self._histograms = None
+
+    def record_best(self, mode: GameMode, previous_best: Optional[int], new_best: int):
+        """Apply a committed best score change. No-op while cold."""
+        with self._lock:
+            if self._histograms is None:
+                return
+            self._histograms[mode].move(previous_best, new_best)
+
+    def player_count(self, mode: GameMode) -> int:
+        """Number of players with a best score in a mode (0 while cold)."""
+        with self._lock:
+            if self._histograms is None:
+                return 0
+            return self._histograms[mode].total
+
+    def get_rank(self, score: int, mode: GameMode) -> Optional[tuple[int, float]]:
+        """Approximate (rank, percentile), or None if the histograms are cold."""
+        with self._lock:
+            if self._histograms is None:
+                return None
+            return self._histograms[mode].rank(score)
+
+
+# Global histogram instance
+rank_histograms = RankHistograms()
@@ -0,0 +1,167 @@
+"""
+Deferred rank computation for score submissions.
+In deferred-rank mode a submission returns as soon as its score is committed,
+with rankPending set. This worker collects pending scores and ranks them in
+batches - one Database.get_ranks pass per mode for the whole batch - and
+keeps the ranks for GET /api/game/score/{id}/rank.
+"""
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from app.cache import LRUCache
+from app.database import Database, SessionLocal
+from app.models import GameMode
+
+logger = logging.getLogger(__name__)
+
+
+class RankWorker:
+    """Ranks committed scores in the background, in batches."""
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session_factory: Callable[[], Session] = SessionLocal
+        # Queued score ids and the player each belongs to
+        self._pending: dict[int, str] = {}
+        # Ranked score ids, stored as (user_id, rank)
+        self.ranks = LRUCache(100000)
+        self.max_batch_size = 500
+        self.max_delay_seconds = 0.02
+        self.batches_ranked = 0
+        self.scores_ranked = 0
+
+    @property
+    def is_running(self) -> bool:
+        """Whether submissions should leave their rank to the worker."""
+        return self._worker is not None
+
+    def start(
+        self,
+        max_batch_size: int,
+        max_delay_seconds: float,
+        cache_size: int,
+        cache_ttl_seconds: float,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        """
+        Start the worker task on the running event loop.
+
+        Args:
+            max_batch_size: Most scores ranked in one pass
+            max_delay_seconds: Longest a score waits for its batch to fill
+            cache_size: Most computed ranks kept for the rank endpoint
+            cache_ttl_seconds: How long a computed rank is kept
+            session_factory: Creates the session each batch is ranked with
+        """
+        if self._worker is not None:
+            raise RuntimeError("Rank worker is already running")
+        self.max_batch_size = max_batch_size
+        self.max_delay_seconds = max_delay_seconds
+        self.ranks = LRUCache(cache_size, cache_ttl_seconds)
+        self._session_factory = session_factory
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop accepting scores and wait until queued ones are ranked."""
+        if self._worker is None:
+            return
+        worker, self._worker = self._worker, None
+        self._queue.put_nowait(None)
+        await worker
+        self._loop = None
+
+    def submit(self, score_id: int, user_id: str, score: int, mode: GameMode):
+        """Queue a committed score for ranking. Safe to call from any thread."""
+        if self._worker is None:
+            raise RuntimeError("Rank worker is not running")
+        self._pending[score_id] = user_id
+        self._loop.call_soon_threadsafe(
+            self._queue.put_nowait, (score_id, user_id, score, mode)
+        )
+
+    def lookup(self, score_id: int, user_id: str) -> Optional[dict]:
+        """
+        Rank state of a player's score known to this worker.
+
+        Returns:
+            Dict with rank and rank_pending, or None if the score was never
+            queued here or its rank has expired
+        """
+        ranked = self.ranks.get(score_id)
+        if ranked is not None and ranked[0] == user_id:
+            return {"rank": ranked[1], "rank_pending": False}
+        if self._pending.get(score_id) == user_id:
+            return {"rank": None, "rank_pending": True}
+        return None
+
+    async def _run(self):
+        """Collect queued scores into batches and rank them until stopped."""
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is None:
+                break
+
+            # Wait briefly for more scores to share the pass
+            batch = [item]
+            deadline = loop.time() + self.max_delay_seconds
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            await self._rank(batch)
+
+    def _rank_batch(self, batch: list[tuple]) -> dict[int, int]:
+        """Rank one batch (runs in a worker thread); returns score_id -> rank."""
+        by_mode: dict[GameMode, list[tuple[int, int]]] = {}
+        for score_id, _, score, mode in batch:
+            by_mode.setdefault(mode, []).append((score_id, score))
+
+        session = self._session_factory()
+        try:
+            database = Database(session)
+            ranks = {}
+            for mode, scores in by_mode.items():
+                mode_ranks = database.get_ranks([score for _, score in scores], mode)
+                for score_id, score in scores:
+                    ranks[score_id] = mode_ranks[score]
+            return ranks
+        finally:
+            session.close()
+
+    async def _rank(self, batch: list[tuple]):
+        """Rank a batch and publish the results."""
+        try:
+            ranks = await asyncio.to_thread(self._rank_batch, batch)
+            self.batches_ranked += 1
+            self.scores_ranked += len(batch)
+        except Exception:
+            # The rank endpoint computes these on demand instead
+            logger.exception("Failed to rank a batch of %d scores", len(batch))
+            ranks = {}
+
+        for score_id, user_id, _, _ in batch:
+            if score_id in ranks:
+                self.ranks.set(score_id, (user_id, ranks[score_id]))
+            self._pending.pop(score_id, None)
+
+
+# Global rank worker instance
+rank_worker = RankWorker()
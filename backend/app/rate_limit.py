@@ -0,0 +1,125 @@
+"""
+Per-user request throttling with in-memory token buckets.
+"""
+import math
+import threading
+import time
+from typing import Hashable, Optional
+
+from fastapi import Depends, Header, HTTPException, status
+from fastapi.security import HTTPAuthorizationCredentials
+
+from app.auth import decode_token, security
+from app.cache import LRUCache
+from app.config import settings
+from app.services.game_service import idempotency_cache
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket per key: holds up to burst tokens, refilled continuously at
+    rate tokens per second, and each request takes one per item it carries.
+    A request costing more than burst is let through on a full bucket and
+    leaves it in debt, so the rate holds for large requests too. Buckets are kept in
+    an LRU so memory stays constant; an evicted bucket comes back full,
+    which only ever errs toward letting a request through.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int):
+        """
+        Initialize limiter.
+
+        Args:
+            rate: Tokens added per second
+            burst: Most tokens a bucket holds
+            max_keys: Most buckets kept
+        """
+        self.rate = rate
+        self.burst = burst
+        # key -> (tokens, monotonic time they were counted at)
+        self._buckets = LRUCache(max_keys)
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = 0
+
+    def acquire(self, key: Hashable, cost: int = 1) -> float:
+        """
+        Take tokens from a key's bucket.
+
+        Args:
+            key: Bucket to take from
+            cost: Tokens the request takes
+
+        Returns:
+            0 if the request may proceed, otherwise seconds until enough
+            tokens are available
+        """
+        needed = min(cost, self.burst)
+        now = time.monotonic()
+        with self._lock:
+            tokens, counted_at = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - counted_at) * self.rate)
+            if tokens >= needed:
+                self._buckets.set(key, (tokens - cost, now))
+                self.allowed += 1
+                return 0.0
+            self._buckets.set(key, (tokens, now))
+            self.rejected += 1
+            return (needed - tokens) / self.rate
+
+    def clear(self):
+        """Forget every bucket and reset counters."""
+        with self._lock:
+            self._buckets.clear()
+            self.allowed = 0
+            self.rejected = 0
+
+
+# Global limiter for score submissions
+score_submission_limiter = TokenBucketLimiter(
+    settings.score_rate_limit_per_second,
+    settings.score_rate_limit_burst,
+    settings.score_rate_limit_max_users,
+)
+
+
+def throttle_score_submissions(user_id: str, scores: int = 1):
+    """
+    Reject a player submitting scores faster than the configured rate.
+
+    Args:
+        user_id: Submitting player
+        scores: Scores in the request, each taking a token
+
+    Raises:
+        HTTPException: 429 with Retry-After when the player's bucket is empty
+    """
+    if not settings.score_rate_limit_enabled:
+        return
+
+    retry_after = score_submission_limiter.acquire(user_id, scores)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many score submissions, slow down",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def limit_score_submissions(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+):
+    """
+    Throttle single score submissions before any database work, including
+    the user lookup; keyed by the token's subject, and bad tokens fail here
+    as they would there. Retries of a submission already answered are
+    served from the idempotency cache without taking a token.
+    """
+    if not settings.score_rate_limit_enabled:
+        return
+
+    user_id = decode_token(credentials.credentials).get("sub")
+    if idempotency_key and idempotency_cache.get((user_id, idempotency_key)) is not None:
+        return
+    throttle_score_submissions(user_id)
@@ -0,0 +1,100 @@
+"""
+Revoked access tokens.
+Logout records a token's jti in the revoked_tokens table and in this
+process's in-memory set, which get_current_user checks with one dict lookup
+- no query per request. Other API workers pick revocations up by polling
+the table (sync), so a token logged out on one worker is rejected by the
+rest within token_revocation_sync_seconds. Entries are dropped once the
+token would have expired anyway, which keeps the set to recent logouts.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, UTC
+from typing import Optional
+
+from app.database import Database
+
+# Re-read this far before the newest revocation seen, so rows committed
+# late (a slow transaction, another worker's clock running behind) are not
+# skipped
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def _unix_time(at: datetime) -> float:
+    """Seconds since the epoch; naive datetimes are UTC, as stored."""
+    return (at if at.tzinfo else at.replace(tzinfo=UTC)).timestamp()
+
+
+class TokenRevocationList:
+    """jti of every revoked token that has not expired yet, with its expiry."""
+
+    def __init__(self):
+        self._expiry: dict[str, float] = {}
+        self._lock = threading.Lock()
+        # Newest revoked_at loaded from the database
+        self._synced_through: Optional[datetime] = None
+        self.rejected = 0
+        self.syncs = 0
+
+    def __len__(self) -> int:
+        return len(self._expiry)
+
+    def is_revoked(self, jti: Optional[str]) -> bool:
+        """Whether a token has been revoked (tokens without a jti never are)."""
+        if jti is None or jti not in self._expiry:
+            return False
+        self.rejected += 1
+        return True
+
+    def add(self, jti: str, expires_at: datetime):
+        """Revoke a token in this process."""
+        with self._lock:
+            self._expiry[jti] = _unix_time(expires_at)
+
+    def sync(self, database: Database) -> int:
+        """
+        Load revocations made since the last sync (by any worker) and drop
+        expired ones.
+
+        Returns:
+            Number of revocations read
+        """
+        since = self._synced_through - SYNC_OVERLAP if self._synced_through else None
+        rows = database.get_revoked_tokens(since)
+        with self._lock:
+            for row in rows:
+                self._expiry[row["jti"]] = _unix_time(row["expires_at"])
+                if self._synced_through is None or row["revoked_at"] > self._synced_through:
+                    self._synced_through = row["revoked_at"]
+            self.syncs += 1
+        self.purge()
+        return len(rows)
+
+    def purge(self, now: Optional[float] = None) -> int:
+        """Forget tokens that have expired; returns how many."""
+        now = now or time.time()
+        with self._lock:
+            expired = [jti for jti, expiry in self._expiry.items() if expiry <= now]
+            for jti in expired:
+                del self._expiry[jti]
+        return len(expired)
+
+    def clear(self):
+        """Forget every revocation and reset counters."""
+        with self._lock:
+            self._expiry.clear()
+            self._synced_through = None
+            self.rejected = 0
+            self.syncs = 0
+
+    def stats(self) -> dict:
+        """Size and counters."""
+        return {
+            "size": len(self._expiry),
+            "rejected": self.rejected,
+            "syncs": self.syncs,
+        }
+
+
+# Global revocation list for access tokens
+token_revocations = TokenRevocationList()
@@ -2,16 +2,27 @@
 Authentication route handlers.
 """
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.security import HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from app.models import SignupRequest, LoginRequest, AuthResponse, AuthUser, ErrorResponse
 from app.services.auth_service import AuthService
-from app.auth import get_current_user
+from app.auth import decode_token, get_current_user, security
 from app.database import get_db
+from app.passwords import PasswordExecutorBusy
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
+def password_executor_busy() -> HTTPException:
+    """503 for a signup or login turned away by the password executor."""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins in progress, try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 @router.post(
     "/signup",
     response_model=AuthResponse,
@@ -19,13 +30,18 @@ router = APIRouter(prefix="/auth", tags=["Authentication"])
     responses={
         400: {"model": ErrorResponse},
         409: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
     }
 )
 async def signup(request: SignupRequest, db: Session = Depends(get_db)):
     """Register a new user."""
     try:
-        return AuthService.signup(request.email, request.username, request.password, db)
+        return await AuthService.signup(
+            request.email, request.username, request.password, db
+        )
     
+    except PasswordExecutorBusy:
+        raise password_executor_busy()
     except ValueError as e:
         error_msg = str(e)
         if "Email already exists" in error_msg:
@@ -50,11 +66,15 @@ async def signup(request: SignupRequest, db: Session = Depends(get_db)):
     responses={
         400: {"model": ErrorResponse},
         401: {"model": ErrorResponse},
+        503: {"model": ErrorResponse},
     }
 )
 async def login(request: LoginRequest, db: Session = Depends(get_db)):
     """Authenticate a user."""
-    user, error = AuthService.login(request.email, request.password, db)
+    try:
+        user, error = await AuthService.login(request.email, request.password, db)
+    except PasswordExecutorBusy:
+        raise password_executor_busy()
     
     if error:
         raise HTTPException(
@@ -72,8 +92,15 @@ async def login(request: LoginRequest, db: Session = Depends(get_db)):
         401: {"model": ErrorResponse},
     }
 )
-async def logout(current_user: dict = Depends(get_current_user)):
-    """Logout user (invalidate token)."""
+async def logout(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Logout user (revoke the token the request was made with)."""
+    # Already verified by get_current_user, so this is a cache hit
+    payload = decode_token(credentials.credentials)
+    AuthService.logout(payload, db)
     return {"message": "Successfully logged out"}
 
 
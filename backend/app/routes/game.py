@@ -2,24 +2,41 @@
 Game route handlers.
 """
 from typing import Optional
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Header, Query, Request, Response
 from sqlalchemy.orm import Session
 
 from app.models import (
+    AroundMeResponse,
     ScoreSubmission,
     ScoreResponse,
+    ScoreRankResponse,
+    ScoreBatchSubmission,
+    ScoreBatchResponse,
     LeaderboardResponse,
     LiveGame,
     GameMode,
+    LeaderboardWindow,
     ErrorResponse,
 )
 from app.services.game_service import GameService
 from app.auth import get_current_user
+from app.config import settings
 from app.database import get_db
+from app.ingest import score_ingest_queue
+from app.journal import score_journal
+from app.rate_limit import limit_score_submissions, throttle_score_submissions
 
 router = APIRouter(prefix="/game", tags=["Game"])
 
 
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in [tag.removeprefix("W/") for tag in candidates]
+
+
 @router.post(
     "/score",
     response_model=ScoreResponse,
@@ -27,16 +44,91 @@ router = APIRouter(prefix="/game", tags=["Game"])
     responses={
         400: {"model": ErrorResponse},
         401: {"model": ErrorResponse},
-    }
+        429: {"model": ErrorResponse},
+    },
+    # Throttle before the user lookup and the write
+    dependencies=[Depends(limit_score_submissions)]
 )
 async def submit_score(
     submission: ScoreSubmission,
+    idempotency_key: Optional[str] = Header(
+        None,
+        alias="Idempotency-Key",
+        min_length=1,
+        max_length=64,
+        description="Unique per game; retries with the same key are only recorded once"
+    ),
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Submit a game score."""
+    """
+    Submit a game score.
+    Retries sent with the same Idempotency-Key return the original response.
+    """
     try:
-        return GameService.submit_score(current_user["id"], submission.score, submission.mode, db)
+        if score_journal.is_running:
+            return await GameService.submit_score_journaled(
+                current_user["id"], submission.score, submission.mode, idempotency_key
+            )
+        if score_ingest_queue.is_running:
+            return await GameService.submit_score_queued(
+                current_user["id"], submission.score, submission.mode, idempotency_key
+            )
+        return GameService.submit_score(
+            current_user["id"], submission.score, submission.mode, db, idempotency_key
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
+@router.get(
+    "/score/{score_id}/rank",
+    response_model=ScoreRankResponse,
+    responses={
+        401: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+    }
+)
+async def get_score_rank(
+    score_id: int,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the rank of a submitted score, for submissions answered with rankPending."""
+    result = GameService.get_score_rank(current_user["id"], score_id, db)
+    
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Score not found"
+        )
+    
+    return result
+
+
+@router.post(
+    "/scores:batch",
+    response_model=ScoreBatchResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={
+        400: {"model": ErrorResponse},
+        401: {"model": ErrorResponse},
+        429: {"model": ErrorResponse},
+    }
+)
+async def submit_score_batch(
+    batch: ScoreBatchSubmission,
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Submit several game scores, e.g. games played offline."""
+    # Each score takes a token, as if submitted one by one
+    throttle_score_submissions(current_user["id"], len(batch.scores))
+    try:
+        return GameService.submit_score_batch(current_user["id"], batch.scores, db)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -48,17 +140,76 @@ async def submit_score(
     "/leaderboard",
     response_model=LeaderboardResponse,
     responses={
+        304: {"description": "Leaderboard unchanged since the given ETag"},
         400: {"model": ErrorResponse},
     }
 )
 async def get_leaderboard(
+    request: Request,
     mode: Optional[GameMode] = Query(None, description="Filter by game mode"),
+    window: Optional[LeaderboardWindow] = Query(
+        None, description="Only rank scores from the current day, week or month"
+    ),
     limit: int = Query(10, ge=1, le=100, description="Maximum entries to return"),
     offset: int = Query(0, ge=0, description="Pagination offset"),
+    after: Optional[str] = Query(
+        None, description="Cursor from nextCursor; continues after that entry"
+    ),
     db: Session = Depends(get_db)
 ):
-    """Get leaderboard rankings."""
-    return GameService.get_leaderboard(mode, limit, offset, db)
+    """
+    Get leaderboard rankings.
+    The body is served pre-serialized from the page cache, so it bypasses
+    response_model validation; response_model documents the schema.
+    """
+    try:
+        body, etag = GameService.get_leaderboard_cached(
+            mode, limit, offset, db, after, window
+        )
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    headers = {
+        "ETag": etag,
+        "Cache-Control": (
+            f"public, max-age={settings.leaderboard_max_age_seconds}, "
+            f"stale-while-revalidate={settings.leaderboard_stale_while_revalidate_seconds}"
+        ),
+    }
+    
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get(
+    "/leaderboard/around-me",
+    response_model=AroundMeResponse,
+    responses={
+        401: {"model": ErrorResponse},
+        404: {"model": ErrorResponse},
+    }
+)
+async def get_leaderboard_around_me(
+    mode: Optional[GameMode] = Query(None, description="Filter by game mode"),
+    radius: int = Query(5, ge=1, le=25, description="Players to show above and below"),
+    current_user: dict = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Get the current player's rank and the players around them."""
+    result = GameService.get_leaderboard_around(current_user["id"], mode, radius, db)
+    
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No score on this leaderboard yet"
+        )
+    
+    return result
 
 
 @router.get(
@@ -0,0 +1,143 @@
+"""
+Score event log tool.
+Run with: uv run python app/score_events.py bootstrap
+      or: uv run python app/score_events.py rebuild [--log-dir DIR ...] [--dry-run] [--force]
+
+bootstrap writes the stored score history into an empty log, so the log
+covers games played before it was enabled. rebuild replays logs into the
+player stats, best score and window best tables, for the players that
+have events in them; anyone else is left as stored. When API workers keep
+separate logs, bootstrap only one of them, before the others are started.
+
+rebuild refuses logs that do not hold the full history (see
+app.event_log.covers_history) - replaying them would overwrite players'
+stats with those of their logged games only - unless --force is given.
+"""
+import argparse
+import sys
+from itertools import islice
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.config import settings
+from app.database import Database
+from app.event_log import ScoreEventLog, covers_history, write_coverage
+from app.projections import (
+    ModeBestsProjection,
+    PlayerStatsProjection,
+    WindowBestsProjection,
+    replay,
+)
+
+
+def bootstrap(log_dir: str, batch_size: int):
+    """Export the score history into an empty event log."""
+    log = ScoreEventLog()
+    log.open(log_dir, settings.score_event_log_segment_bytes, fsync=True)
+    try:
+        if log.next_sequence:
+            print(f"❌ {log_dir} already holds {log.next_sequence} events")
+            sys.exit(1)
+
+        print(f"📦 Writing score history to {log_dir}...")
+        latest_score_id = 0
+        with Database() as database:
+            events = database.iter_score_events(batch_size)
+            while batch := list(islice(events, batch_size)):
+                log.append(batch)
+                latest_score_id = max(latest_score_id, batch[-1].score_id)
+        # Only now that every stored score is in the log
+        write_coverage(log_dir, complete=True, score_id=latest_score_id)
+        print(f"✅ Wrote {log.events_written} events")
+    finally:
+        log.close()
+
+
+def rebuild(log_dirs: list[str], dry_run: bool, force: bool):
+    """Replay event logs and load the projections into the database."""
+    complete = covers_history(log_dirs)
+    if not complete and not force and not dry_run:
+        print(
+            f"❌ {', '.join(log_dirs)} do not hold the full score history; "
+            "bootstrap a log first, or pass --force to rebuild the logged "
+            "players from their logged games only"
+        )
+        sys.exit(1)
+
+    stats = PlayerStatsProjection()
+    mode_bests = ModeBestsProjection()
+    window_bests = WindowBestsProjection()
+
+    print(f"🔁 Replaying {', '.join(log_dirs)}...")
+    replayed = replay(log_dirs, [stats, mode_bests, window_bests])
+    rate = replayed["events"] / replayed["seconds"] if replayed["seconds"] else 0
+    print(
+        f"✅ Replayed {replayed['events']} events in {replayed['seconds']:.2f}s "
+        f"({rate:,.0f} events/s): {len(stats.players)} players, "
+        f"{len(mode_bests.bests)} mode bests, {len(window_bests.bests)} window bests"
+    )
+    if not complete:
+        print("⚠️  The logs do not hold the full score history")
+    if dry_run:
+        return
+
+    with Database() as database:
+        database.load_projections(stats.rows(), mode_bests.rows(), window_bests.rows())
+    print("✅ Loaded projections")
+
+
+def main():
+    """Bootstrap the score event log or rebuild derived tables from it."""
+    parser = argparse.ArgumentParser(
+        description="Manage the Snake Showdown score event log"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    bootstrap_parser = commands.add_parser(
+        "bootstrap", help="Write the stored score history into an empty log"
+    )
+    bootstrap_parser.add_argument(
+        "--log-dir",
+        default=settings.score_event_log_dir,
+        help="Event log directory"
+    )
+    bootstrap_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=5000,
+        help="Events read and written at a time"
+    )
+
+    rebuild_parser = commands.add_parser(
+        "rebuild", help="Rebuild derived tables by replaying event logs"
+    )
+    rebuild_parser.add_argument(
+        "--log-dir",
+        action="append",
+        help="Event log directory; repeat to merge the logs of several workers"
+    )
+    rebuild_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Only replay the logs and report what they hold"
+    )
+    rebuild_parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild even from logs that do not hold the full history"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "bootstrap":
+        bootstrap(args.log_dir, args.batch_size)
+    else:
+        rebuild(args.log_dir or [settings.score_event_log_dir], args.dry_run, args.force)
+
+    print("🎉 Done!")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,31 @@
 """
 Authentication service - Business logic for user authentication.
 """
+from datetime import datetime, UTC
 from typing import Optional
 from sqlalchemy.orm import Session
 
 from app.database import Database
 from app.auth import create_access_token
+from app.passwords import (
+    PasswordExecutorBusy,
+    needs_rehash,
+    password_executor,
+)
 from app.models import AuthUser, AuthResponse
+from app.revocation import token_revocations
 
 
 class AuthService:
     """Service for authentication operations."""
     
     @staticmethod
-    def signup(email: str, username: str, password: str, db: Session) -> AuthResponse:
+    async def signup(
+        email: str, username: str, password: str, db: Session
+    ) -> AuthResponse:
         """
-        Register a new user.
+        Register a new user, hashing the password on the password executor
+        so the event loop keeps serving other requests meanwhile.
         
         Args:
             email: User email
@@ -25,29 +35,24 @@ class AuthService:
         
         Raises:
             ValueError: If email or username already exists
+            PasswordExecutorBusy: If too many hashes are already in progress
         """
-        # Create database instance with session
         database = Database(db)
-        
-        # Create user in database
-        user = database.create_user(email, username, password)
-        
-        # Generate JWT token
-        token = create_access_token(data={"sub": user["id"]})
-        
-        # Prepare response
-        auth_user = AuthUser(
-            id=user["id"],
-            username=user["username"],
-            email=user["email"]
-        )
-        
-        return AuthResponse(user=auth_user, token=token)
+        # Turn taken emails and usernames away before paying for a hash;
+        # create_user checks again in case of a concurrent signup
+        database.check_user_available(email, username)
+        password_hash = await password_executor.hash(password)
+        user = database.create_user(email, username, password, password_hash)
+        return AuthService.create_auth_response(user)
     
     @staticmethod
-    def login(email: str, password: str, db: Session) -> tuple[Optional[dict], Optional[str]]:
+    async def login(
+        email: str, password: str, db: Session
+    ) -> tuple[Optional[dict], Optional[str]]:
         """
-        Authenticate a user.
+        Authenticate a user, checking the password on the password executor.
+        Hashes made at an old cost are brought up to the configured one
+        while the plain password is at hand.
         
         Args:
             email: User email
@@ -56,26 +61,60 @@ class AuthService:
         
         Returns:
             Tuple of (user_dict, error_message)
+        
+        Raises:
+            PasswordExecutorBusy: If too many checks are already in progress
         """
-        # Create database instance with session
         database = Database(db)
-        
-        # Get user by email
         user = database.get_user_by_email(email)
         
         if not user:
             return None, "Invalid email or password"
         
-        # Verify password
-        if not database.verify_password(password, user["password_hash"]):
+        if not await password_executor.verify(password, user["password_hash"]):
             return None, "Invalid email or password"
         
+        if needs_rehash(user["password_hash"]):
+            try:
+                user["password_hash"] = await password_executor.hash(password)
+            except PasswordExecutorBusy:
+                # The login stands; rehash on a quieter one
+                return user, None
+            database.update_password_hash(user["id"], user["password_hash"])
+        
         return user, None
     
+    @staticmethod
+    def logout(token_payload: dict, db: Session) -> bool:
+        """
+        Revoke the token a request was made with, here and (on their next
+        sync) in every other worker.
+        
+        Args:
+            token_payload: Verified claims of the token
+            db: Database session
+        
+        Returns:
+            Whether the token could be revoked; tokens issued before they
+            carried a jti cannot, and stay valid until they expire
+        """
+        jti = token_payload.get("jti")
+        if jti is None:
+            return False
+        
+        expires_at = datetime.fromtimestamp(token_payload["exp"], UTC)
+        Database(db).revoke_token(jti, token_payload["sub"], expires_at)
+        token_revocations.add(jti, expires_at)
+        return True
+    
     @staticmethod
     def create_auth_response(user: dict) -> AuthResponse:
         """Create authentication response with token."""
-        token = create_access_token(data={"sub": user["id"]})
+        # Username and email ride along so get_current_user can trust them
+        # (settings.auth_trust_token_claims) instead of loading the user
+        token = create_access_token(
+            data={"sub": user["id"], "username": user["username"], "email": user["email"]}
+        )
         
         auth_user = AuthUser(
             id=user["id"],
@@ -1,37 +1,286 @@
 """
 Game service - Business logic for game operations.
 """
+import asyncio
+import base64
+import hashlib
+import json
+from datetime import datetime, UTC
 from typing import Optional
 from sqlalchemy.orm import Session
 
-from app.database import Database
-from app.models import GameMode, LeaderboardEntry, LeaderboardResponse, LiveGame, ScoreResponse
+from app.cache import LRUCache
+from app.config import settings
+from app.database import Database, leaderboard_version, window_start
+from app.ingest import score_ingest_queue
+from app.journal import score_journal
+from app.rank_worker import rank_worker
+from app.models import (
+    AroundMeResponse,
+    GameMode,
+    LeaderboardEntry,
+    LeaderboardResponse,
+    LeaderboardWindow,
+    LiveGame,
+    ScoreBatchResponse,
+    ScoreBatchResult,
+    ScoreRankResponse,
+    ScoreResponse,
+    ScoreSubmission,
+)
+
+
+# Page sizes clients request on first load. The first page of each board at
+# these sizes is kept apart so deep-page traffic can never evict it.
+HOT_LEADERBOARD_LIMITS = (10, 50, 100)
+
+# Serialized leaderboard pages keyed by request parameters and board version,
+# stored as (body, etag)
+leaderboard_page_cache = LRUCache(
+    settings.leaderboard_page_cache_size, settings.leaderboard_page_cache_ttl_seconds
+)
+
+# Hot first pages keyed by (mode, window, limit), stored as
+# (bucket, version, body, etag); sized to hold every board at every hot limit
+hot_leaderboard_page_cache = LRUCache(
+    (len(GameMode) + 1) * (len(LeaderboardWindow) + 1) * len(HOT_LEADERBOARD_LIMITS),
+    settings.leaderboard_page_cache_ttl_seconds,
+)
+
+# Largest value of the scores' Integer column
+MAX_CURSOR_SCORE = 2**31 - 1
+
+# Responses to score submissions keyed by (user_id, Idempotency-Key)
+idempotency_cache = LRUCache(
+    settings.idempotency_cache_size, settings.idempotency_key_ttl_seconds
+)
+
+
+def encode_leaderboard_cursor(score: int, user_id: str, rank: int) -> str:
+    """Encode a leaderboard keyset position as an opaque cursor."""
+    raw = json.dumps([score, user_id, rank], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_leaderboard_cursor(cursor: str) -> tuple[int, str, int]:
+    """
+    Decode a cursor produced by encode_leaderboard_cursor. Cursors come
+    back from clients, so anything that could not have been issued is
+    rejected before it reaches a query.
+
+    Raises:
+        ValueError: If the cursor is malformed or out of range
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, user_id, rank = json.loads(base64.urlsafe_b64decode(padded))
+    except (TypeError, ValueError):
+        raise ValueError("Invalid leaderboard cursor")
+
+    # type() rather than isinstance: JSON true/false decode to bool
+    if not (
+        type(score) is int and isinstance(user_id, str) and type(rank) is int
+    ):
+        raise ValueError("Invalid leaderboard cursor")
+    if not (0 <= score <= MAX_CURSOR_SCORE and rank >= 1):
+        raise ValueError("Invalid leaderboard cursor")
+
+    return score, user_id, rank
 
 
 class GameService:
     """Service for game operations."""
     
     @staticmethod
-    def submit_score(user_id: str, score: int, mode: GameMode, db: Session) -> ScoreResponse:
+    def submit_score(
+        user_id: str,
+        score: int,
+        mode: GameMode,
+        db: Session,
+        idempotency_key: Optional[str] = None
+    ) -> ScoreResponse:
         """
         Submit a game score for a user.
+        A retry with the same idempotency key gets the original response.
+        
+        Args:
+            user_id: User ID
+            score: Score value
+            mode: Game mode
+            db: Database session
+            idempotency_key: Client Idempotency-Key header, if sent
+        
+        Raises:
+            ValueError: If player not found
+        """
+        if idempotency_key:
+            cached = idempotency_cache.get((user_id, idempotency_key))
+            if cached is not None:
+                return cached
+        
+        database = Database(db)
+        result = database.add_score(
+            user_id, score, mode, idempotency_key, defer_rank=rank_worker.is_running
+        )
+        GameService._queue_rank(user_id, score, mode, result)
+        
+        return GameService._remember_response(
+            user_id, idempotency_key, GameService._score_response(result)
+        )
+    
+    @staticmethod
+    async def submit_score_queued(
+        user_id: str,
+        score: int,
+        mode: GameMode,
+        idempotency_key: Optional[str] = None
+    ) -> ScoreResponse:
+        """
+        Submit a game score through the group-commit ingestion queue.
+        Returns once the batch holding the score has been committed.
+        
+        Args:
+            user_id: User ID
+            score: Score value
+            mode: Game mode
+            idempotency_key: Client Idempotency-Key header, if sent
+        
+        Raises:
+            ValueError: If player not found
+        """
+        if idempotency_key:
+            cached = idempotency_cache.get((user_id, idempotency_key))
+            if cached is not None:
+                return cached
+        
+        result = await score_ingest_queue.submit(user_id, score, mode, idempotency_key)
+        GameService._queue_rank(user_id, score, mode, result)
+        
+        return GameService._remember_response(
+            user_id, idempotency_key, GameService._score_response(result)
+        )
+    
+    @staticmethod
+    async def submit_score_journaled(
+        user_id: str,
+        score: int,
+        mode: GameMode,
+        idempotency_key: Optional[str] = None
+    ) -> ScoreResponse:
+        """
+        Submit a game score through the local score journal.
+        Returns once the score is on local disk; the rank is pending until
+        the journal is drained into the database.
         
         Args:
             user_id: User ID
             score: Score value
             mode: Game mode
+            idempotency_key: Client Idempotency-Key header, if sent
+        """
+        if idempotency_key:
+            cached = idempotency_cache.get((user_id, idempotency_key))
+            if cached is not None:
+                return cached
+        
+        await asyncio.to_thread(score_journal.append, user_id, score, mode, idempotency_key)
+        
+        return GameService._remember_response(
+            user_id,
+            idempotency_key,
+            ScoreResponse(
+                message="Score accepted",
+                is_new_high_score=False,
+                rank_pending=True
+            )
+        )
+    
+    @staticmethod
+    def submit_score_batch(
+        user_id: str, submissions: list[ScoreSubmission], db: Session
+    ) -> ScoreBatchResponse:
+        """
+        Submit several game scores for a user in one transaction.
+        
+        Args:
+            user_id: User ID
+            submissions: Scores in the order they were played
             db: Database session
         
         Raises:
             ValueError: If player not found
         """
         database = Database(db)
-        result = database.add_score(user_id, score, mode)
+        results = database.add_score_batch(
+            user_id, [(submission.score, submission.mode) for submission in submissions]
+        )
+        
+        return ScoreBatchResponse(
+            message=f"{len(results)} scores submitted successfully",
+            results=[
+                ScoreBatchResult(
+                    is_new_high_score=result["is_new_high_score"],
+                    rank=result["rank"],
+                    rank_is_approximate=result["rank_is_approximate"],
+                    percentile=result["percentile"]
+                )
+                for result in results
+            ]
+        )
+    
+    @staticmethod
+    def get_score_rank(user_id: str, score_id: int, db: Session) -> Optional[ScoreRankResponse]:
+        """
+        Get the rank of one of the user's scores.
+        Served from the rank worker while it knows the score, otherwise
+        counted from the database.
+        
+        Args:
+            user_id: User ID
+            score_id: Score ID from the submission response
+            db: Database session
+        
+        Returns:
+            Rank response, or None if the user has no such score
+        """
+        known = rank_worker.lookup(score_id, user_id)
+        if known:
+            return ScoreRankResponse(score_id=score_id, **known)
+        
+        database = Database(db)
+        result = database.get_score_rank(user_id, score_id)
         
+        if not result:
+            return None
+        
+        return ScoreRankResponse(score_id=score_id, rank=result["rank"])
+    
+    @staticmethod
+    def _queue_rank(user_id: str, score: int, mode: GameMode, result: dict):
+        """Hand a score whose rank was deferred to the rank worker."""
+        if result["rank_pending"] and result["score_id"] is not None:
+            rank_worker.submit(result["score_id"], user_id, score, mode)
+    
+    @staticmethod
+    def _remember_response(
+        user_id: str, idempotency_key: Optional[str], response: ScoreResponse
+    ) -> ScoreResponse:
+        """Cache the response to a keyed submission for its retries."""
+        if idempotency_key:
+            idempotency_cache.set((user_id, idempotency_key), response)
+        return response
+    
+    @staticmethod
+    def _score_response(result: dict) -> ScoreResponse:
+        """Build the response for a committed score."""
         return ScoreResponse(
             message="Score submitted successfully",
+            score_id=result["score_id"],
             is_new_high_score=result["is_new_high_score"],
-            rank=result["rank"]
+            rank=result["rank"],
+            rank_is_approximate=result["rank_is_approximate"],
+            rank_pending=result["rank_pending"],
+            percentile=result["percentile"]
         )
     
     @staticmethod
@@ -39,7 +288,9 @@ class GameService:
         mode: Optional[GameMode] = None,
         limit: int = 10,
         offset: int = 0,
-        db: Session = None
+        db: Session = None,
+        after: Optional[str] = None,
+        window: Optional[LeaderboardWindow] = None
     ) -> LeaderboardResponse:
         """
         Get leaderboard rankings.
@@ -47,15 +298,106 @@ class GameService:
         Args:
             mode: Optional game mode filter
             limit: Number of entries
-            offset: Offset for pagination
+            offset: Offset for pagination (ignored when after is given)
+            db: Database session
+            after: Cursor from a previous response's next_cursor
+            window: Optional time window (current day, week or month)
+        
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        database = Database(db)
+        position = decode_leaderboard_cursor(after) if after else None
+        entries_data, total = database.get_leaderboard(
+            mode, limit, offset, position, window
+        )
+        
+        entries = [LeaderboardEntry(**entry) for entry in entries_data]
+        
+        # Hand out a cursor whenever more rows may follow this page
+        next_cursor = None
+        if len(entries_data) == limit and entries_data[-1]["rank"] < total:
+            last = entries_data[-1]
+            next_cursor = encode_leaderboard_cursor(
+                last["score"], last["user_id"], last["rank"]
+            )
+        
+        return LeaderboardResponse(entries=entries, total=total, next_cursor=next_cursor)
+    
+    @staticmethod
+    def get_leaderboard_cached(
+        mode: Optional[GameMode] = None,
+        limit: int = 10,
+        offset: int = 0,
+        db: Session = None,
+        after: Optional[str] = None,
+        window: Optional[LeaderboardWindow] = None
+    ) -> tuple[bytes, str]:
+        """
+        Get leaderboard rankings as ready-to-send JSON through the page caches.
+        Pages are serialized once per board version, so repeat reads of an
+        unchanged board do no database or model work.
+        
+        Returns:
+            Tuple of (JSON body, strong ETag derived from the body)
+        
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        bucket = window_start(window, datetime.now(UTC)) if window else None
+        version = leaderboard_version(mode, window)
+        
+        hot = offset == 0 and after is None and limit in HOT_LEADERBOARD_LIMITS
+        if hot:
+            key = (mode, window, limit)
+            cached = hot_leaderboard_page_cache.get(key)
+            if cached is not None and cached[:2] == (bucket, version):
+                return cached[2], cached[3]
+        else:
+            key = (mode, window, bucket, limit, offset, after, version)
+            cached = leaderboard_page_cache.get(key)
+            if cached is not None:
+                return cached
+        
+        response = GameService.get_leaderboard(mode, limit, offset, db, after, window)
+        body = response.model_dump_json(by_alias=True).encode("utf-8")
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        
+        if hot:
+            hot_leaderboard_page_cache.set(key, (bucket, version, body, etag))
+        else:
+            leaderboard_page_cache.set(key, (body, etag))
+        return body, etag
+    
+    @staticmethod
+    def get_leaderboard_around(
+        user_id: str,
+        mode: Optional[GameMode] = None,
+        radius: int = 5,
+        db: Session = None
+    ) -> Optional[AroundMeResponse]:
+        """
+        Get the current player's rank with the players just above and below.
+        
+        Args:
+            user_id: User ID
+            mode: Optional game mode filter
+            radius: Number of players on each side
             db: Database session
+        
+        Returns:
+            AroundMeResponse or None if the player has no score on the board
         """
         database = Database(db)
-        entries_data, total = database.get_leaderboard(mode, limit, offset)
+        result = database.get_leaderboard_around(user_id, mode, radius)
+        
+        if result is None:
+            return None
         
+        rank, entries_data = result
         entries = [LeaderboardEntry(**entry) for entry in entries_data]
         
-        return LeaderboardResponse(entries=entries, total=total)
+        return AroundMeResponse(rank=rank, entries=entries)
     
     @staticmethod
     def get_live_games(
@@ -0,0 +1,71 @@
+"""
+bcrypt cost benchmark for sizing the auth tier.
+Run with: uv run python benchmarks/bench_bcrypt.py [--min-rounds 10] [--max-rounds 14] [--workers 4]
+
+For each work factor reports the latency of one hash, hashes/sec on a single
+core, and hashes/sec with --workers threads hashing at once (bcrypt releases
+the GIL, as the password executor relies on). Logins cost the same as
+hashes: checkpw re-derives the hash at the stored cost.
+
+  capacity per core = 1 / latency; a worker with N password threads serves
+  at most N / latency logins per second before its queue fills
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.passwords import hash_password
+
+PASSWORD = "correct horse battery staple"
+
+
+def hashes_per_second(rounds: int, count: int, workers: int) -> float:
+    """Throughput of count hashes spread over workers threads."""
+    started = time.perf_counter()
+    if workers == 1:
+        for _ in range(count):
+            hash_password(PASSWORD, rounds)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(lambda _: hash_password(PASSWORD, rounds), range(count)))
+    return count / (time.perf_counter() - started)
+
+
+def run(min_rounds: int, max_rounds: int, workers: int, seconds: float):
+    print(f"CPU cores: {os.cpu_count()}, parallel run with {workers} threads\n")
+    print(f"{'rounds':<8}{'ms/hash':>10}{'hashes/s/core':>16}{f'hashes/s x{workers}':>16}")
+    for rounds in range(min_rounds, max_rounds + 1):
+        # Size each run from one timed hash so every cost takes ~seconds
+        started = time.perf_counter()
+        hash_password(PASSWORD, rounds)
+        latency = time.perf_counter() - started
+        count = max(2, int(seconds / latency))
+
+        single = hashes_per_second(rounds, count, 1)
+        parallel = hashes_per_second(rounds, max(count, workers * 2), workers)
+        print(f"{rounds:<8}{1000 / single:>10.1f}{single:>16.1f}{parallel:>16.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark bcrypt work factors")
+    parser.add_argument("--min-rounds", type=int, default=10)
+    parser.add_argument("--max-rounds", type=int, default=14)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--seconds",
+        type=float,
+        default=2.0,
+        help="Approximate time spent on each cost",
+    )
+    args = parser.parse_args()
+    run(args.min_rounds, args.max_rounds, args.workers, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
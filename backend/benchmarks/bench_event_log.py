@@ -0,0 +1,167 @@
+"""
+Score event log rebuild benchmark.
+Run with: uv run python benchmarks/bench_event_log.py [--rows 500000] [--database-url URL]
+
+Rebuilds the derived score tables two ways from the same history:
+
+  sql:     Database.rebuild_player_mode_bests + rebuild_window_bests, the
+           window-function queries over scores used for backfills
+  replay:  replaying the event log into the player stats, mode best and
+           window best projections (no database involved)
+  load:    replay plus Database.load_projections writing the results back
+
+Also reports the event log's size and raw read rate. Defaults to a scratch
+SQLite file; a PostgreSQL URL gets its tables created and dropped again.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+from typing import Optional
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Database
+from app.db_models import Base, Player, Score, User
+from app.event_log import ScoreEventLog, read_events, segment_paths
+from app.models import GameMode
+from app.projections import (
+    ModeBestsProjection,
+    PlayerStatsProjection,
+    WindowBestsProjection,
+    replay,
+)
+
+BATCH_SIZE = 5000
+
+
+def seed(session, rows: int, users: int):
+    """Players and a score history spread over the last 60 days."""
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    session.execute(
+        insert(User),
+        [
+            {
+                "id": user_id,
+                "email": f"player{i}@example.com",
+                "username": f"player{i}",
+                "password_hash": "x",
+            }
+            for i, user_id in enumerate(user_ids)
+        ],
+    )
+    session.execute(
+        insert(Player),
+        [
+            {"id": user_id, "username": f"player{i}", "score": 0, "high_score": 0, "games_played": 0}
+            for i, user_id in enumerate(user_ids)
+        ],
+    )
+    start = datetime.now(UTC) - timedelta(days=60)
+    step = timedelta(days=60) / rows
+    for offset in range(0, rows, BATCH_SIZE):
+        session.execute(
+            insert(Score),
+            [
+                {
+                    "user_id": user_ids[i % users],
+                    "score": (i * 7919) % 50_000,
+                    "mode": GameMode.WALLS if i % 3 else GameMode.PASSTHROUGH,
+                    "created_at": start + step * i,
+                }
+                for i in range(offset, min(rows, offset + BATCH_SIZE))
+            ],
+        )
+    session.commit()
+
+
+def timed(function) -> float:
+    started = time.perf_counter()
+    function()
+    return time.perf_counter() - started
+
+
+def run(database_url: Optional[str], rows: int, users: int):
+    scratch = tempfile.mkdtemp()
+    if database_url is None:
+        database_url = f"sqlite:///{os.path.join(scratch, 'bench_events.db')}"
+    log_dir = os.path.join(scratch, "score-events")
+
+    engine = create_engine(database_url)
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        seed(session, rows, users)
+        database = Database(session)
+
+        log = ScoreEventLog()
+        log.open(log_dir, 64 * 1024 * 1024)
+        events = database.iter_score_events(BATCH_SIZE)
+        batch = []
+        for event in events:
+            batch.append(event)
+            if len(batch) == BATCH_SIZE:
+                log.append(batch)
+                batch = []
+        log.append(batch)
+        log.close()
+        log_bytes = sum(path.stat().st_size for path in segment_paths(log_dir))
+
+        print(f"Database: {engine.dialect.name}, {rows:,} scores, {users:,} players")
+        print(f"Event log: {log_bytes / rows:.1f} bytes/event, {log_bytes / 2**20:.1f} MiB\n")
+
+        def sql():
+            database.rebuild_player_mode_bests()
+            database.rebuild_window_bests()
+
+        projections = []
+
+        def replay_log():
+            projections[:] = [
+                PlayerStatsProjection(),
+                ModeBestsProjection(),
+                WindowBestsProjection(),
+            ]
+            replay([log_dir], projections)
+
+        def load():
+            replay_log()
+            database.load_projections(*(projection.rows() for projection in projections))
+
+        def read():
+            for _ in read_events(log_dir):
+                pass
+
+        print(f"{'rebuild':<10}{'seconds':>10}{'events/sec':>14}")
+        for name, function in (("sql", sql), ("read", read), ("replay", replay_log), ("load", load)):
+            elapsed = timed(function)
+            print(f"{name:<10}{elapsed:>10.2f}{rows / elapsed:>14,.0f}")
+    finally:
+        session.close()
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark score event log rebuilds")
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="Database to benchmark in (default: a scratch SQLite file)",
+    )
+    args = parser.parse_args()
+    run(args.database_url, args.rows, args.users)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Leaderboard query benchmark.
+Run with: uv run python benchmarks/bench_leaderboard.py [--database-url URL] [--players 1000 10000 ...]
+
+Seeds a throwaway database with N players and times Database.get_leaderboard
+and Database.get_rank for the first page, a deep page and a single rank lookup.
+Each size runs against freshly created tables, so point --database-url at a
+scratch database (the tables are dropped when the run finishes).
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.database import Database
+from app.db_models import Base, User, Player, Score
+from app.models import GameMode
+
+CHUNK_SIZE = 5000
+
+
+def make_engine(database_url: str):
+    """Create an engine for the benchmark database."""
+    if database_url.startswith("sqlite"):
+        return create_engine(
+            database_url,
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+    return create_engine(database_url)
+
+
+def seed(engine, players: int, scores_per_player: int) -> None:
+    """Bulk insert players and their score history."""
+    modes = list(GameMode)
+    now = datetime.now(UTC)
+
+    with engine.begin() as conn:
+        for start in range(0, players, CHUNK_SIZE):
+            users, profiles, scores = [], [], []
+            for i in range(start, min(start + CHUNK_SIZE, players)):
+                user_id = str(uuid.uuid4())
+                username = f"p{i}"
+                users.append(
+                    {
+                        "id": user_id,
+                        "email": f"{username}@bench.local",
+                        "username": username,
+                        "password_hash": "x",
+                        "created_at": now,
+                    }
+                )
+                best = 0
+                for _ in range(scores_per_player):
+                    value = random.randint(0, 100_000)
+                    best = max(best, value)
+                    scores.append(
+                        {
+                            "user_id": user_id,
+                            "score": value,
+                            "mode": random.choice(modes),
+                            "created_at": now
+                            - timedelta(minutes=random.randint(0, 60 * 24 * 60)),
+                        }
+                    )
+                profiles.append(
+                    {
+                        "id": user_id,
+                        "username": username,
+                        "score": 0,
+                        "high_score": best,
+                        "games_played": scores_per_player,
+                    }
+                )
+            conn.execute(insert(User), users)
+            conn.execute(insert(Player), profiles)
+            conn.execute(insert(Score), scores)
+
+
+def time_call(fn, repeat: int) -> float:
+    """Return the median wall time of fn() in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run(database_url: str, players: int, scores_per_player: int, repeat: int) -> dict:
+    """Benchmark leaderboard reads for a single database size."""
+    engine = make_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    try:
+        seed(engine, players, scores_per_player)
+        session = sessionmaker(bind=engine)()
+        database = Database(session)
+        database.rebuild_player_mode_bests()
+        deep_offset = max(players // 2, 0)
+        result = {
+            "players": players,
+            "top_page_ms": time_call(
+                lambda: database.get_leaderboard(GameMode.WALLS, 10, 0), repeat
+            ),
+            "deep_page_ms": time_call(
+                lambda: database.get_leaderboard(GameMode.WALLS, 10, deep_offset),
+                repeat,
+            ),
+            "all_modes_ms": time_call(
+                lambda: database.get_leaderboard(None, 10, 0), repeat
+            ),
+            "rank_ms": time_call(
+                lambda: database.get_rank(50_000, GameMode.WALLS), repeat
+            ),
+        }
+        session.close()
+        return result
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def main():
+    """Run the benchmark for each requested size and print a table."""
+    parser = argparse.ArgumentParser(description="Benchmark leaderboard queries")
+    parser.add_argument(
+        "--database-url",
+        default="sqlite:///:memory:",
+        help="Scratch database to benchmark against (tables are dropped)",
+    )
+    parser.add_argument(
+        "--players",
+        type=int,
+        nargs="+",
+        default=[1_000, 10_000, 100_000],
+        help="Player counts to benchmark",
+    )
+    parser.add_argument(
+        "--scores-per-player", type=int, default=3, help="Score rows per player"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per query")
+    args = parser.parse_args()
+
+    print(f"Database: {args.database_url}")
+    print(
+        f"{'players':>10} {'top page':>10} {'deep page':>10} "
+        f"{'all modes':>10} {'rank':>10}   (median ms)"
+    )
+    for players in args.players:
+        r = run(args.database_url, players, args.scores_per_player, args.repeat)
+        print(
+            f"{r['players']:>10} {r['top_page_ms']:>10.2f} {r['deep_page_ms']:>10.2f} "
+            f"{r['all_modes_ms']:>10.2f} {r['rank_ms']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Leaderboard response serialization benchmark.
+Run with: uv run python benchmarks/bench_leaderboard_serialization.py [--sizes 10 50 100]
+
+Times the per-request work of turning one leaderboard page into a response
+body, without any database access, for three ways of serving it:
+
+  models:  build LeaderboardEntry/LeaderboardResponse from rows, then let the
+           response_model validate, serialize and render it as JSON
+  cached:  the response model is cached, but response_model still validates,
+           serializes and renders it on every request
+  bytes:   the page is cached as pre-serialized JSON and sent as a raw Response
+"""
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, UTC
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+from fastapi.utils import create_model_field
+
+from app.cache import LRUCache
+from app.models import LeaderboardEntry, LeaderboardResponse
+
+# Same field FastAPI builds for response_model=LeaderboardResponse
+RESPONSE_FIELD = create_model_field(
+    name="Response_get_leaderboard", type_=LeaderboardResponse, mode="serialization"
+)
+
+
+def make_rows(size: int) -> list[dict]:
+    """Leaderboard rows in the shape Database.get_leaderboard returns."""
+    now = datetime.now(UTC).replace(tzinfo=None)
+    return [
+        {
+            "rank": rank,
+            "user_id": str(uuid.uuid4()),
+            "username": f"player{rank}",
+            "score": 100_000 - rank * 7,
+            "date": now - timedelta(minutes=rank),
+        }
+        for rank in range(1, size + 1)
+    ]
+
+
+def build_response(rows: list[dict]) -> LeaderboardResponse:
+    """What GameService.get_leaderboard does with the rows."""
+    entries = [LeaderboardEntry(**row) for row in rows]
+    return LeaderboardResponse(entries=entries, total=len(rows) * 10)
+
+
+def render_with_response_model(response: LeaderboardResponse) -> Response:
+    """What fastapi.routing.serialize_response and JSONResponse do per request."""
+    value, errors = RESPONSE_FIELD.validate(response, {}, loc=("response",))
+    assert not errors
+    content = RESPONSE_FIELD.serialize(value, by_alias=True)
+    return JSONResponse(content)
+
+
+def time_call(fn, repeat: int, number: int) -> float:
+    """Return the median wall time of one fn() call in microseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) * 1_000_000 / number)
+    return statistics.median(samples)
+
+
+def run(size: int, repeat: int, number: int) -> dict:
+    """Benchmark the three serving paths for one page size."""
+    rows = make_rows(size)
+    cached_response = build_response(rows)
+
+    page_cache = LRUCache(16)
+    body = cached_response.model_dump_json(by_alias=True).encode("utf-8")
+    page_cache.set(("walls", size), body)
+
+    # The bytes path must produce the same document as response_model
+    assert JSONResponse(
+        RESPONSE_FIELD.serialize(cached_response, by_alias=True)
+    ).body == body
+
+    return {
+        "size": size,
+        "bytes_per_page": len(body),
+        "models_us": time_call(
+            lambda: render_with_response_model(build_response(rows)), repeat, number
+        ),
+        "cached_us": time_call(
+            lambda: render_with_response_model(cached_response), repeat, number
+        ),
+        "bytes_us": time_call(
+            lambda: Response(
+                content=page_cache.get(("walls", size)), media_type="application/json"
+            ),
+            repeat,
+            number,
+        ),
+    }
+
+
+def main():
+    """Run the benchmark for each page size and print a table."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark leaderboard response serialization"
+    )
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10, 50, 100],
+        help="Page sizes (entries per response) to benchmark",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Samples per path")
+    parser.add_argument(
+        "--number", type=int, default=1000, help="Requests per sample"
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{'entries':>8} {'body bytes':>11} {'models':>10} {'cached':>10} "
+        f"{'bytes':>10} {'speedup':>9}   (median us/request)"
+    )
+    for size in args.sizes:
+        r = run(size, args.repeat, args.number)
+        print(
+            f"{r['size']:>8} {r['bytes_per_page']:>11} {r['models_us']:>10.1f} "
+            f"{r['cached_us']:>10.1f} {r['bytes_us']:>10.1f} "
+            f"{r['models_us'] / r['bytes_us']:>8.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
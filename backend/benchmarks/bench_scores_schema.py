@@ -0,0 +1,173 @@
+"""
+Scores table layout benchmark.
+Run with: uv run python benchmarks/bench_scores_schema.py [--rows 200000] [--database-url URL]
+
+Compares the baseline scores table (UUID text key, copied username, enum mode,
+four secondary indexes) with the compact one from migration 0002 (bigint
+identity key, smallint mode, two secondary indexes):
+
+  insert:  rows/sec for batched inserts, as add_score_batch and seeding do
+  size:    bytes per row for the table and its indexes
+
+Defaults to a scratch SQLite file. A PostgreSQL URL measures relation sizes
+with pg_total_relation_size; its scratch tables are dropped afterwards.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import (
+    BigInteger,
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Identity,
+    Index,
+    Integer,
+    MetaData,
+    SmallInteger,
+    String,
+    Table,
+    bindparam,
+    create_engine,
+    insert,
+    text,
+)
+
+BATCH_SIZE = 1000
+
+
+def scores_tables(metadata: MetaData) -> dict[str, Table]:
+    """The two layouts under test, referencing a minimal users table."""
+    Table("bench_users", metadata, Column("id", String(36), primary_key=True))
+    legacy = Table(
+        "bench_scores_legacy",
+        metadata,
+        Column("id", String(36), primary_key=True),
+        Column("user_id", String(36), ForeignKey("bench_users.id"), nullable=False),
+        Column("username", String(20), nullable=False),
+        Column("score", Integer, nullable=False),
+        Column("mode", Enum("WALLS", "PASSTHROUGH", name="bench_gamemode"), nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Index("bench_legacy_user_scores", "user_id", "score"),
+        Index("bench_legacy_mode_scores", "mode", "score"),
+        Index("bench_legacy_score_date", "score", "created_at"),
+        Index("bench_legacy_created_at", "created_at"),
+    )
+    compact = Table(
+        "bench_scores_compact",
+        metadata,
+        Column(
+            "id",
+            BigInteger().with_variant(Integer, "sqlite"),
+            Identity(),
+            primary_key=True,
+        ),
+        Column("user_id", String(36), ForeignKey("bench_users.id"), nullable=False),
+        Column("score", Integer, nullable=False),
+        Column("mode", SmallInteger, nullable=False),
+        Column("created_at", DateTime, nullable=False),
+        Index("bench_compact_user", "user_id", "mode", text("score DESC")),
+        Index("bench_compact_created_at", "created_at"),
+    )
+    return {"legacy": legacy, "compact": compact}
+
+
+def make_rows(layout: str, user_ids: list[str], count: int) -> list[dict]:
+    start = datetime(2024, 1, 1)
+    rows = []
+    for i in range(count):
+        row = {
+            "user_id": user_ids[i % len(user_ids)],
+            "score": (i * 7919) % 50_000,
+            "created_at": start + timedelta(seconds=i * 13),
+        }
+        if layout == "legacy":
+            row["id"] = str(uuid.uuid4())
+            row["username"] = f"player{i % len(user_ids)}"
+            row["mode"] = "WALLS" if i % 3 else "PASSTHROUGH"
+        else:
+            row["mode"] = 1 if i % 3 else 2
+        rows.append(row)
+    return rows
+
+
+def table_bytes(engine, table: Table) -> int:
+    """Size on disk of the table with its indexes."""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        if engine.dialect.name == "postgresql":
+            connection.execute(text(f"VACUUM ANALYZE {table.name}"))
+            return connection.execute(
+                text("SELECT pg_total_relation_size(:name)"), {"name": table.name}
+            ).scalar_one()
+        # SQLite keeps every table in one file: count the pages each b-tree
+        # owns (needs the dbstat virtual table, built into CPython's sqlite3)
+        names = [table.name] + [index.name for index in table.indexes]
+        if table.name != "bench_scores_compact":
+            names.append(f"sqlite_autoindex_{table.name}_1")
+        return connection.execute(
+            text("SELECT coalesce(sum(pgsize), 0) FROM dbstat WHERE name IN :names")
+            .bindparams(bindparam("names", expanding=True)),
+            {"names": names},
+        ).scalar_one()
+
+
+def run(database_url: Optional[str], rows: int, users: int):
+    if database_url is None:
+        database_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'bench_scores.db')}"
+
+    engine = create_engine(database_url)
+    metadata = MetaData()
+    tables = scores_tables(metadata)
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    user_ids = [str(uuid.uuid4()) for _ in range(users)]
+    with engine.begin() as connection:
+        connection.execute(
+            insert(metadata.tables["bench_users"]), [{"id": u} for u in user_ids]
+        )
+
+    print(f"Database: {engine.dialect.name}, {rows:,} rows, {users:,} players\n")
+    print(f"{'layout':<10}{'rows/sec':>12}{'bytes/row':>12}")
+    try:
+        for layout, table in tables.items():
+            data = make_rows(layout, user_ids, rows)
+            started = time.perf_counter()
+            for offset in range(0, rows, BATCH_SIZE):
+                with engine.begin() as connection:
+                    connection.execute(insert(table), data[offset:offset + BATCH_SIZE])
+            elapsed = time.perf_counter() - started
+
+            size = table_bytes(engine, table)
+            print(f"{layout:<10}{rows / elapsed:>12,.0f}{size / rows:>12,.1f}")
+    finally:
+        metadata.drop_all(engine)
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scores table layouts")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=5_000)
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="Database to benchmark in (default: a scratch SQLite file)",
+    )
+    args = parser.parse_args()
+    run(args.database_url, args.rows, args.users)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Alembic environment.
+Migrates the database from app.config.settings, or the connection passed in
+config.attributes["connection"] (used by app.database.migrate_db and tests).
+"""
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.config import settings
+from app.db_models import Base
+
+config = context.config
+
+# Only configure logging when run from the alembic CLI
+if config.config_file_name is not None and config.attributes.get("connection") is None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL for settings.database_url without connecting."""
+    context.configure(
+        url=settings.database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run migrations against a live database."""
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run_with(connection)
+        return
+
+    connectable = create_engine(settings.database_url, poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        _run_with(connection)
+
+
+def _run_with(connection) -> None:
+    # SQLite cannot ALTER most column properties, so changes are made by
+    # copying the table (Alembic "batch" mode)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
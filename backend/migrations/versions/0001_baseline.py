@@ -0,0 +1,143 @@
+"""Baseline schema
+
+The schema as it was created by Base.metadata.create_all before migrations
+were introduced. Databases created that way have no alembic_version table,
+so every table and index here is only created if it is missing: upgrading
+such a database adopts it without touching existing data.
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Types are created explicitly (once) instead of by each table using them
+game_mode = postgresql.ENUM("WALLS", "PASSTHROUGH", name="gamemode", create_type=False)
+leaderboard_window = postgresql.ENUM(
+    "DAY", "WEEK", "MONTH", name="leaderboardwindow", create_type=False
+)
+
+
+def _create_table(name: str, *columns) -> None:
+    if not sa.inspect(op.get_bind()).has_table(name):
+        op.create_table(name, *columns)
+
+
+def _create_index(name: str, table: str, columns: list, unique: bool = False) -> None:
+    existing = {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+    if name not in existing:
+        op.create_index(name, table, columns, unique=unique)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    game_mode.create(bind, checkfirst=True)
+    leaderboard_window.create(bind, checkfirst=True)
+
+    _create_table(
+        "users",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("email", sa.String(255), nullable=False),
+        sa.Column("username", sa.String(20), nullable=False),
+        sa.Column("password_hash", sa.String(255), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    _create_index("ix_users_email", "users", ["email"], unique=True)
+    _create_index("ix_users_username", "users", ["username"], unique=True)
+
+    _create_table(
+        "players",
+        sa.Column("id", sa.String(36), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("username", sa.String(20), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("high_score", sa.Integer(), nullable=False),
+        sa.Column("games_played", sa.Integer(), nullable=False),
+    )
+    _create_index("idx_high_score", "players", ["high_score"])
+
+    _create_table(
+        "scores",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("username", sa.String(20), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("mode", game_mode, nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    _create_index("idx_user_scores", "scores", ["user_id", "score"])
+    _create_index("idx_mode_scores", "scores", ["mode", "score"])
+    _create_index("idx_score_date", "scores", ["score", "created_at"])
+    _create_index("idx_score_created_at", "scores", ["created_at"])
+
+    _create_table(
+        "player_mode_bests",
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("mode", game_mode, primary_key=True),
+        sa.Column("username", sa.String(20), nullable=False),
+        sa.Column("best_score", sa.Integer(), nullable=False),
+        sa.Column("best_score_at", sa.DateTime(), nullable=False),
+    )
+    _create_index(
+        "idx_mode_best_score",
+        "player_mode_bests",
+        ["mode", sa.text("best_score DESC"), "user_id"],
+    )
+
+    _create_table(
+        "player_window_bests",
+        sa.Column("period", leaderboard_window, primary_key=True),
+        sa.Column("bucket_start", sa.DateTime(), primary_key=True),
+        sa.Column("mode", game_mode, primary_key=True),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("username", sa.String(20), nullable=False),
+        sa.Column("best_score", sa.Integer(), nullable=False),
+        sa.Column("best_score_at", sa.DateTime(), nullable=False),
+    )
+    _create_index(
+        "idx_window_best_score",
+        "player_window_bests",
+        ["period", "bucket_start", "mode", sa.text("best_score DESC"), "user_id"],
+    )
+
+    _create_table(
+        "score_daily_rollups",
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), primary_key=True),
+        sa.Column("mode", game_mode, primary_key=True),
+        sa.Column("day", sa.DateTime(), primary_key=True),
+        sa.Column("username", sa.String(20), nullable=False),
+        sa.Column("games", sa.Integer(), nullable=False),
+        sa.Column("total_score", sa.BigInteger(), nullable=False),
+        sa.Column("best_score", sa.Integer(), nullable=False),
+        sa.Column("best_score_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in [
+        "score_daily_rollups",
+        "player_window_bests",
+        "player_mode_bests",
+        "scores",
+        "players",
+        "users",
+    ]:
+        op.drop_table(table)
+
+    bind = op.get_bind()
+    leaderboard_window.drop(bind, checkfirst=True)
+    game_mode.drop(bind, checkfirst=True)
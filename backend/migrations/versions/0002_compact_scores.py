@@ -0,0 +1,148 @@
+"""Compact scores schema
+
+scores gets a bigint identity primary key instead of UUID text, drops the
+username copied from players, and stores mode as a small integer. Its
+secondary indexes shrink from four to the two the current queries use:
+idx_score_user (best score rebuilds, per-player lookups, cascading deletes)
+and idx_score_created_at (the archiver). Leaderboards read the best score
+tables and never scan scores.
+
+The other tables keyed by mode store it as a small integer too, so scores
+can be rebuilt into them without converting types, and the gamemode enum
+type is dropped. Codes match app.db_models.GameModeCode.
+
+Revision ID: 0002_compact_scores
+Revises: 0001_baseline
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_compact_scores"
+down_revision: Union[str, Sequence[str], None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+game_mode = postgresql.ENUM("WALLS", "PASSTHROUGH", name="gamemode", create_type=False)
+
+MODE_TO_CODE = "CASE mode WHEN 'WALLS' THEN 1 WHEN 'PASSTHROUGH' THEN 2 END"
+CODE_TO_MODE = "CASE mode WHEN 1 THEN 'WALLS' WHEN 2 THEN 'PASSTHROUGH' END"
+
+# Tables other than scores with a mode column
+MODE_TABLES = ["player_mode_bests", "player_window_bests", "score_daily_rollups"]
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == "postgresql"
+
+
+def _swap_scores_table(new_table: str) -> None:
+    """Replace scores with a rebuilt copy, keeping PostgreSQL's default names."""
+    op.drop_table("scores")
+    op.rename_table(new_table, "scores")
+    if _is_postgresql():
+        op.execute(f"ALTER INDEX {new_table}_pkey RENAME TO scores_pkey")
+        op.execute(
+            f"ALTER TABLE scores RENAME CONSTRAINT {new_table}_user_id_fkey "
+            "TO scores_user_id_fkey"
+        )
+
+
+def _convert_mode_columns(to_type, existing_type, expression: str) -> None:
+    for table in MODE_TABLES:
+        if _is_postgresql():
+            op.alter_column(
+                table,
+                "mode",
+                type_=to_type,
+                existing_type=existing_type,
+                existing_nullable=False,
+                postgresql_using=expression,
+            )
+        else:
+            # SQLite stores whatever it is given, so rewrite the values first
+            # and then let batch mode copy the table with the new column type
+            op.execute(f"UPDATE {table} SET mode = {expression}")
+            with op.batch_alter_table(table) as batch:
+                batch.alter_column(
+                    "mode",
+                    type_=to_type,
+                    existing_type=existing_type,
+                    existing_nullable=False,
+                )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "scores_compact",
+        sa.Column(
+            "id",
+            sa.BigInteger().with_variant(sa.Integer(), "sqlite"),
+            sa.Identity(),
+            primary_key=True,
+        ),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("mode", sa.SmallInteger(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.execute(
+        "INSERT INTO scores_compact (user_id, score, mode, created_at) "
+        f"SELECT user_id, score, {MODE_TO_CODE}, created_at FROM scores "
+        "ORDER BY created_at, id"
+    )
+    _swap_scores_table("scores_compact")
+    if _is_postgresql():
+        op.execute("ALTER SEQUENCE scores_compact_id_seq RENAME TO scores_id_seq")
+    op.create_index(
+        "idx_score_user", "scores", ["user_id", "mode", sa.text("score DESC")]
+    )
+    op.create_index("idx_score_created_at", "scores", ["created_at"])
+
+    _convert_mode_columns(sa.SmallInteger(), game_mode, MODE_TO_CODE)
+    if _is_postgresql():
+        game_mode.drop(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _is_postgresql():
+        game_mode.create(op.get_bind())
+        _convert_mode_columns(
+            game_mode, sa.SmallInteger(), f"({CODE_TO_MODE})::gamemode"
+        )
+        new_id = "gen_random_uuid()::text"
+        mode = f"({CODE_TO_MODE})::gamemode"
+    else:
+        _convert_mode_columns(game_mode, sa.SmallInteger(), CODE_TO_MODE)
+        new_id = "lower(hex(randomblob(16)))"
+        mode = CODE_TO_MODE
+
+    # Score ids are regenerated: the integer ids have no UUID to go back to
+    op.create_table(
+        "scores_legacy",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("username", sa.String(20), nullable=False),
+        sa.Column("score", sa.Integer(), nullable=False),
+        sa.Column("mode", game_mode, nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+    )
+    op.execute(
+        "INSERT INTO scores_legacy (id, user_id, username, score, mode, created_at) "
+        f"SELECT {new_id}, scores.user_id, players.username, scores.score, {mode}, "
+        "scores.created_at FROM scores JOIN players ON players.id = scores.user_id"
+    )
+    _swap_scores_table("scores_legacy")
+    op.create_index("idx_user_scores", "scores", ["user_id", "score"])
+    op.create_index("idx_mode_scores", "scores", ["mode", "score"])
+    op.create_index("idx_score_date", "scores", ["score", "created_at"])
+    op.create_index("idx_score_created_at", "scores", ["created_at"])
@@ -0,0 +1,37 @@
+"""Score request keys
+
+Stores the Idempotency-Key a score was submitted with, unique per player, so
+a retried submission is never recorded twice. Rows without a key (NULL) do
+not conflict with each other.
+
+Revision ID: 0003_score_request_keys
+Revises: 0002_compact_scores
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_score_request_keys"
+down_revision: Union[str, Sequence[str], None] = "0002_compact_scores"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("scores", sa.Column("request_key", sa.String(64), nullable=True))
+    op.create_index(
+        "uq_score_request_key", "scores", ["user_id", "request_key"], unique=True
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("uq_score_request_key", table_name="scores")
+    with op.batch_alter_table("scores") as batch:
+        batch.drop_column("request_key")
@@ -0,0 +1,41 @@
+"""Revoked tokens
+
+Stores the jti of every access token revoked by logout until the token
+would have expired, so every API worker can reject it.
+
+Revision ID: 0004_revoked_tokens
+Revises: 0003_score_request_keys
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_revoked_tokens"
+down_revision: Union[str, Sequence[str], None] = "0003_score_request_keys"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "revoked_tokens",
+        sa.Column("jti", sa.String(36), primary_key=True),
+        sa.Column("user_id", sa.String(36), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(), nullable=False),
+    )
+    op.create_index("idx_revoked_token_revoked_at", "revoked_tokens", ["revoked_at"])
+    op.create_index("idx_revoked_token_expires_at", "revoked_tokens", ["expires_at"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("idx_revoked_token_expires_at", table_name="revoked_tokens")
+    op.drop_index("idx_revoked_token_revoked_at", table_name="revoked_tokens")
+    op.drop_table("revoked_tokens")
@@ -1,6 +1,9 @@
 """
 Tests for authentication endpoints.
 """
+from app.config import settings
+from app.database import Database, user_cache
+from app.passwords import password_executor
 
 
 def test_signup_success(client):
@@ -139,6 +142,84 @@ def test_login_wrong_password(client):
     assert response.status_code == 401
 
 
+def test_login_rehashes_password_at_new_cost(client, db_session, monkeypatch):
+    """Test that logging in upgrades a password hash to the configured cost."""
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    client.post(
+        "/api/auth/signup",
+        json={
+            "email": "rehash@example.com",
+            "password": "password123",
+            "username": "rehashuser",
+        },
+    )
+    monkeypatch.setattr(settings, "bcrypt_rounds", 5)
+
+    response = client.post(
+        "/api/auth/login",
+        json={"email": "rehash@example.com", "password": "password123"},
+    )
+    assert response.status_code == 200
+    stored = Database(db_session).get_user_by_email("rehash@example.com")
+    assert stored["password_hash"].startswith("$2b$05$")
+
+    # The upgraded hash still logs in
+    response = client.post(
+        "/api/auth/login",
+        json={"email": "rehash@example.com", "password": "password123"},
+    )
+    assert response.status_code == 200
+
+
+def test_login_password_executor_busy(client, monkeypatch):
+    """Test that logins beyond the password executor's queue limit get a 503."""
+    client.post(
+        "/api/auth/signup",
+        json={
+            "email": "busy@example.com",
+            "password": "password123",
+            "username": "busyuser",
+        },
+    )
+    monkeypatch.setattr(password_executor, "max_pending", 0)
+
+    response = client.post(
+        "/api/auth/login",
+        json={"email": "busy@example.com", "password": "password123"},
+    )
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert password_executor.rejected >= 1
+
+
+def test_signup_taken_email_skips_hashing(client, monkeypatch):
+    """Test that signups with a taken email are refused before any hashing."""
+    client.post(
+        "/api/auth/signup",
+        json={
+            "email": "taken@example.com",
+            "password": "password123",
+            "username": "takenuser",
+        },
+    )
+    # A full executor would turn any hash away with a 503
+    monkeypatch.setattr(password_executor, "max_pending", 0)
+    rejected = password_executor.rejected
+
+    response = client.post(
+        "/api/auth/signup",
+        json={
+            "email": "taken@example.com",
+            "password": "password123",
+            "username": "otheruser",
+        },
+    )
+
+    assert response.status_code == 409
+    assert password_executor.rejected == rejected
+
+
 def test_login_nonexistent_user(client):
     """Test login with non-existent user."""
     response = client.post(
@@ -159,6 +240,41 @@ def test_get_me_success(client, auth_headers):
     assert data["username"] == "testuser"
 
 
+def test_get_me_caches_user_lookup(client, auth_headers, monkeypatch):
+    """Test that repeated authenticated requests load the user once."""
+    lookups = []
+    get_user_by_id = Database.get_user_by_id
+    
+    def counting_get_user_by_id(self, user_id):
+        lookups.append(user_id)
+        return get_user_by_id(self, user_id)
+    
+    monkeypatch.setattr(Database, "get_user_by_id", counting_get_user_by_id)
+    
+    for _ in range(3):
+        response = client.get("/api/auth/me", headers=auth_headers)
+        assert response.status_code == 200
+        assert response.json()["username"] == "testuser"
+    
+    assert len(lookups) == 1
+    assert user_cache.hits >= 2
+
+
+def test_get_me_trusts_token_claims(client, auth_headers, monkeypatch):
+    """Test that trusted token claims skip the user lookup entirely."""
+    def no_lookup(self, user_id):
+        raise AssertionError("user was loaded from the database")
+    
+    monkeypatch.setattr(settings, "auth_trust_token_claims", True)
+    monkeypatch.setattr(Database, "get_user_by_id", no_lookup)
+    
+    response = client.get("/api/auth/me", headers=auth_headers)
+    
+    assert response.status_code == 200
+    assert response.json()["email"] == "test@example.com"
+    assert response.json()["username"] == "testuser"
+
+
 def test_get_me_unauthorized(client):
     """Test getting current user without authentication."""
     response = client.get("/api/auth/me")
@@ -184,6 +300,25 @@ def test_logout_success(client, auth_headers):
     assert "message" in data
 
 
+def test_logout_revokes_token(client, auth_headers):
+    """Test that a logged out token is rejected while new logins still work."""
+    response = client.post("/api/auth/logout", headers=auth_headers)
+    assert response.status_code == 200
+
+    response = client.get("/api/auth/me", headers=auth_headers)
+    assert response.status_code == 401
+
+    response = client.post(
+        "/api/auth/login",
+        json={"email": "test@example.com", "password": "testpass123"}
+    )
+    token = response.json()["token"]
+    response = client.get(
+        "/api/auth/me", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200
+
+
 def test_logout_unauthorized(client):
     """Test logout without authentication."""
     response = client.post("/api/auth/logout")
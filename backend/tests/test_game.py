@@ -1,6 +1,8 @@
 """
 Tests for game endpoints.
 """
+from app.rate_limit import score_submission_limiter
+from app.services.game_service import encode_leaderboard_cursor
 
 
 def test_submit_score_success(client, auth_headers):
@@ -50,6 +52,117 @@ def test_submit_score_invalid_mode(client, auth_headers):
     assert response.status_code == 422
 
 
+def test_submit_score_rate_limited(client, auth_headers, monkeypatch):
+    """Test that a player submitting too fast is turned away with Retry-After."""
+    monkeypatch.setattr(score_submission_limiter, "burst", 2)
+    monkeypatch.setattr(score_submission_limiter, "rate", 0.5)
+    statuses = [
+        client.post("/api/game/score", json={"score": 10, "mode": "walls"}, headers=auth_headers)
+        for _ in range(3)
+    ]
+    
+    assert [r.status_code for r in statuses] == [201, 201, 429]
+    assert statuses[2].headers["Retry-After"] == "2"
+    
+    # Other players have their own bucket
+    other = client.post(
+        "/api/auth/signup",
+        json={"email": "other@example.com", "password": "testpass123", "username": "otheruser"}
+    ).json()
+    response = client.post(
+        "/api/game/score",
+        json={"score": 10, "mode": "walls"},
+        headers={"Authorization": f"Bearer {other['token']}"}
+    )
+    assert response.status_code == 201
+
+
+def test_submit_score_idempotency_key(client, auth_headers):
+    """Test that a retried submission is only recorded once."""
+    headers = {**auth_headers, "Idempotency-Key": "game-1"}
+    first = client.post("/api/game/score", json={"score": 150, "mode": "walls"}, headers=headers)
+    retry = client.post("/api/game/score", json={"score": 150, "mode": "walls"}, headers=headers)
+    other = client.post(
+        "/api/game/score",
+        json={"score": 90, "mode": "walls"},
+        headers={**auth_headers, "Idempotency-Key": "game-2"}
+    )
+    
+    assert first.status_code == retry.status_code == other.status_code == 201
+    assert retry.json() == first.json()
+    assert first.json()["isNewHighScore"] is True
+    assert other.json()["isNewHighScore"] is False
+    
+    profile = client.get("/api/player/profile", headers=auth_headers).json()
+    assert profile["gamesPlayed"] == 2
+
+
+def test_get_score_rank(client, auth_headers):
+    """Test fetching the rank of a submitted score."""
+    submitted = client.post(
+        "/api/game/score", json={"score": 150, "mode": "walls"}, headers=auth_headers
+    ).json()
+    
+    response = client.get(f"/api/game/score/{submitted['scoreId']}/rank", headers=auth_headers)
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["scoreId"] == submitted["scoreId"]
+    assert data["rank"] == submitted["rank"] == 1
+    assert data["rankPending"] is False
+    
+    # Other players' scores are not visible
+    other = client.post(
+        "/api/auth/signup",
+        json={"email": "other@example.com", "password": "testpass123", "username": "otheruser"}
+    ).json()
+    response = client.get(
+        f"/api/game/score/{submitted['scoreId']}/rank",
+        headers={"Authorization": f"Bearer {other['token']}"}
+    )
+    assert response.status_code == 404
+
+
+def test_submit_score_batch(client, auth_headers):
+    """Test submitting several scores in one request."""
+    response = client.post(
+        "/api/game/scores:batch",
+        json={
+            "scores": [
+                {"score": 90, "mode": "walls"},
+                {"score": 140, "mode": "walls"},
+                {"score": 30, "mode": "passthrough"},
+            ]
+        },
+        headers=auth_headers
+    )
+    
+    assert response.status_code == 201
+    results = response.json()["results"]
+    assert [r["isNewHighScore"] for r in results] == [True, True, False]
+    assert [r["rank"] for r in results] == [2, 1, 1]
+    
+    leaderboard = client.get("/api/game/leaderboard?mode=walls").json()
+    assert leaderboard["entries"][0]["score"] == 140
+
+
+def test_submit_score_batch_limits(client, auth_headers):
+    """Test that empty and oversized batches are rejected."""
+    empty = client.post(
+        "/api/game/scores:batch",
+        json={"scores": []},
+        headers=auth_headers
+    )
+    oversized = client.post(
+        "/api/game/scores:batch",
+        json={"scores": [{"score": 1, "mode": "walls"}] * 101},
+        headers=auth_headers
+    )
+    
+    assert empty.status_code == 422
+    assert oversized.status_code == 422
+
+
 def test_get_leaderboard_success(client):
     """Test getting leaderboard."""
     response = client.get("/api/game/leaderboard")
@@ -86,6 +199,185 @@ def test_get_leaderboard_invalid_limit(client):
     assert response.status_code == 422
 
 
+def test_get_leaderboard_with_window(client, auth_headers):
+    """Test getting the weekly leaderboard."""
+    client.post(
+        "/api/game/score",
+        json={"score": 120, "mode": "walls"},
+        headers=auth_headers
+    )
+    
+    response = client.get("/api/game/leaderboard?window=week&mode=walls")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert data["entries"][0]["score"] == 120
+
+
+def test_get_leaderboard_invalid_window(client):
+    """Test leaderboard with an unknown window."""
+    response = client.get("/api/game/leaderboard?window=year")
+    
+    assert response.status_code == 422
+
+
+def test_get_leaderboard_conditional_get(client, auth_headers):
+    """Test ETag revalidation of the leaderboard."""
+    client.post(
+        "/api/game/score",
+        json={"score": 100, "mode": "walls"},
+        headers=auth_headers
+    )
+    
+    response = client.get("/api/game/leaderboard?mode=walls")
+    etag = response.headers["etag"]
+    assert "max-age" in response.headers["cache-control"]
+    
+    cached = client.get(
+        "/api/game/leaderboard?mode=walls",
+        headers={"If-None-Match": etag}
+    )
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == etag
+    
+    # A score below the player's best leaves the board unchanged
+    client.post(
+        "/api/game/score",
+        json={"score": 50, "mode": "walls"},
+        headers=auth_headers
+    )
+    assert client.get(
+        "/api/game/leaderboard?mode=walls",
+        headers={"If-None-Match": etag}
+    ).status_code == 304
+    
+    # A new best changes the board and its ETag
+    client.post(
+        "/api/game/score",
+        json={"score": 150, "mode": "walls"},
+        headers=auth_headers
+    )
+    refreshed = client.get(
+        "/api/game/leaderboard?mode=walls",
+        headers={"If-None-Match": etag}
+    )
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+    assert refreshed.json()["entries"][0]["score"] == 150
+
+
+def test_get_leaderboard_hot_page_matches_regular_page(client, auth_headers):
+    """Test that pre-serialized hot pages match other pages and stay current."""
+    client.post(
+        "/api/game/score",
+        json={"score": 80, "mode": "walls"},
+        headers=auth_headers
+    )
+    
+    hot = client.get("/api/game/leaderboard?mode=walls&limit=50")
+    regular = client.get("/api/game/leaderboard?mode=walls&limit=7")
+    
+    assert hot.headers["content-type"] == "application/json"
+    assert hot.json() == regular.json()
+    assert hot.json()["entries"][0]["score"] == 80
+    
+    client.post(
+        "/api/game/score",
+        json={"score": 95, "mode": "walls"},
+        headers=auth_headers
+    )
+    
+    refreshed = client.get("/api/game/leaderboard?mode=walls&limit=50")
+    assert refreshed.json()["entries"][0]["score"] == 95
+
+
+def test_get_leaderboard_invalid_cursor(client):
+    """Test leaderboard with a malformed cursor."""
+    response = client.get("/api/game/leaderboard?after=not-a-cursor")
+    
+    assert response.status_code == 400
+
+
+def test_submit_score_retry_not_rate_limited(client, auth_headers, monkeypatch):
+    """Test that retries of a recorded submission take no token."""
+    monkeypatch.setattr(score_submission_limiter, "burst", 1)
+    monkeypatch.setattr(score_submission_limiter, "rate", 0.01)
+    headers = {**auth_headers, "Idempotency-Key": "game-1"}
+    
+    first = client.post("/api/game/score", json={"score": 10, "mode": "walls"}, headers=headers)
+    retry = client.post("/api/game/score", json={"score": 10, "mode": "walls"}, headers=headers)
+    
+    assert (first.status_code, retry.status_code) == (201, 201)
+    assert retry.json() == first.json()
+    
+    other = client.post(
+        "/api/game/score",
+        json={"score": 10, "mode": "walls"},
+        headers={**auth_headers, "Idempotency-Key": "game-2"}
+    )
+    assert other.status_code == 429
+
+
+def test_submit_score_batch_takes_token_per_score(client, auth_headers, monkeypatch):
+    """Test that a batch is throttled like its scores submitted one by one."""
+    monkeypatch.setattr(score_submission_limiter, "burst", 3)
+    monkeypatch.setattr(score_submission_limiter, "rate", 0.01)
+    scores = [{"score": 10 * i, "mode": "walls"} for i in range(1, 4)]
+    
+    batch = client.post("/api/game/scores:batch", json={"scores": scores}, headers=auth_headers)
+    single = client.post("/api/game/score", json={"score": 5, "mode": "walls"}, headers=auth_headers)
+    
+    assert batch.status_code == 201
+    assert single.status_code == 429
+
+
+def test_get_leaderboard_forged_cursor(client):
+    """Test that cursors the server could not have issued are rejected."""
+    for position in ([500, "", -10], [500, "", 0], [2**70, "", 1], [-1, "", 1], [True, "", 1]):
+        cursor = encode_leaderboard_cursor(*position)
+        response = client.get(f"/api/game/leaderboard?mode=walls&after={cursor}")
+        
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid leaderboard cursor"
+
+
+def test_get_leaderboard_around_me(client, auth_headers):
+    """Test getting the current player's neighbourhood on the leaderboard."""
+    client.post(
+        "/api/game/score",
+        json={"score": 90, "mode": "walls"},
+        headers=auth_headers
+    )
+    
+    response = client.get(
+        "/api/game/leaderboard/around-me?mode=walls&radius=2",
+        headers=auth_headers
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["rank"] == 1
+    assert [entry["username"] for entry in data["entries"]] == ["testuser"]
+
+
+def test_get_leaderboard_around_me_without_score(client, auth_headers):
+    """Test around-me before the player has a score in the mode."""
+    response = client.get(
+        "/api/game/leaderboard/around-me?mode=passthrough",
+        headers=auth_headers
+    )
+    
+    assert response.status_code == 404
+
+
+def test_get_leaderboard_around_me_unauthorized(client):
+    """Test around-me without authentication."""
+    response = client.get("/api/game/leaderboard/around-me")
+    
+    assert response.status_code == 401
+
+
 def test_get_live_games_success(client):
     """Test getting live games."""
     response = client.get("/api/game/live")
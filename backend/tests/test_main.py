@@ -1,6 +1,7 @@
 """
 Tests for main application endpoints.
 """
+from app.config import settings
 
 
 def test_root_endpoint(client):
@@ -21,3 +22,35 @@ def test_health_endpoint(client):
     assert response.status_code == 200
     data = response.json()
     assert data["status"] == "healthy"
+
+
+def test_metrics_endpoint(client, monkeypatch):
+    """Test metrics endpoint reports password executor counters."""
+    monkeypatch.setattr(settings, "metrics_token", "scraper-token")
+    client.post(
+        "/api/auth/signup",
+        json={
+            "email": "metrics@example.com",
+            "password": "password123",
+            "username": "metricsuser",
+        },
+    )
+    response = client.get(
+        "/metrics", headers={"Authorization": "Bearer scraper-token"}
+    )
+    
+    assert response.status_code == 200
+    stats = response.json()["password_executor"]
+    assert stats["completed"] >= 1
+    assert stats["pending"] == 0
+
+
+def test_metrics_endpoint_requires_token(client, monkeypatch):
+    """Test that metrics are hidden unless configured and the token matches."""
+    assert client.get("/metrics").status_code == 404
+    
+    monkeypatch.setattr(settings, "metrics_token", "scraper-token")
+    assert client.get("/metrics").status_code == 401
+    assert client.get(
+        "/metrics", headers={"Authorization": "Bearer wrong-token"}
+    ).status_code == 401
@@ -9,8 +9,22 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.auth import token_cache
+from app.config import settings
 from app.db_models import Base
-from app.database import get_db
+from app.database import get_db, rank_cache, user_cache
+from app.passwords import password_executor
+from app.rate_limit import score_submission_limiter
+from app.revocation import token_revocations
+from app.services.game_service import (
+    hot_leaderboard_page_cache,
+    idempotency_cache,
+    leaderboard_page_cache,
+)
+
+
+# Cheapest bcrypt cost: the tests exercise hashing, not its strength
+settings.bcrypt_rounds = 4
 
 
 # Create in-memory SQLite database for integration testing
@@ -38,6 +52,16 @@ def integration_db_session():
     # Cleanup
     session.close()
     Base.metadata.drop_all(bind=engine)
+    rank_cache.clear()
+    leaderboard_page_cache.clear()
+    hot_leaderboard_page_cache.clear()
+    idempotency_cache.clear()
+    score_submission_limiter.clear()
+    user_cache.clear()
+    token_cache.clear()
+    token_revocations.clear()
+    # Service tests start the pool lazily, outside any app lifespan
+    password_executor.shutdown()
 
 
 @pytest.fixture
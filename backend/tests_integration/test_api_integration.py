@@ -296,3 +296,74 @@ def test_leaderboard_pagination_integration(integration_client):
     page1_usernames = {e["username"] for e in page1_data["entries"]}
     page2_usernames = {e["username"] for e in page2_data["entries"]}
     assert len(page1_usernames.intersection(page2_usernames)) == 0
+
+
+def test_leaderboard_cursor_pagination_integration(integration_client):
+    """Test walking the leaderboard with nextCursor instead of offset."""
+    # Create 5 users, two of them tied
+    for i, score in enumerate([500, 400, 400, 200, 100]):
+        signup = integration_client.post(
+            "/api/auth/signup",
+            json={
+                "email": f"cursor{i}@example.com",
+                "username": f"cursor{i}",
+                "password": "pass1234",
+            },
+        )
+        token = signup.json()["token"]
+
+        integration_client.post(
+            "/api/game/score",
+            json={"score": score, "mode": "walls"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+
+    offset_page = integration_client.get(
+        "/api/game/leaderboard?mode=walls&limit=5"
+    ).json()
+    assert offset_page["nextCursor"] is None
+
+    entries = []
+    url = "/api/game/leaderboard?mode=walls&limit=2"
+    page = integration_client.get(url).json()
+    entries.extend(page["entries"])
+    while page["nextCursor"]:
+        page = integration_client.get(f"{url}&after={page['nextCursor']}").json()
+        entries.extend(page["entries"])
+
+    assert [(e["rank"], e["username"]) for e in entries] == [
+        (e["rank"], e["username"]) for e in offset_page["entries"]
+    ]
+
+
+def test_leaderboard_cursor_ranks_follow_board_changes(integration_client):
+    """Test that a cursor page is ranked by the board as it is now."""
+    tokens = []
+    for i, score in enumerate([500, 400, 300, 200]):
+        signup = integration_client.post(
+            "/api/auth/signup",
+            json={
+                "email": f"drift{i}@example.com",
+                "username": f"drift{i}",
+                "password": "pass1234",
+            },
+        )
+        tokens.append(signup.json()["token"])
+        integration_client.post(
+            "/api/game/score",
+            json={"score": score, "mode": "walls"},
+            headers={"Authorization": f"Bearer {tokens[-1]}"},
+        )
+
+    url = "/api/game/leaderboard?mode=walls&limit=2"
+    cursor = integration_client.get(url).json()["nextCursor"]
+
+    # The last player overtakes everyone between the two page requests
+    integration_client.post(
+        "/api/game/score",
+        json={"score": 900, "mode": "walls"},
+        headers={"Authorization": f"Bearer {tokens[3]}"},
+    )
+
+    page = integration_client.get(f"{url}&after={cursor}").json()
+    assert [(e["rank"], e["username"]) for e in page["entries"]] == [(4, "drift2")]
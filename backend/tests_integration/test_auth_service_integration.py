@@ -3,13 +3,15 @@ Integration tests for AuthService.
 Tests authentication service with real database operations.
 """
 import pytest
+from app.config import settings
+from app.database import Database
 from app.services.auth_service import AuthService
 from app.models import AuthResponse
 
 
-def test_signup_success(integration_db_session):
+async def test_signup_success(integration_db_session):
     """Test successful user signup."""
-    response = AuthService.signup(
+    response = await AuthService.signup(
         email="newuser@example.com",
         username="newuser",
         password="securepass123",
@@ -24,10 +26,10 @@ def test_signup_success(integration_db_session):
     assert len(response.token) > 0
 
 
-def test_signup_duplicate_email(integration_db_session):
+async def test_signup_duplicate_email(integration_db_session):
     """Test signup with duplicate email raises error."""
     # Create first user
-    AuthService.signup(
+    await AuthService.signup(
         email="duplicate@example.com",
         username="user1",
         password="pass123",
@@ -36,7 +38,7 @@ def test_signup_duplicate_email(integration_db_session):
     
     # Try to create second user with same email
     with pytest.raises(ValueError, match="Email already exists"):
-        AuthService.signup(
+        await AuthService.signup(
             email="duplicate@example.com",
             username="user2",
             password="pass456",
@@ -44,10 +46,10 @@ def test_signup_duplicate_email(integration_db_session):
         )
 
 
-def test_signup_duplicate_username(integration_db_session):
+async def test_signup_duplicate_username(integration_db_session):
     """Test signup with duplicate username raises error."""
     # Create first user
-    AuthService.signup(
+    await AuthService.signup(
         email="user1@example.com",
         username="sameusername",
         password="pass123",
@@ -56,7 +58,7 @@ def test_signup_duplicate_username(integration_db_session):
     
     # Try to create second user with same username
     with pytest.raises(ValueError, match="Username already exists"):
-        AuthService.signup(
+        await AuthService.signup(
             email="user2@example.com",
             username="sameusername",
             password="pass456",
@@ -64,10 +66,10 @@ def test_signup_duplicate_username(integration_db_session):
         )
 
 
-def test_login_success(integration_db_session):
+async def test_login_success(integration_db_session):
     """Test successful login."""
     # Create user
-    AuthService.signup(
+    await AuthService.signup(
         email="login@example.com",
         username="loginuser",
         password="correctpass",
@@ -75,7 +77,7 @@ def test_login_success(integration_db_session):
     )
     
     # Login
-    user, error = AuthService.login(
+    user, error = await AuthService.login(
         email="login@example.com",
         password="correctpass",
         db=integration_db_session
@@ -87,10 +89,35 @@ def test_login_success(integration_db_session):
     assert user["username"] == "loginuser"
 
 
-def test_login_wrong_password(integration_db_session):
+async def test_login_rehashes_password_at_new_cost(integration_db_session, monkeypatch):
+    """Test that a successful login upgrades a hash made at an old cost."""
+    monkeypatch.setattr(settings, "bcrypt_rounds", 4)
+    await AuthService.signup(
+        email="rehash@example.com",
+        username="rehashuser",
+        password="correctpass",
+        db=integration_db_session
+    )
+    monkeypatch.setattr(settings, "bcrypt_rounds", 5)
+    
+    # A wrong password leaves the hash alone
+    await AuthService.login("rehash@example.com", "wrongpassword", integration_db_session)
+    database = Database(integration_db_session)
+    assert database.get_user_by_email("rehash@example.com")["password_hash"].startswith("$2b$04$")
+    
+    user, error = await AuthService.login("rehash@example.com", "correctpass", integration_db_session)
+    
+    assert error is None
+    stored = database.get_user_by_email("rehash@example.com")["password_hash"]
+    assert stored.startswith("$2b$05$")
+    assert stored == user["password_hash"]
+    assert database.verify_password("correctpass", stored)
+
+
+async def test_login_wrong_password(integration_db_session):
     """Test login with incorrect password."""
     # Create user
-    AuthService.signup(
+    await AuthService.signup(
         email="wrongpass@example.com",
         username="wrongpassuser",
         password="correctpass",
@@ -98,7 +125,7 @@ def test_login_wrong_password(integration_db_session):
     )
     
     # Try to login with wrong password
-    user, error = AuthService.login(
+    user, error = await AuthService.login(
         email="wrongpass@example.com",
         password="wrongpassword",
         db=integration_db_session
@@ -108,9 +135,9 @@ def test_login_wrong_password(integration_db_session):
     assert error == "Invalid email or password"
 
 
-def test_login_nonexistent_email(integration_db_session):
+async def test_login_nonexistent_email(integration_db_session):
     """Test login with non-existent email."""
-    user, error = AuthService.login(
+    user, error = await AuthService.login(
         email="nonexistent@example.com",
         password="somepass",
         db=integration_db_session
@@ -120,10 +147,10 @@ def test_login_nonexistent_email(integration_db_session):
     assert error == "Invalid email or password"
 
 
-def test_create_auth_response(integration_db_session):
+async def test_create_auth_response(integration_db_session):
     """Test creating auth response from user dict."""
     # Create user
-    AuthService.signup(
+    await AuthService.signup(
         email="authresp@example.com",
         username="authrespuser",
         password="pass123",
@@ -131,7 +158,7 @@ def test_create_auth_response(integration_db_session):
     )
     
     # Login to get user dict
-    user, _ = AuthService.login(
+    user, _ = await AuthService.login(
         email="authresp@example.com",
         password="pass123",
         db=integration_db_session
@@ -145,10 +172,10 @@ def test_create_auth_response(integration_db_session):
     assert response.token is not None
 
 
-def test_get_user_info(integration_db_session):
+async def test_get_user_info(integration_db_session):
     """Test getting user info from user dict."""
     # Create user
-    AuthService.signup(
+    await AuthService.signup(
         email="userinfo@example.com",
         username="userinfouser",
         password="pass123",
@@ -156,7 +183,7 @@ def test_get_user_info(integration_db_session):
     )
     
     # Login to get user dict
-    user, _ = AuthService.login(
+    user, _ = await AuthService.login(
         email="userinfo@example.com",
         password="pass123",
         db=integration_db_session
@@ -170,10 +197,10 @@ def test_get_user_info(integration_db_session):
     assert user_info.id == user["id"]
 
 
-def test_complete_auth_flow(integration_db_session):
+async def test_complete_auth_flow(integration_db_session):
     """Test complete authentication flow: signup -> login -> get info."""
     # Signup
-    signup_response = AuthService.signup(
+    signup_response = await AuthService.signup(
         email="complete@example.com",
         username="completeuser",
         password="mypass123",
@@ -184,7 +211,7 @@ def test_complete_auth_flow(integration_db_session):
     signup_token = signup_response.token
     
     # Login
-    user, error = AuthService.login(
+    user, error = await AuthService.login(
         email="complete@example.com",
         password="mypass123",
         db=integration_db_session
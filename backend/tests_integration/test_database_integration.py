@@ -4,9 +4,17 @@ Tests the Database class with actual SQLite database to verify CRUD operations,
 score management, and leaderboard queries.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, UTC
+
 import pytest
-from app.database import Database
-from app.models import GameMode
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Database, leaderboard_versions, user_cache, window_start
+from app.db_models import Base, PlayerModeBest, PlayerWindowBest, Score
+from app.models import GameMode, LeaderboardWindow
+from app.passwords import hash_password
 
 
 def test_create_user(integration_db_session):
@@ -115,6 +123,22 @@ def test_verify_password_incorrect(integration_db_session):
     assert db.verify_password("wrongpass", user["password_hash"]) is False
 
 
+def test_update_password_hash_invalidates_cached_user(integration_db_session):
+    """Test that changing a user drops their cached record."""
+    db = Database(integration_db_session)
+
+    user = db.create_user(
+        email="cached@example.com", username="cacheduser", password="oldpass"
+    )
+    user_cache.set(user["id"], {"id": user["id"]})
+
+    db.update_password_hash(user["id"], hash_password("newpass"))
+
+    assert user_cache.get(user["id"]) is None
+    stored = db.get_user_by_id(user["id"])["password_hash"]
+    assert db.verify_password("newpass", stored) is True
+
+
 def test_get_player_profile(integration_db_session):
     """Test retrieving player profile."""
     db = Database(integration_db_session)
@@ -205,6 +229,39 @@ def test_get_rank(integration_db_session):
     assert rank_50 == 4  # Lowest score
 
 
+def test_get_ranks_bulk(integration_db_session):
+    """Test resolving several ranks at once."""
+    db = Database(integration_db_session)
+
+    for i, score in enumerate([100, 200, 150]):
+        user = db.create_user(f"bulk{i}@example.com", f"bulk{i}", "pass")
+        db.add_score(user["id"], score, GameMode.WALLS)
+
+    ranks = db.get_ranks([250, 175, 50, 175], GameMode.WALLS)
+
+    assert ranks == {250: 1, 175: 2, 50: 4}
+
+
+def test_rank_cache_invalidated_by_new_best(integration_db_session):
+    """Test that cached ranks refresh only when a best score changes."""
+    db = Database(integration_db_session)
+
+    user1 = db.create_user("cache1@example.com", "cacheuser1", "pass")
+    user2 = db.create_user("cache2@example.com", "cacheuser2", "pass")
+
+    db.add_score(user1["id"], 100, GameMode.WALLS)
+    assert db.get_rank(150, GameMode.WALLS) == 1
+
+    # A score below the player's best leaves the ranking (and version) alone
+    version = leaderboard_versions.get(GameMode.WALLS)
+    db.add_score(user1["id"], 50, GameMode.WALLS)
+    assert leaderboard_versions.get(GameMode.WALLS) == version
+
+    db.add_score(user2["id"], 200, GameMode.WALLS)
+    assert leaderboard_versions.get(GameMode.WALLS) == version + 1
+    assert db.get_rank(150, GameMode.WALLS) == 2
+
+
 def test_get_leaderboard(integration_db_session):
     """Test retrieving leaderboard entries."""
     db = Database(integration_db_session)
@@ -287,6 +344,262 @@ def test_get_leaderboard_mode_filter(integration_db_session):
     assert len(entries) == 2
 
 
+def test_get_leaderboard_uses_best_score_per_player(integration_db_session):
+    """Test that pagination and totals are per player, not per score row."""
+    db = Database(integration_db_session)
+
+    user1 = db.create_user("best1@example.com", "bestuser1", "pass")
+    user2 = db.create_user("best2@example.com", "bestuser2", "pass")
+
+    db.add_score(user1["id"], 100, GameMode.WALLS)
+    db.add_score(user1["id"], 400, GameMode.WALLS)
+    db.add_score(user2["id"], 300, GameMode.WALLS)
+    db.add_score(user2["id"], 200, GameMode.WALLS)
+
+    entries, total = db.get_leaderboard(mode=GameMode.WALLS, limit=1, offset=1)
+
+    assert total == 2
+    assert len(entries) == 1
+    assert entries[0]["username"] == "bestuser2"
+    assert entries[0]["score"] == 300
+    assert entries[0]["rank"] == 2
+
+
+def test_add_score_maintains_mode_bests(integration_db_session):
+    """Test that add_score keeps one best score row per player and mode."""
+    db = Database(integration_db_session)
+
+    user = db.create_user("bests@example.com", "bestsuser", "pass")
+
+    db.add_score(user["id"], 120, GameMode.WALLS)
+    db.add_score(user["id"], 80, GameMode.WALLS)
+    db.add_score(user["id"], 200, GameMode.WALLS)
+    db.add_score(user["id"], 60, GameMode.PASSTHROUGH)
+
+    bests = {
+        row.mode: row.best_score
+        for row in integration_db_session.execute(select(PlayerModeBest)).scalars()
+    }
+
+    assert bests == {GameMode.WALLS: 200, GameMode.PASSTHROUGH: 60}
+
+
+def test_add_score_concurrent_submissions(tmp_path):
+    """Test that parallel submissions for one player never lose an update."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'concurrent.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+    )
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+
+    with session_factory() as session:
+        user_id = Database(session).create_user(
+            "racer@example.com", "racer", "pass"
+        )["id"]
+
+    scores = list(range(1, 301))
+
+    def submit(score):
+        with session_factory() as session:
+            return score, Database(session).add_score(user_id, score, GameMode.WALLS)
+
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = dict(pool.map(submit, scores))
+
+        with session_factory() as session:
+            db = Database(session)
+            player = db.get_player(user_id)
+            assert player["games_played"] == len(scores)
+            assert player["high_score"] == max(scores)
+            assert session.execute(
+                select(func.count()).select_from(Score)
+            ).scalar_one() == len(scores)
+
+        # Whenever the top score landed, it beat everything before it
+        assert results[max(scores)]["is_new_high_score"] is True
+        assert any(not result["is_new_high_score"] for result in results.values())
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+
+
+def test_add_score_request_key(integration_db_session, monkeypatch):
+    """Test that a retried request key replays the first result without writing."""
+    db = Database(integration_db_session)
+    user_id = db.create_user("retry@example.com", "retryuser", "pass")["id"]
+
+    first = db.add_score(user_id, 100, GameMode.WALLS, request_key="k1")
+    second = db.add_score(user_id, 50, GameMode.WALLS, request_key="k2")
+    assert db.add_score(user_id, 100, GameMode.WALLS, request_key="k1") == first
+    assert db.add_score(user_id, 50, GameMode.WALLS, request_key="k2") == second
+    assert first["is_new_high_score"] is True
+    assert second["is_new_high_score"] is False
+
+    # A retry racing the original past the lookup hits the unique key instead
+    replayed_score = Database._replayed_score
+    lookups = []
+
+    def miss_first_lookup(self, *args):
+        lookups.append(args)
+        return None if len(lookups) == 1 else replayed_score(self, *args)
+
+    monkeypatch.setattr(Database, "_replayed_score", miss_first_lookup)
+    assert db.add_score(user_id, 100, GameMode.WALLS, request_key="k1") == first
+    assert len(lookups) == 2
+
+    player = db.get_player(user_id)
+    assert player["games_played"] == 2
+    assert player["high_score"] == 100
+    assert integration_db_session.execute(
+        select(func.count()).select_from(Score)
+    ).scalar_one() == 2
+
+
+def test_add_score_batch(integration_db_session):
+    """Test submitting several scores for a player in one transaction."""
+    db = Database(integration_db_session)
+
+    rival = db.create_user("rival@example.com", "rivaluser", "pass")
+    db.add_score(rival["id"], 150, GameMode.WALLS)
+    user = db.create_user("batch@example.com", "batchuser", "pass")
+
+    results = db.add_score_batch(
+        user["id"],
+        [
+            (100, GameMode.WALLS),
+            (80, GameMode.WALLS),
+            (40, GameMode.PASSTHROUGH),
+            (200, GameMode.WALLS),
+        ],
+    )
+
+    assert [r["is_new_high_score"] for r in results] == [True, False, False, True]
+    # Ranks reflect the whole batch: the player's best of 200 now leads walls
+    assert [r["rank"] for r in results] == [3, 3, 1, 1]
+
+    player = db.get_player(user["id"])
+    assert player["games_played"] == 4
+    assert player["high_score"] == 200
+
+    rows = integration_db_session.execute(
+        select(Score).where(Score.user_id == user["id"])
+    ).scalars().all()
+    assert sorted(row.score for row in rows) == [40, 80, 100, 200]
+
+    bests = {
+        row.mode: row.best_score
+        for row in integration_db_session.execute(
+            select(PlayerModeBest).where(PlayerModeBest.user_id == user["id"])
+        ).scalars()
+    }
+    assert bests == {GameMode.WALLS: 200, GameMode.PASSTHROUGH: 40}
+
+    with pytest.raises(ValueError):
+        db.add_score_batch("missing-user", [(10, GameMode.WALLS)])
+
+
+def test_rebuild_player_mode_bests(integration_db_session):
+    """Test rebuilding best scores from raw score rows."""
+    db = Database(integration_db_session)
+
+    user = db.create_user("rebuild@example.com", "rebuilduser", "pass")
+    integration_db_session.add_all(
+        [
+            Score(user_id=user["id"], score=90, mode=GameMode.WALLS),
+            Score(user_id=user["id"], score=150, mode=GameMode.WALLS),
+        ]
+    )
+    integration_db_session.commit()
+
+    db.rebuild_player_mode_bests()
+
+    entries, total = db.get_leaderboard(mode=GameMode.WALLS, limit=10, offset=0)
+    assert total == 1
+    assert entries[0]["score"] == 150
+    assert db.get_rank(100, GameMode.WALLS) == 2
+
+
+def test_window_start():
+    """Test day, week (Monday) and month bucket boundaries."""
+    at = datetime(2024, 5, 16, 13, 45, tzinfo=UTC)  # a Thursday
+
+    assert window_start(LeaderboardWindow.DAY, at) == datetime(2024, 5, 16)
+    assert window_start(LeaderboardWindow.WEEK, at) == datetime(2024, 5, 13)
+    assert window_start(LeaderboardWindow.MONTH, at) == datetime(2024, 5, 1)
+
+
+def test_get_windowed_leaderboard(integration_db_session):
+    """Test that windowed boards rank scores from the current bucket only."""
+    db = Database(integration_db_session)
+
+    user1 = db.create_user("week1@example.com", "weekuser1", "pass")
+    user2 = db.create_user("week2@example.com", "weekuser2", "pass")
+
+    db.add_score(user1["id"], 300, GameMode.WALLS)
+    db.add_score(user2["id"], 100, GameMode.WALLS)
+    db.add_score(user2["id"], 250, GameMode.PASSTHROUGH)
+
+    # An old bucket that should not show up on the current board
+    last_month = datetime.now(UTC) - timedelta(days=40)
+    integration_db_session.add(
+        PlayerWindowBest(
+            period=LeaderboardWindow.WEEK,
+            bucket_start=window_start(LeaderboardWindow.WEEK, last_month),
+            mode=GameMode.WALLS,
+            user_id=user2["id"],
+            username="weekuser2",
+            best_score=999,
+            best_score_at=last_month.replace(tzinfo=None),
+        )
+    )
+    integration_db_session.commit()
+
+    entries, total = db.get_leaderboard(
+        mode=GameMode.WALLS, window=LeaderboardWindow.WEEK
+    )
+    assert total == 2
+    assert [(e["username"], e["score"]) for e in entries] == [
+        ("weekuser1", 300),
+        ("weekuser2", 100),
+    ]
+
+    entries, total = db.get_leaderboard(mode=None, window=LeaderboardWindow.DAY)
+    assert total == 2
+    assert [(e["username"], e["score"]) for e in entries] == [
+        ("weekuser1", 300),
+        ("weekuser2", 250),
+    ]
+
+    assert db.purge_expired_window_bests() == 1
+
+
+def test_rebuild_window_bests(integration_db_session):
+    """Test backfilling window buckets from raw score rows."""
+    db = Database(integration_db_session)
+
+    user = db.create_user("backfill@example.com", "backfilluser", "pass")
+    now = datetime.now(UTC)
+    integration_db_session.add_all(
+        [
+            Score(user_id=user["id"], score=50,
+                  mode=GameMode.WALLS, created_at=now),
+            Score(user_id=user["id"], score=500,
+                  mode=GameMode.WALLS, created_at=now - timedelta(days=400)),
+        ]
+    )
+    integration_db_session.commit()
+
+    db.rebuild_window_bests()
+
+    entries, total = db.get_leaderboard(
+        mode=GameMode.WALLS, window=LeaderboardWindow.MONTH
+    )
+    assert total == 1
+    assert entries[0]["score"] == 50
+
+
 def test_get_live_games(integration_db_session):
     """Test getting live games (currently returns empty list)."""
     db = Database(integration_db_session)
@@ -0,0 +1,351 @@
+"""
+Integration tests for the score event log and the projections rebuilt from it.
+Covers segment rotation, torn records, and projections matching the tables
+the database maintains.
+"""
+
+from datetime import datetime, timedelta, UTC
+
+from sqlalchemy import delete, select
+
+import pytest
+
+from app import main, score_events
+from app.config import settings
+from app.database import Database
+from app.db_models import PlayerModeBest, PlayerWindowBest
+from app.event_log import (
+    covers_history,
+    read_coverage,
+    write_coverage,
+    EVENT_SCORE,
+    ScoreEvent,
+    ScoreEventLog,
+    read_events,
+    score_event_log,
+    segment_paths,
+)
+from app.leaderboard_index import leaderboard_index
+from app.main import warm_leaderboard_index, warm_leaderboard_index_from_log
+from app.models import GameMode
+from app.projections import (
+    ModeBestsProjection,
+    PlayerStatsProjection,
+    WindowBestsProjection,
+    replay,
+)
+
+
+def make_event(score_id: int, score: int = 10) -> ScoreEvent:
+    return ScoreEvent(
+        kind=EVENT_SCORE,
+        score_id=score_id,
+        user_id=f"user-{score_id % 3}",
+        username=f"player{score_id % 3}",
+        mode=GameMode.WALLS if score_id % 2 else GameMode.PASSTHROUGH,
+        score=score,
+        played_at=datetime(2026, 1, 1) + timedelta(seconds=score_id),
+    )
+
+
+def best_rows(session, model) -> list[tuple]:
+    rows = session.execute(
+        select(
+            model.user_id,
+            model.mode,
+            model.username,
+            model.best_score,
+            model.best_score_at,
+        )
+    ).all()
+    return sorted(tuple(row) for row in rows)
+
+
+def projected_rows(projection) -> list[tuple]:
+    return sorted(
+        (
+            row["user_id"],
+            row["mode"],
+            row["username"],
+            row["best_score"],
+            row["best_score_at"],
+        )
+        for row in projection.rows()
+    )
+
+
+def test_event_log_round_trip_across_segments(tmp_path):
+    """Test that events come back in order after rotation and a reopen."""
+    events = [make_event(score_id, score_id * 7) for score_id in range(1, 41)]
+
+    log = ScoreEventLog()
+    log.open(tmp_path, segment_max_bytes=256)
+    try:
+        for start in range(0, 30, 3):
+            assert log.append(events[start : start + 3]) == start
+    finally:
+        log.close()
+
+    log.open(tmp_path, segment_max_bytes=256)
+    try:
+        assert log.next_sequence == 30
+        log.append(events[30:])
+    finally:
+        log.close()
+
+    assert len(segment_paths(tmp_path)) > 1
+    assert list(read_events(tmp_path)) == events
+
+
+def test_event_log_discards_torn_record(tmp_path):
+    """Test that a record cut short by a crash is skipped, then cut off on open."""
+    log = ScoreEventLog()
+    log.open(tmp_path, segment_max_bytes=1024)
+    log.append([make_event(1), make_event(2)])
+    log.close()
+    segment = segment_paths(tmp_path)[-1]
+    with open(segment, "ab") as file:
+        file.write(b"\x30\x00\x00\x00\x12\x34")
+
+    assert [event.score_id for event in read_events(tmp_path)] == [1, 2]
+
+    log.open(tmp_path, segment_max_bytes=1024)
+    try:
+        assert log.next_sequence == 2
+        log.append([make_event(3)])
+    finally:
+        log.close()
+
+    assert [event.score_id for event in read_events(tmp_path)] == [1, 2, 3]
+
+
+def test_projections_match_database(integration_db_session, tmp_path):
+    """Test that replaying the log rebuilds what the database maintained."""
+    db = Database(integration_db_session)
+    alice = db.create_user("alice@example.com", "alice", "pass")["id"]
+    bob = db.create_user("bob@example.com", "bob", "pass")["id"]
+
+    score_event_log.open(tmp_path, segment_max_bytes=512)
+    try:
+        db.add_score(alice, 120, GameMode.WALLS)
+        db.add_score(alice, 80, GameMode.PASSTHROUGH, request_key="game-1")
+        # A retry is not a new game
+        db.add_score(alice, 80, GameMode.PASSTHROUGH, request_key="game-1")
+        db.add_scores([(bob, 90, GameMode.WALLS), (bob, 150, GameMode.WALLS)])
+        results = db.add_score_batch(
+            bob, [(40, GameMode.PASSTHROUGH), (60, GameMode.PASSTHROUGH)]
+        )
+        assert all(result["score_id"] for result in results)
+    finally:
+        score_event_log.close()
+
+    assert [event.score for event in read_events(tmp_path)] == [120, 80, 90, 150, 40, 60]
+
+    stats = PlayerStatsProjection()
+    mode_bests = ModeBestsProjection()
+    window_bests = WindowBestsProjection()
+    assert replay([tmp_path], [stats, mode_bests, window_bests])["events"] == 6
+
+    for user_id in (alice, bob):
+        player = db.get_player(user_id)
+        assert stats.players[user_id]["games_played"] == player["games_played"]
+        assert stats.players[user_id]["high_score"] == player["high_score"]
+    assert projected_rows(mode_bests) == best_rows(integration_db_session, PlayerModeBest)
+    assert len(window_bests.rows()) == len(
+        integration_db_session.execute(select(PlayerWindowBest)).all()
+    )
+
+    # Lose the derived tables, then load them back from the log
+    expected_window_bests = best_rows(integration_db_session, PlayerWindowBest)
+    integration_db_session.execute(delete(PlayerModeBest))
+    integration_db_session.execute(delete(PlayerWindowBest))
+    integration_db_session.commit()
+    db.load_projections(stats.rows(), mode_bests.rows(), window_bests.rows())
+
+    assert projected_rows(mode_bests) == best_rows(integration_db_session, PlayerModeBest)
+    assert best_rows(integration_db_session, PlayerWindowBest) == expected_window_bests
+
+
+def test_rebuild_keeps_players_missing_from_log(integration_db_session, tmp_path):
+    """Test that players with no events keep their best scores on a rebuild."""
+    db = Database(integration_db_session)
+    veteran = db.create_user("veteran@example.com", "veteran", "pass")["id"]
+    newcomer = db.create_user("newcomer@example.com", "newcomer", "pass")["id"]
+    # Scored before the log existed
+    db.add_score(veteran, 500, GameMode.WALLS)
+    expected_bests = [
+        row for row in best_rows(integration_db_session, PlayerModeBest)
+        if row[0] == veteran
+    ]
+    expected_window_bests = [
+        row for row in best_rows(integration_db_session, PlayerWindowBest)
+        if row[0] == veteran
+    ]
+
+    score_event_log.open(tmp_path, segment_max_bytes=1024)
+    try:
+        db.add_score(newcomer, 70, GameMode.WALLS)
+    finally:
+        score_event_log.close()
+
+    stats = PlayerStatsProjection()
+    mode_bests = ModeBestsProjection()
+    window_bests = WindowBestsProjection()
+    replay([tmp_path], [stats, mode_bests, window_bests])
+    db.load_projections(stats.rows(), mode_bests.rows(), window_bests.rows())
+
+    bests = best_rows(integration_db_session, PlayerModeBest)
+    assert [row for row in bests if row[0] == veteran] == expected_bests
+    assert [row for row in bests if row[0] == newcomer] == projected_rows(mode_bests)
+    assert [
+        row for row in best_rows(integration_db_session, PlayerWindowBest)
+        if row[0] == veteran
+    ] == expected_window_bests
+    assert db.get_player(veteran)["high_score"] == 500
+    assert db.get_leaderboard(GameMode.WALLS)[0][0]["username"] == "veteran"
+
+
+def test_bootstrapped_log_includes_archived_scores(integration_db_session, tmp_path):
+    """Test that a log exported from the database keeps archived games."""
+    db = Database(integration_db_session)
+    user_id = db.create_user("old@example.com", "oldtimer", "pass")["id"]
+    long_ago = datetime.now(UTC) - timedelta(days=200)
+    db.add_score(user_id, 300, GameMode.WALLS, played_at=long_ago)
+    db.add_score(user_id, 100, GameMode.WALLS, played_at=long_ago + timedelta(hours=1))
+    db.add_score(user_id, 200, GameMode.WALLS)
+    assert db.archive_scores(datetime.now(UTC) - timedelta(days=90)) == 2
+
+    log = ScoreEventLog()
+    log.open(tmp_path, segment_max_bytes=1024)
+    try:
+        log.append(db.iter_score_events())
+    finally:
+        log.close()
+
+    stats = PlayerStatsProjection()
+    mode_bests = ModeBestsProjection()
+    assert replay([tmp_path], [stats, mode_bests])["events"] == 2
+
+    assert stats.players[user_id] == {"id": user_id, "games_played": 3, "high_score": 300}
+    assert projected_rows(mode_bests) == best_rows(integration_db_session, PlayerModeBest)
+
+
+def test_leaderboard_index_warms_from_log(tmp_path, monkeypatch):
+    """Test that the leaderboard index can be built by replaying the log."""
+    log = ScoreEventLog()
+    log.open(tmp_path, segment_max_bytes=1024)
+    log.append([make_event(score_id, score_id * 10) for score_id in range(1, 7)])
+    log.close()
+    monkeypatch.setattr(settings, "score_event_log_dir", str(tmp_path))
+
+    warm_leaderboard_index_from_log()
+    try:
+        # Walls bests are 50, 30 and 10; passthrough 60, 40 and 20
+        assert leaderboard_index.get_ranks([55, 30], GameMode.WALLS) == {55: 1, 30: 2}
+        assert leaderboard_index.get_rank(50, GameMode.PASSTHROUGH) == 2
+    finally:
+        leaderboard_index.reset()
+
+
+def use_session(monkeypatch, session):
+    """Point the CLI and startup helpers' own Database() at the test session."""
+    for module in (main, score_events):
+        monkeypatch.setattr(module, "Database", lambda: Database(session))
+
+
+def test_log_coverage_is_recorded(integration_db_session, tmp_path, monkeypatch):
+    """Test that only logs holding the whole history count as complete."""
+    db = Database(integration_db_session)
+    empty, partial, bootstrapped = tmp_path / "empty", tmp_path / "partial", tmp_path / "boot"
+
+    log = ScoreEventLog()
+    log.open(empty, segment_max_bytes=1024)
+    log.start_coverage(db.latest_score_id(), db.has_score_history())
+    log.close()
+    assert read_coverage(empty) == {"complete": True, "score_id": 0}
+
+    user_id = db.create_user("early@example.com", "early", "pass")["id"]
+    db.add_score(user_id, 500, GameMode.WALLS)
+    latest = db.latest_score_id()
+
+    log.open(partial, segment_max_bytes=1024)
+    log.start_coverage(db.latest_score_id(), db.has_score_history())
+    log.close()
+    assert read_coverage(partial) == {"complete": False, "score_id": latest}
+    assert not covers_history([partial])
+
+    use_session(monkeypatch, integration_db_session)
+    score_events.bootstrap(str(bootstrapped), batch_size=10)
+    assert read_coverage(bootstrapped) == {"complete": True, "score_id": latest}
+    assert covers_history([bootstrapped])
+    # Another worker's log started after the bootstrap adds no duplicates
+    assert covers_history([bootstrapped, partial])
+    # Two complete logs would both replay the stored history
+    assert not covers_history([bootstrapped, empty])
+
+    # A failed append leaves the log missing scores
+    monkeypatch.setattr(score_event_log, "append", lambda events: 1 / 0)
+    monkeypatch.setattr(score_event_log, "_file", object())
+    monkeypatch.setattr(score_event_log, "directory", bootstrapped)
+    db.add_score(user_id, 50, GameMode.WALLS)
+    assert read_coverage(bootstrapped) == {"complete": False, "score_id": None}
+    assert not covers_history([bootstrapped])
+
+
+def test_rebuild_refuses_partial_log(integration_db_session, tmp_path, monkeypatch):
+    """Test that a log missing earlier games cannot overwrite stats unforced."""
+    db = Database(integration_db_session)
+    user_id = db.create_user("history@example.com", "history", "pass")["id"]
+    for score in (500, 300, 200):
+        db.add_score(user_id, score, GameMode.WALLS)
+
+    score_event_log.open(tmp_path, segment_max_bytes=1024)
+    try:
+        score_event_log.start_coverage(db.latest_score_id(), db.has_score_history())
+        db.add_score(user_id, 50, GameMode.WALLS)
+    finally:
+        score_event_log.close()
+
+    use_session(monkeypatch, integration_db_session)
+    with pytest.raises(SystemExit):
+        score_events.rebuild([str(tmp_path)], dry_run=False, force=False)
+    player = db.get_player(user_id)
+    assert (player["games_played"], player["high_score"]) == (4, 500)
+
+    # Forced, the player is rebuilt from their logged game only
+    score_events.rebuild([str(tmp_path)], dry_run=False, force=True)
+    integration_db_session.expire_all()
+    assert db.get_player(user_id)["high_score"] == 50
+
+
+def test_index_warms_from_database_unless_log_is_complete(
+    integration_db_session, tmp_path, monkeypatch
+):
+    """Test that a log missing scores is not used to warm the index."""
+    db = Database(integration_db_session)
+    seeded = db.create_user("seeded@example.com", "seeded", "pass")["id"]
+    db.add_score(seeded, 500, GameMode.WALLS)
+
+    log = ScoreEventLog()
+    log.open(tmp_path, segment_max_bytes=1024)
+    log.start_coverage(db.latest_score_id(), db.has_score_history())
+    log.append([make_event(1, 10)])
+    log.close()
+    monkeypatch.setattr(settings, "score_event_log_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "score_event_log_warm_index", True)
+    use_session(monkeypatch, integration_db_session)
+
+    warm_leaderboard_index()
+    try:
+        assert leaderboard_index.get_rank(500, GameMode.WALLS) == 1
+        assert leaderboard_index.get_rank(400, GameMode.WALLS) == 2
+    finally:
+        leaderboard_index.reset()
+
+    write_coverage(tmp_path, complete=True, score_id=0)
+    warm_leaderboard_index()
+    try:
+        # Only the logged game, a 10 by user-1
+        assert leaderboard_index.get_rank(400, GameMode.WALLS) == 1
+    finally:
+        leaderboard_index.reset()
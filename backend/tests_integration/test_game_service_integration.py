@@ -8,10 +8,10 @@ from app.services.auth_service import AuthService
 from app.models import GameMode, ScoreResponse, LeaderboardResponse
 
 
-def test_submit_score_success(integration_db_session):
+async def test_submit_score_success(integration_db_session):
     """Test successful score submission."""
     # Create user
-    user_response = AuthService.signup(
+    user_response = await AuthService.signup(
         email="gamer@example.com",
         username="gamer",
         password="pass123",
@@ -32,10 +32,10 @@ def test_submit_score_success(integration_db_session):
     assert response.rank >= 1
 
 
-def test_submit_multiple_scores(integration_db_session):
+async def test_submit_multiple_scores(integration_db_session):
     """Test submitting multiple scores updates high score correctly."""
     # Create user
-    user_response = AuthService.signup(
+    user_response = await AuthService.signup(
         email="multiplay@example.com",
         username="multiplay",
         password="pass123",
@@ -74,12 +74,12 @@ def test_get_leaderboard_empty(integration_db_session):
     assert response.total == 0
 
 
-def test_get_leaderboard_with_scores(integration_db_session):
+async def test_get_leaderboard_with_scores(integration_db_session):
     """Test getting leaderboard with multiple scores."""
     # Create multiple users and submit scores
     users = []
     for i in range(3):
-        user_response = AuthService.signup(
+        user_response = await AuthService.signup(
             email=f"player{i}@example.com",
             username=f"player{i}",
             password="pass123",
@@ -114,11 +114,11 @@ def test_get_leaderboard_with_scores(integration_db_session):
     assert response.entries[2].rank == 3
 
 
-def test_get_leaderboard_pagination(integration_db_session):
+async def test_get_leaderboard_pagination(integration_db_session):
     """Test leaderboard pagination."""
     # Create 5 users with scores
     for i in range(5):
-        user_response = AuthService.signup(
+        user_response = await AuthService.signup(
             email=f"paged{i}@example.com",
             username=f"paged{i}",
             password="pass123",
@@ -147,10 +147,10 @@ def test_get_leaderboard_pagination(integration_db_session):
     assert response.entries[0].score == 300
 
 
-def test_get_leaderboard_mode_filter(integration_db_session):
+async def test_get_leaderboard_mode_filter(integration_db_session):
     """Test leaderboard filtering by game mode."""
     # Create user
-    user_response = AuthService.signup(
+    user_response = await AuthService.signup(
         email="modetest@example.com",
         username="modetest",
         password="pass123",
@@ -188,11 +188,11 @@ def test_get_live_games(integration_db_session):
     assert len(games) == 0
 
 
-def test_rank_calculation_with_ties(integration_db_session):
+async def test_rank_calculation_with_ties(integration_db_session):
     """Test rank calculation when multiple users have same score."""
     # Create users with same scores
     for i in range(3):
-        user_response = AuthService.signup(
+        user_response = await AuthService.signup(
             email=f"tie{i}@example.com",
             username=f"tie{i}",
             password="pass123",
@@ -206,7 +206,7 @@ def test_rank_calculation_with_ties(integration_db_session):
         )
 
     # Add one user with higher score
-    user_response = AuthService.signup(
+    user_response = await AuthService.signup(
         email="higher@example.com",
         username="higher",
         password="pass123",
@@ -0,0 +1,201 @@
+"""
+Integration tests for the in-process leaderboard index.
+Verifies the skip list against a plain sorted list and that an index warmed
+from the database serves the same ranks and pages as the SQL queries.
+"""
+
+import bisect
+import random
+from datetime import datetime
+
+import pytest
+from app.database import Database
+from app.leaderboard_index import IndexableSkipList, leaderboard_index
+from app.models import GameMode
+
+
+@pytest.fixture
+def warm_index(integration_db_session):
+    """Warm the global index from the test database and reset it afterwards."""
+    leaderboard_index.warm(integration_db_session)
+    yield leaderboard_index
+    leaderboard_index.reset()
+
+
+def test_skip_list_matches_sorted_list():
+    """Test rank, slice and remove against a reference sorted list."""
+    rng = random.Random(42)
+    skip_list = IndexableSkipList()
+    reference = []
+
+    for _ in range(2000):
+        key = (rng.randint(0, 500), str(rng.randint(0, 50)))
+        if reference and rng.random() < 0.3:
+            victim = rng.choice(reference)
+            skip_list.remove(victim)
+            reference.remove(victim)
+        else:
+            skip_list.insert(key)
+            bisect.insort(reference, key)
+
+    assert len(skip_list) == len(reference)
+    assert skip_list.slice(0, len(reference)) == reference
+    assert skip_list.slice(len(reference) // 2, 7) == reference[
+        len(reference) // 2 : len(reference) // 2 + 7
+    ]
+    for probe in [(0, ""), (250, "25"), (501, "")]:
+        assert skip_list.count_less(probe) == bisect.bisect_left(reference, probe)
+
+    with pytest.raises(KeyError):
+        skip_list.remove((999, "missing"))
+
+
+def test_index_is_cold_by_default():
+    """Test that reads return None until the index is warmed."""
+    assert leaderboard_index.is_warm is False
+    assert leaderboard_index.get_rank(100, GameMode.WALLS) is None
+    assert leaderboard_index.get_leaderboard(None, 10, 0) is None
+
+
+def test_index_matches_sql_leaderboard(integration_db_session):
+    """Test that a warmed index returns the same pages and ranks as SQL."""
+    db = Database(integration_db_session)
+
+    for i in range(6):
+        user = db.create_user(f"idx{i}@example.com", f"idxuser{i}", "pass")
+        db.add_score(user["id"], (i % 3) * 100, GameMode.WALLS)
+        db.add_score(user["id"], i * 10, GameMode.PASSTHROUGH)
+
+    expected_pages = {
+        mode: db.get_leaderboard(mode=mode, limit=4, offset=1)
+        for mode in [GameMode.WALLS, GameMode.PASSTHROUGH, None]
+    }
+    expected_rank = db.get_rank(100, GameMode.WALLS)
+
+    leaderboard_index.warm(integration_db_session)
+    try:
+        for mode, (entries, total) in expected_pages.items():
+            indexed_entries, indexed_total = db.get_leaderboard(
+                mode=mode, limit=4, offset=1
+            )
+            assert indexed_total == total
+            assert [(e["rank"], e["username"], e["score"]) for e in indexed_entries] == [
+                (e["rank"], e["username"], e["score"]) for e in entries
+            ]
+
+        assert db.get_rank(100, GameMode.WALLS) == expected_rank
+    finally:
+        leaderboard_index.reset()
+
+
+def test_add_score_updates_warm_index(integration_db_session, warm_index):
+    """Test that new scores are reflected without rebuilding the index."""
+    db = Database(integration_db_session)
+
+    user1 = db.create_user("live1@example.com", "liveuser1", "pass")
+    user2 = db.create_user("live2@example.com", "liveuser2", "pass")
+
+    db.add_score(user1["id"], 200, GameMode.WALLS)
+    result = db.add_score(user2["id"], 300, GameMode.WALLS)
+    assert result["rank"] == 1
+
+    # A lower score keeps the player's best
+    db.add_score(user2["id"], 50, GameMode.WALLS)
+
+    entries, total = warm_index.get_leaderboard(GameMode.WALLS, 10, 0)
+    assert total == 2
+    assert [(e["username"], e["score"]) for e in entries] == [
+        ("liveuser2", 300),
+        ("liveuser1", 200),
+    ]
+    assert isinstance(entries[0]["date"], datetime)
+    assert entries[0]["date"].tzinfo is None
+
+    assert warm_index.get_rank(250, GameMode.WALLS) == 2
+    assert warm_index.get_leaderboard(GameMode.PASSTHROUGH, 10, 0) == ([], 0)
+    assert warm_index.get_leaderboard(None, 10, 0)[1] == 2
+
+
+def test_index_cursor_page_matches_sql(integration_db_session):
+    """Test that keyset pages from the index match the SQL keyset pages."""
+    db = Database(integration_db_session)
+
+    for i, score in enumerate([300, 200, 200, 200, 100]):
+        user = db.create_user(f"keyset{i}@example.com", f"keyset{i}", "pass")
+        db.add_score(user["id"], score, GameMode.WALLS)
+
+    first_page, _ = db.get_leaderboard(mode=GameMode.WALLS, limit=2, offset=0)
+    last = first_page[-1]
+    after = (last["score"], last["user_id"], last["rank"])
+    expected, _ = db.get_leaderboard(mode=GameMode.WALLS, limit=2, after=after)
+
+    leaderboard_index.warm(integration_db_session)
+    try:
+        indexed, _ = db.get_leaderboard(mode=GameMode.WALLS, limit=2, after=after)
+    finally:
+        leaderboard_index.reset()
+
+    assert [(e["rank"], e["user_id"]) for e in indexed] == [
+        (e["rank"], e["user_id"]) for e in expected
+    ]
+    assert [e["rank"] for e in expected] == [3, 4]
+
+
+def test_around_me_matches_between_sql_and_index(integration_db_session):
+    """Test around-me windows from SQL and from the index, including ties."""
+    db = Database(integration_db_session)
+
+    users = []
+    for i, score in enumerate([700, 600, 500, 500, 500, 300, 100]):
+        user = db.create_user(f"around{i}@example.com", f"around{i}", "pass")
+        db.add_score(user["id"], score, GameMode.WALLS)
+        users.append(user["id"])
+
+    full, _ = db.get_leaderboard(mode=GameMode.WALLS, limit=10)
+    positions = {entry["user_id"]: entry["rank"] for entry in full}
+
+    expected = {}
+    for user_id in users:
+        rank, entries = db.get_leaderboard_around(user_id, GameMode.WALLS, radius=2)
+        assert rank == positions[user_id]
+        assert [e["rank"] for e in entries] == list(
+            range(max(rank - 2, 1), min(rank + 2, len(users)) + 1)
+        )
+        assert [e["user_id"] for e in entries] == [
+            e["user_id"] for e in full if abs(e["rank"] - rank) <= 2
+        ]
+        expected[user_id] = (rank, entries)
+
+    assert db.get_leaderboard_around(users[0], GameMode.PASSTHROUGH) is None
+
+    leaderboard_index.warm(integration_db_session)
+    try:
+        for user_id, (rank, entries) in expected.items():
+            indexed_rank, indexed_entries = db.get_leaderboard_around(
+                user_id, GameMode.WALLS, radius=2
+            )
+            assert indexed_rank == rank
+            assert [(e["rank"], e["user_id"]) for e in indexed_entries] == [
+                (e["rank"], e["user_id"]) for e in entries
+            ]
+        assert db.get_leaderboard_around(users[0], GameMode.PASSTHROUGH) is None
+    finally:
+        leaderboard_index.reset()
+
+
+def test_warm_index_answers_player_not_on_board(integration_db_session, monkeypatch):
+    """Test that a warm index reports a player without a score without SQL."""
+    db = Database(integration_db_session)
+    user = db.create_user("absent@example.com", "absent", "pass")
+    db.add_score(user["id"], 100, GameMode.WALLS)
+
+    leaderboard_index.warm(integration_db_session)
+    try:
+        def no_sql(*args, **kwargs):
+            raise AssertionError("warm index fell back to SQL")
+
+        monkeypatch.setattr(Database, "_best_scores", no_sql)
+        assert db.get_leaderboard_around(user["id"], GameMode.PASSTHROUGH) is None
+        assert db.get_leaderboard_around("nobody", GameMode.WALLS) is None
+    finally:
+        leaderboard_index.reset()
@@ -0,0 +1,173 @@
+"""
+Integration tests for the Alembic migrations.
+Runs them against file SQLite databases and compares the result with the models.
+With TEST_POSTGRES_URL set (e.g. postgresql://postgres@localhost/postgres)
+they run against throwaway databases on that PostgreSQL server as well.
+"""
+
+import os
+import uuid
+
+import pytest
+from alembic import command
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.database import Database, alembic_config, migrate_db
+from app.db_models import Base
+from app.models import GameMode
+
+POSTGRES_URL = os.environ.get("TEST_POSTGRES_URL")
+
+
+@pytest.fixture(
+    params=[
+        "sqlite",
+        pytest.param(
+            "postgresql",
+            marks=pytest.mark.skipif(not POSTGRES_URL, reason="TEST_POSTGRES_URL not set"),
+        ),
+    ]
+)
+def make_engine(request, tmp_path):
+    """Factory for empty databases of the parametrized dialect."""
+    engines = []
+    databases = []
+    admin = create_engine(POSTGRES_URL, isolation_level="AUTOCOMMIT") if (
+        request.param == "postgresql"
+    ) else None
+
+    def make(name: str):
+        if admin is None:
+            engine = create_engine(f"sqlite:///{tmp_path / name}.db")
+        else:
+            database = f"test_migrations_{name}_{uuid.uuid4().hex[:8]}"
+            with admin.connect() as connection:
+                connection.execute(text(f'CREATE DATABASE "{database}"'))
+            databases.append(database)
+            engine = create_engine(make_url(POSTGRES_URL).set(database=database))
+        engines.append(engine)
+        return engine
+
+    yield make
+
+    for engine in engines:
+        engine.dispose()
+    if admin is not None:
+        with admin.connect() as connection:
+            for database in databases:
+                connection.execute(text(f'DROP DATABASE "{database}" WITH (FORCE)'))
+        admin.dispose()
+
+
+def schema(engine) -> dict:
+    """
+    Tables mapped to their column, index and constraint names, plus the
+    sequences (PostgreSQL) - migrations that rebuild a table must leave the
+    names the models would have created.
+    """
+    inspector = inspect(engine)
+    tables = {
+        table: (
+            {column["name"] for column in inspector.get_columns(table)},
+            {index["name"] for index in inspector.get_indexes(table)},
+            inspector.get_pk_constraint(table)["name"],
+            {key["name"] for key in inspector.get_foreign_keys(table)},
+        )
+        for table in inspector.get_table_names()
+        if table != "alembic_version"
+    }
+    if engine.dialect.name != "postgresql":
+        return {"tables": tables}
+    return {"tables": tables, "sequences": set(inspector.get_sequence_names())}
+
+
+def add_legacy_rows(engine):
+    """Insert rows the way the baseline schema stored them."""
+    with engine.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO users VALUES "
+            "('u1', 'old@example.com', 'olduser', 'hash', '2024-01-01 00:00:00')"
+        ))
+        connection.execute(text("INSERT INTO players VALUES ('u1', 'olduser', 0, 90, 2)"))
+        connection.execute(text(
+            "INSERT INTO scores VALUES "
+            "('0b6e5b6c-8f1e-4c57-9a44-1d2f3a4b5c6d', 'u1', 'olduser', 90, 'WALLS', "
+            "'2024-01-01 10:00:00'), "
+            "('7c1d2e3f-4a5b-4c6d-8e9f-0a1b2c3d4e5f', 'u1', 'olduser', 40, 'PASSTHROUGH', "
+            "'2024-01-02 10:00:00')"
+        ))
+        connection.execute(text(
+            "INSERT INTO player_mode_bests VALUES "
+            "('u1', 'WALLS', 'olduser', 90, '2024-01-01 10:00:00')"
+        ))
+
+
+def test_migrations_match_models(make_engine):
+    """Test that upgrading an empty database gives the schema the models declare."""
+    migrated = make_engine("migrated")
+    created = make_engine("created")
+
+    migrate_db(migrated)
+    Base.metadata.create_all(bind=created)
+
+    assert schema(migrated) == schema(created)
+
+
+def test_compact_scores_migration_keeps_data(make_engine):
+    """Test that existing scores and bests survive the upgrade and the downgrade."""
+    engine = make_engine("legacy")
+    migrate_db(engine, "0001_baseline")
+    add_legacy_rows(engine)
+
+    migrate_db(engine)
+
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text("SELECT id, user_id, score, mode FROM scores ORDER BY id")
+        ).all()
+    assert rows == [(1, "u1", 90, 1), (2, "u1", 40, 2)]
+
+    with Session(engine) as session:
+        db = Database(session)
+        entries, total = db.get_leaderboard(mode=GameMode.WALLS)
+        assert total == 1
+        assert entries[0]["username"] == "olduser"
+        assert entries[0]["score"] == 90
+
+        db.add_score("u1", 120, GameMode.WALLS)
+        assert db.get_leaderboard(mode=GameMode.WALLS)[0][0]["score"] == 120
+
+    config = alembic_config()
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        command.downgrade(config, "0001_baseline")
+
+    with engine.connect() as connection:
+        rows = connection.execute(
+            text("SELECT username, score, mode FROM scores ORDER BY created_at")
+        ).all()
+        bests = connection.execute(
+            text("SELECT mode, best_score FROM player_mode_bests")
+        ).all()
+    assert rows == [
+        ("olduser", 90, "WALLS"),
+        ("olduser", 40, "PASSTHROUGH"),
+        ("olduser", 120, "WALLS"),
+    ]
+    assert bests == [("WALLS", 120)]
+
+
+def test_migrations_adopt_database_created_without_them(make_engine):
+    """Test that a database made by create_all before migrations can be upgraded."""
+    engine = make_engine("unversioned")
+    migrate_db(engine, "0001_baseline")
+    add_legacy_rows(engine)
+    with engine.begin() as connection:
+        connection.execute(text("DROP TABLE alembic_version"))
+
+    migrate_db(engine)
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT count(*) FROM scores")).scalar_one() == 2
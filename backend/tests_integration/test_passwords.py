@@ -0,0 +1,97 @@
+"""
+Integration tests for the bounded password executor.
+"""
+
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.passwords import (
+    PasswordExecutor,
+    PasswordExecutorBusy,
+    check_password,
+    hash_password,
+    needs_rehash,
+)
+
+
+async def test_password_work_leaves_event_loop_free(monkeypatch):
+    """Test that the loop keeps running other work while passwords are hashed."""
+    # A realistic cost, well above the tests' default
+    monkeypatch.setattr(settings, "bcrypt_rounds", 10)
+    executor = PasswordExecutor()
+    executor.start(workers=2, max_pending=8)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.005)
+            ticks += 1
+
+    ticking = asyncio.create_task(ticker())
+    try:
+        hashed = await executor.hash("password123")
+        assert await executor.verify("password123", hashed)
+        assert not await executor.verify("wrongpassword", hashed)
+    finally:
+        ticking.cancel()
+        executor.shutdown()
+
+    # Each bcrypt call takes far longer than a tick
+    assert ticks > 10
+    assert executor.stats()["completed"] == 3
+    assert executor.stats()["pending"] == 0
+
+
+async def test_password_executor_rejects_beyond_max_pending():
+    """Test that work beyond the queue limit is turned away, not queued."""
+    executor = PasswordExecutor()
+    executor.start(workers=1, max_pending=2)
+    hashed = hash_password("password123")
+    try:
+        outcomes = await asyncio.gather(
+            *(executor.verify("password123", hashed) for _ in range(4)),
+            return_exceptions=True,
+        )
+    finally:
+        executor.shutdown()
+
+    assert outcomes.count(True) == 2
+    assert sum(isinstance(o, PasswordExecutorBusy) for o in outcomes) == 2
+    assert executor.stats()["rejected"] == 2
+    assert executor.stats()["peak_pending"] == 2
+
+
+async def test_password_executor_process_pool():
+    """Test that the optional process pool hashes compatibly with the sync API."""
+    executor = PasswordExecutor()
+    executor.start(workers=1, max_pending=4, use_processes=True)
+    try:
+        hashed = await executor.hash("password123")
+    finally:
+        executor.shutdown()
+
+    assert check_password("password123", hashed)
+    assert not needs_rehash(hashed)
+
+
+def test_password_executor_cannot_start_twice():
+    """Test that starting a running executor is an error."""
+    executor = PasswordExecutor()
+    executor.start(workers=1, max_pending=1)
+    try:
+        with pytest.raises(RuntimeError):
+            executor.start(workers=1, max_pending=1)
+    finally:
+        executor.shutdown()
+
+
+def test_needs_rehash_compares_cost(monkeypatch):
+    """Test that only hashes made at another cost need rehashing."""
+    monkeypatch.setattr(settings, "bcrypt_rounds", 5)
+
+    assert not needs_rehash(hash_password("password123"))
+    assert needs_rehash(hash_password("password123", rounds=4))
+    assert needs_rehash("not-a-bcrypt-hash")
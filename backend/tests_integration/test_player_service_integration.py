@@ -9,10 +9,10 @@ from app.services.game_service import GameService
 from app.models import GameMode, Player
 
 
-def test_get_profile_after_signup(integration_db_session):
+async def test_get_profile_after_signup(integration_db_session):
     """Test getting player profile immediately after signup."""
     # Create user
-    user_response = AuthService.signup(
+    user_response = await AuthService.signup(
         email="profile@example.com",
         username="profileuser",
         password="pass123",
@@ -41,10 +41,10 @@ def test_get_profile_nonexistent_user(integration_db_session):
     assert player is None
 
 
-def test_get_profile_after_playing_games(integration_db_session):
+async def test_get_profile_after_playing_games(integration_db_session):
     """Test that profile reflects game statistics correctly."""
     # Create user
-    user_response = AuthService.signup(
+    user_response = await AuthService.signup(
         email="stats@example.com",
         username="statsuser",
         password="pass123",
@@ -66,10 +66,10 @@ def test_get_profile_after_playing_games(integration_db_session):
     assert player.games_played == 3
 
 
-def test_profile_updates_with_new_high_score(integration_db_session):
+async def test_profile_updates_with_new_high_score(integration_db_session):
     """Test that profile high score updates when new high score is achieved."""
     # Create user
-    user_response = AuthService.signup(
+    user_response = await AuthService.signup(
         email="highscore@example.com",
         username="highscorer",
         password="pass123",
@@ -93,10 +93,10 @@ def test_profile_updates_with_new_high_score(integration_db_session):
     assert player.games_played == 2
 
 
-def test_profile_does_not_decrease_high_score(integration_db_session):
+async def test_profile_does_not_decrease_high_score(integration_db_session):
     """Test that high score doesn't decrease when lower scores are submitted."""
     # Create user
-    user_response = AuthService.signup(
+    user_response = await AuthService.signup(
         email="keeper@example.com",
         username="keeper",
         password="pass123",
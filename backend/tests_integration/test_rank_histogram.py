@@ -0,0 +1,99 @@
+"""
+Integration tests for approximate ranking.
+Checks the Fenwick-backed histogram against exact ranks and that score
+submissions report when their rank is approximate.
+"""
+
+import random
+
+import pytest
+from app.config import settings
+from app.database import Database
+from app.models import GameMode
+from app.rank_histogram import FenwickTree, ScoreHistogram, rank_histograms
+from app.services.game_service import GameService
+
+
+@pytest.fixture
+def approx_ranks(integration_db_session, monkeypatch):
+    """Enable approximate ranks for every board size and warm the histograms."""
+    monkeypatch.setattr(settings, "rank_approx_enabled", True)
+    monkeypatch.setattr(settings, "rank_approx_min_players", 1)
+    rank_histograms.warm(integration_db_session, bucket_width=10, max_score=1000)
+    yield rank_histograms
+    rank_histograms.reset()
+
+
+def test_fenwick_prefix_sums():
+    """Test prefix sums after point updates."""
+    tree = FenwickTree(8)
+    for index, delta in [(0, 2), (3, 1), (7, 4), (3, 2)]:
+        tree.add(index, delta)
+
+    assert tree.prefix_sum(0) == 2
+    assert tree.prefix_sum(3) == 5
+    assert tree.prefix_sum(6) == 5
+    assert tree.prefix_sum(7) == 9
+
+
+def test_histogram_rank_close_to_exact():
+    """Test that approximate ranks stay within one bucket of the exact rank."""
+    rng = random.Random(7)
+    bests = [rng.randint(0, 5000) for _ in range(3000)]
+    histogram = ScoreHistogram(bucket_width=50, max_score=5000)
+    for best in bests:
+        histogram.move(None, best)
+
+    for probe in [0, 1234, 2500, 4999]:
+        exact = sum(1 for best in bests if best > probe) + 1
+        approx, percentile = histogram.rank(probe)
+        same_bucket = sum(1 for best in bests if best // 50 == probe // 50)
+        assert abs(approx - exact) <= same_bucket
+        assert 0.0 <= percentile <= 100.0
+
+
+def test_histogram_move_replaces_previous_best():
+    """Test that improving a best moves the player instead of adding one."""
+    histogram = ScoreHistogram(bucket_width=10, max_score=100)
+    histogram.move(None, 15)
+    histogram.move(15, 75)
+
+    assert histogram.total == 1
+    assert histogram.rank(50) == (2, 0.0)
+    assert histogram.rank(80) == (1, 100.0)
+
+
+def test_submit_score_reports_approximate_rank(integration_db_session, approx_ranks):
+    """Test that submissions flag approximate ranks and carry a percentile."""
+    db = Database(integration_db_session)
+
+    users = [
+        db.create_user(f"approx{i}@example.com", f"approx{i}", "pass")["id"]
+        for i in range(3)
+    ]
+    GameService.submit_score(users[0], 300, GameMode.WALLS, integration_db_session)
+    GameService.submit_score(users[1], 500, GameMode.WALLS, integration_db_session)
+    GameService.submit_score(users[0], 320, GameMode.WALLS, integration_db_session)
+
+    response = GameService.submit_score(
+        users[2], 400, GameMode.WALLS, integration_db_session
+    )
+
+    assert response.rank_is_approximate is True
+    assert response.rank == 2
+    assert response.percentile == pytest.approx(200 / 3)
+    assert approx_ranks.player_count(GameMode.WALLS) == 3
+
+
+def test_submit_score_exact_rank_by_default(integration_db_session):
+    """Test that ranks are exact unless approximate ranking is enabled."""
+    db = Database(integration_db_session)
+    user = db.create_user("exact@example.com", "exactuser", "pass")
+
+    response = GameService.submit_score(
+        user["id"], 100, GameMode.WALLS, integration_db_session
+    )
+
+    assert response.rank_is_approximate is False
+    assert response.percentile is None
+    assert response.rank == 1
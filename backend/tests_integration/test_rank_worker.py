@@ -0,0 +1,55 @@
+"""
+Integration tests for deferred ranks.
+Submissions return with rankPending and the rank worker fills ranks in later.
+"""
+
+import asyncio
+
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Database
+from app.models import GameMode
+from app.rank_worker import rank_worker
+from app.services.game_service import GameService
+
+
+async def test_deferred_ranks_are_computed_in_batches(integration_db_session):
+    """Test that submissions skip the rank and the worker ranks them together."""
+    db = Database(integration_db_session)
+    rival = db.create_user("rival@example.com", "rival", "pass")["id"]
+    db.add_score(rival, 100, GameMode.WALLS)
+    user_id = db.create_user("deferred@example.com", "deferred", "pass")["id"]
+
+    rank_worker.start(
+        max_batch_size=50,
+        max_delay_seconds=0.05,
+        cache_size=100,
+        cache_ttl_seconds=60,
+        session_factory=sessionmaker(bind=integration_db_session.get_bind()),
+    )
+    try:
+        responses = [
+            GameService.submit_score(user_id, score, GameMode.WALLS, integration_db_session)
+            for score in (50, 150)
+        ]
+        assert all(r.rank_pending and r.rank is None for r in responses)
+
+        pending = GameService.get_score_rank(user_id, responses[0].score_id, integration_db_session)
+        assert pending.rank_pending is True
+
+        for _ in range(100):
+            if rank_worker.scores_ranked == 2:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await rank_worker.stop()
+
+    assert rank_worker.batches_ranked == 1
+    ranked = [
+        GameService.get_score_rank(user_id, r.score_id, integration_db_session)
+        for r in responses
+    ]
+    # Ranked against the board once both scores were in
+    assert [r.rank for r in ranked] == [3, 1]
+    assert not any(r.rank_pending for r in ranked)
+    assert GameService.get_score_rank(rival, responses[0].score_id, integration_db_session) is None
@@ -0,0 +1,53 @@
+"""
+Tests for the token bucket limiter behind score submission throttling.
+"""
+
+from app.rate_limit import TokenBucketLimiter
+
+
+def test_token_bucket_refills_over_time(monkeypatch):
+    """Test bursts, refill rate and the wait reported when empty."""
+    now = [100.0]
+    monkeypatch.setattr("app.rate_limit.time.monotonic", lambda: now[0])
+    limiter = TokenBucketLimiter(rate=2.0, burst=3, max_keys=10)
+
+    assert [limiter.acquire("alice") for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert limiter.acquire("alice") == 0.5
+    assert limiter.acquire("bob") == 0.0
+
+    now[0] += 0.25
+    assert limiter.acquire("alice") == 0.25
+    now[0] += 0.25
+    assert limiter.acquire("alice") == 0.0
+
+    # Refill is capped at the burst size
+    now[0] += 60
+    assert [limiter.acquire("alice") for _ in range(4)][-1] > 0
+    assert (limiter.allowed, limiter.rejected) == (8, 3)
+
+
+def test_token_bucket_charges_request_cost(monkeypatch):
+    """Test that requests take a token per item, going into debt past burst."""
+    now = [100.0]
+    monkeypatch.setattr("app.rate_limit.time.monotonic", lambda: now[0])
+    limiter = TokenBucketLimiter(rate=1.0, burst=10, max_keys=10)
+
+    assert limiter.acquire("alice", 4) == 0.0
+    assert limiter.acquire("alice", 8) == 2.0
+    # Beyond the burst, a full bucket is enough but the whole cost is taken
+    now[0] += 6
+    assert limiter.acquire("alice", 30) == 0.0
+    now[0] += 10
+    assert limiter.acquire("alice") == 11.0
+
+
+def test_token_bucket_memory_is_bounded():
+    """Test that only the most recent keys keep a bucket."""
+    limiter = TokenBucketLimiter(rate=1.0, burst=1, max_keys=2)
+    limiter.acquire("a")
+    limiter.acquire("b")
+    limiter.acquire("c")
+
+    assert len(limiter._buckets) == 2
+    # "a" was evicted, so it starts again with a full bucket
+    assert limiter.acquire("a") == 0.0
@@ -0,0 +1,131 @@
+"""
+Integration tests for the score archiver.
+Checks that old scores are rolled into daily summaries in bounded batches
+and that best scores survive archiving and rebuilds exactly.
+"""
+
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select
+
+from app.database import Database
+from app.db_models import PlayerModeBest, Score, ScoreDailyRollup
+from app.models import GameMode
+
+
+def add_played_scores(session, user: dict, games: list[tuple[int, datetime]]):
+    """Insert raw score rows played at given (naive UTC) times."""
+    session.add_all(
+        [
+            Score(
+                user_id=user["id"],
+                score=score,
+                mode=GameMode.WALLS,
+                created_at=played_at,
+            )
+            for score, played_at in games
+        ]
+    )
+    session.commit()
+
+
+def test_archive_scores_rolls_up_by_day(integration_db_session):
+    """Test that old scores become one summary row per player, mode and day."""
+    db = Database(integration_db_session)
+    user = db.create_user("archive@example.com", "archiveuser", "pass")
+
+    day = datetime(2024, 1, 10)
+    add_played_scores(
+        integration_db_session,
+        user,
+        [
+            (40, day + timedelta(hours=1)),
+            (90, day + timedelta(hours=2)),
+            (90, day + timedelta(hours=3)),
+            (10, day + timedelta(days=1, hours=5)),
+            (70, datetime(2024, 3, 1)),
+        ],
+    )
+    db.rebuild_player_mode_bests()
+
+    # A batch size of 2 forces several transactions
+    archived = db.archive_scores(datetime(2024, 2, 1), batch_size=2)
+
+    assert archived == 4
+    remaining = integration_db_session.execute(select(Score.score)).scalars().all()
+    assert remaining == [70]
+
+    rollups = integration_db_session.execute(
+        select(ScoreDailyRollup).order_by(ScoreDailyRollup.day)
+    ).scalars().all()
+    assert [(r.day, r.games, r.total_score, r.best_score) for r in rollups] == [
+        (day, 3, 220, 90),
+        (day + timedelta(days=1), 1, 10, 10),
+    ]
+    # Ties keep the first time the best was reached
+    assert rollups[0].best_score_at == day + timedelta(hours=2)
+
+    assert db.archive_scores(datetime(2024, 2, 1)) == 0
+
+
+def test_archive_scores_merges_into_existing_rollups(integration_db_session):
+    """Test that archiving the same day again adds to its summary."""
+    db = Database(integration_db_session)
+    user = db.create_user("merge@example.com", "mergeuser", "pass")
+    day = datetime(2024, 1, 10)
+
+    add_played_scores(integration_db_session, user, [(50, day + timedelta(hours=8))])
+    db.archive_scores(datetime(2024, 2, 1))
+    add_played_scores(
+        integration_db_session,
+        user,
+        [(80, day + timedelta(hours=9)), (50, day + timedelta(hours=1))],
+    )
+    db.archive_scores(datetime(2024, 2, 1))
+
+    rollup = integration_db_session.execute(select(ScoreDailyRollup)).scalar_one()
+    assert (rollup.games, rollup.total_score, rollup.best_score) == (3, 180, 80)
+    assert rollup.best_score_at == day + timedelta(hours=9)
+
+
+def test_archive_preserves_personal_bests(integration_db_session):
+    """Test that leaderboards and rebuilt bests are unchanged by archiving."""
+    db = Database(integration_db_session)
+    users = [
+        db.create_user(f"keep{i}@example.com", f"keepuser{i}", "pass")
+        for i in range(3)
+    ]
+    old = datetime(2023, 6, 1)
+    for i, user in enumerate(users):
+        add_played_scores(
+            integration_db_session,
+            user,
+            [(100 + i * 10, old + timedelta(hours=i)), (20, old + timedelta(days=2))],
+        )
+    add_played_scores(integration_db_session, users[0], [(5, datetime(2024, 5, 1))])
+    db.rebuild_player_mode_bests()
+
+    def bests():
+        return integration_db_session.execute(
+            select(
+                PlayerModeBest.user_id,
+                PlayerModeBest.best_score,
+                PlayerModeBest.best_score_at,
+            ).order_by(PlayerModeBest.user_id)
+        ).all()
+
+    before = bests()
+    leaderboard_before = db.get_leaderboard(mode=GameMode.WALLS)
+
+    assert db.count_archivable_scores(datetime(2024, 1, 1)) == 6
+    db.archive_scores(datetime(2024, 1, 1))
+
+    assert bests() == before
+    assert db.get_leaderboard(mode=GameMode.WALLS) == leaderboard_before
+
+    # Rebuilding from what is left of the history gives the same bests
+    db.rebuild_player_mode_bests()
+    assert bests() == before
+    assert integration_db_session.execute(
+        select(func.count()).select_from(Score)
+    ).scalar_one() == 1
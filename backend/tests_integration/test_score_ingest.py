@@ -0,0 +1,82 @@
+"""
+Integration tests for group-commit score ingestion.
+Covers Database.add_scores and the queue that batches submissions into it.
+"""
+
+import asyncio
+
+import pytest
+from app.database import Database
+from app.ingest import ScoreIngestQueue
+from app.models import GameMode
+from sqlalchemy.orm import sessionmaker
+
+
+def test_add_scores_single_transaction(integration_db_session):
+    """Test that a batch applies scores in order and reports each one."""
+    db = Database(integration_db_session)
+    alice = db.create_user("alice@example.com", "alice", "pass")["id"]
+    bob = db.create_user("bob@example.com", "bob", "pass")["id"]
+
+    outcomes = db.add_scores(
+        [
+            (alice, 100, GameMode.WALLS),
+            ("missing-user", 500, GameMode.WALLS),
+            (alice, 150, GameMode.WALLS),
+            (bob, 120, GameMode.WALLS),
+            (alice, 120, GameMode.PASSTHROUGH),
+        ]
+    )
+
+    assert isinstance(outcomes[1], ValueError)
+    assert [o["is_new_high_score"] for o in outcomes if isinstance(o, dict)] == [
+        True,
+        True,
+        True,
+        False,
+    ]
+    # Ranks are computed after the whole batch is committed
+    assert outcomes[0]["rank"] == 3
+    assert outcomes[2]["rank"] == 1
+    assert outcomes[3]["rank"] == 2
+    assert outcomes[4]["rank"] == 1
+
+    player = db.get_player(alice)
+    assert player["games_played"] == 3
+    assert player["high_score"] == 150
+
+    entries, total = db.get_leaderboard(mode=GameMode.WALLS)
+    assert total == 2
+    assert [e["username"] for e in entries] == ["alice", "bob"]
+
+
+async def test_queue_commits_concurrent_submissions_in_batches(integration_db_session):
+    """Test that concurrent submissions share commits and all resolve."""
+    db = Database(integration_db_session)
+    user_id = db.create_user("queued@example.com", "queued", "pass")["id"]
+
+    queue = ScoreIngestQueue()
+    queue.start(
+        max_batch_size=8,
+        max_delay_seconds=0.05,
+        session_factory=sessionmaker(bind=integration_db_session.get_bind()),
+    )
+    try:
+        results = await asyncio.gather(
+            *[queue.submit(user_id, score, GameMode.WALLS) for score in range(20)]
+        )
+        with pytest.raises(ValueError):
+            await queue.submit("missing-user", 10, GameMode.WALLS)
+    finally:
+        await queue.stop()
+
+    assert len(results) == 20
+    # Submissions keep their order, so every positive score beat the last
+    assert [r["is_new_high_score"] for r in results] == [False] + [True] * 19
+    assert results[-1]["rank"] == 1
+    assert queue.scores_written == 21
+    assert queue.batches_written <= 4
+    assert queue.is_running is False
+
+    integration_db_session.expire_all()
+    assert db.get_player(user_id)["games_played"] == 20
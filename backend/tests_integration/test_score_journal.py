@@ -0,0 +1,171 @@
+"""
+Integration tests for the local score journal.
+Covers replay into the database, torn records and recovery from a crash
+between a database commit and its checkpoint.
+"""
+
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Database
+from app.db_models import Base, Score
+from app.journal import ScoreJournal, score_journal
+from app.models import GameMode
+from app.services.game_service import GameService
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Drains one batch in a separate process and dies right after the batch is
+# committed, before the checkpoint that would stop it being replayed
+CRASH_MID_DRAIN = """
+import os, sys
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.journal import ScoreJournal, score_journal
+
+journal = ScoreJournal()
+journal.open(
+    sys.argv[2],
+    batch_size=5,
+    session_factory=sessionmaker(bind=create_engine(sys.argv[1])),
+)
+journal._save_checkpoint = lambda offset: os._exit(17)
+journal.drain_once()
+"""
+
+
+def count_scores(session) -> int:
+    return session.execute(select(func.count()).select_from(Score)).scalar_one()
+
+
+def test_journal_drains_into_database(integration_db_session, tmp_path):
+    """Test that journaled scores are written once each, then the journal empties."""
+    db = Database(integration_db_session)
+    user_id = db.create_user("journal@example.com", "journaluser", "pass")["id"]
+
+    journal = ScoreJournal()
+    journal.open(
+        tmp_path / "scores.log",
+        batch_size=2,
+        session_factory=sessionmaker(bind=integration_db_session.get_bind()),
+    )
+    try:
+        journal.append(user_id, 100, GameMode.WALLS, "game-1")
+        # A client retry that reached the journal twice
+        journal.append(user_id, 100, GameMode.WALLS, "game-1")
+        journal.append(user_id, 40, GameMode.PASSTHROUGH)
+        journal.append("missing-user", 10, GameMode.WALLS)
+
+        assert journal.drain_once() == 2
+        assert journal.drain_once() == 2
+        assert journal.drain_once() == 0
+        assert journal.path.stat().st_size == 0
+        assert journal.records_drained == 4
+    finally:
+        journal.close()
+
+    integration_db_session.expire_all()
+    player = db.get_player(user_id)
+    assert player["games_played"] == 2
+    assert player["high_score"] == 100
+    assert count_scores(integration_db_session) == 2
+
+
+async def test_journaled_submission_is_acknowledged_then_drained(
+    integration_db_session, tmp_path
+):
+    """Test that a submission returns before it is written and is drained after."""
+    db = Database(integration_db_session)
+    user_id = db.create_user("pending@example.com", "pendinguser", "pass")["id"]
+
+    score_journal.start(
+        tmp_path / "scores.log",
+        batch_size=100,
+        retry_seconds=0.05,
+        session_factory=sessionmaker(bind=integration_db_session.get_bind()),
+    )
+    try:
+        response = await GameService.submit_score_journaled(user_id, 75, GameMode.WALLS)
+        assert response.rank_pending is True
+        assert response.rank is None
+
+        for _ in range(100):
+            if score_journal.records_drained:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await score_journal.stop()
+
+    assert score_journal.is_running is False
+    integration_db_session.expire_all()
+    assert db.get_player(user_id)["high_score"] == 75
+
+
+def test_journal_discards_torn_record(tmp_path):
+    """Test that a record cut short by a crash during append is dropped on open."""
+    path = tmp_path / "scores.log"
+    journal = ScoreJournal()
+    journal.open(path)
+    journal.append("user-1", 10, GameMode.WALLS, "game-1")
+    journal.close()
+    with open(path, "ab") as file:
+        file.write(b'{"key":"game-2","user_id":"us')
+
+    journal.open(path)
+    try:
+        records, _ = journal.pending(10)
+        assert [record["key"] for record in records] == ["game-1"]
+        assert path.read_bytes().endswith(b"\n")
+    finally:
+        journal.close()
+
+
+def test_journal_recovers_from_crash_mid_drain(tmp_path):
+    """Test that a batch committed but not checkpointed is not stored twice."""
+    database_url = f"sqlite:///{tmp_path / 'scores.db'}"
+    engine = create_engine(database_url)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(bind=engine)
+    with session_factory() as session:
+        user_id = Database(session).create_user(
+            "crash@example.com", "crashuser", "pass"
+        )["id"]
+
+    path = tmp_path / "scores.log"
+    journal = ScoreJournal()
+    journal.open(path)
+    for score in range(12):
+        journal.append(user_id, score, GameMode.WALLS)
+    journal.close()
+
+    crashed = subprocess.run(
+        [sys.executable, "-c", CRASH_MID_DRAIN, database_url, str(path)],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    assert crashed.returncode == 17, crashed.stderr
+
+    try:
+        with session_factory() as session:
+            assert count_scores(session) == 5
+
+        # The restarted drainer replays the first batch again
+        journal.open(path, batch_size=5, session_factory=session_factory)
+        while journal.drain_once():
+            pass
+        journal.close()
+
+        with session_factory() as session:
+            assert count_scores(session) == 12
+            player = Database(session).get_player(user_id)
+            assert player["games_played"] == 12
+            assert player["high_score"] == 11
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
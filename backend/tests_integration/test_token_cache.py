@@ -0,0 +1,68 @@
+"""
+Integration tests for the verified-token cache in decode_token.
+"""
+
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException
+
+from app import auth
+from app.auth import create_access_token, decode_token, token_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    yield
+    token_cache.clear()
+
+
+def count_verifications(monkeypatch) -> list:
+    verified = []
+    jwt_decode = auth.jwt.decode
+
+    def counting_decode(*args, **kwargs):
+        verified.append(args[0])
+        return jwt_decode(*args, **kwargs)
+
+    monkeypatch.setattr(auth.jwt, "decode", counting_decode)
+    return verified
+
+
+def test_reused_token_is_verified_once(monkeypatch):
+    """Test that a token seen before is served from the cache."""
+    verified = count_verifications(monkeypatch)
+    token = create_access_token({"sub": "user-1"})
+    other = create_access_token({"sub": "user-2"})
+
+    for _ in range(5):
+        assert decode_token(token)["sub"] == "user-1"
+    assert decode_token(other)["sub"] == "user-2"
+
+    assert verified == [token, other]
+    assert token_cache.stats()["hits"] == 4
+
+
+def test_cached_token_expires_with_token(monkeypatch):
+    """Test that a cached token stops working once it expires."""
+    verified = count_verifications(monkeypatch)
+    token = create_access_token({"sub": "user-1"}, expires_delta=timedelta(seconds=1))
+    exp = decode_token(token)["exp"]
+
+    # jose compares whole seconds, so the token is valid through second exp
+    time.sleep(max(0.0, exp + 1 - time.time()) + 0.05)
+
+    with pytest.raises(HTTPException) as error:
+        decode_token(token)
+    assert error.value.status_code == 401
+    assert len(verified) == 2
+
+
+def test_invalid_token_is_not_cached():
+    """Test that failed verifications are not remembered."""
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            decode_token("not-a-token")
+
+    assert len(token_cache) == 0
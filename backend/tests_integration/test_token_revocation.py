@@ -0,0 +1,61 @@
+"""
+Integration tests for token revocation across workers.
+Each TokenRevocationList stands in for one API worker sharing the database.
+"""
+
+from datetime import datetime, timedelta, UTC
+
+from app.auth import create_access_token, decode_token
+from app.database import Database
+from app.revocation import TokenRevocationList
+from app.services.auth_service import AuthService
+
+
+def create_user(integration_db_session) -> dict:
+    return Database(integration_db_session).create_user(
+        "revoke@example.com", "revoker", "password123"
+    )
+
+
+def test_logout_reaches_other_workers(integration_db_session):
+    """Test that a logout on one worker is rejected by another after a sync."""
+    user = create_user(integration_db_session)
+    payload = decode_token(create_access_token({"sub": user["id"]}))
+    other_worker = TokenRevocationList()
+    other_worker.sync(Database(integration_db_session))
+
+    assert AuthService.logout(payload, integration_db_session)
+    assert not other_worker.is_revoked(payload["jti"])
+
+    assert other_worker.sync(Database(integration_db_session)) == 1
+    assert other_worker.is_revoked(payload["jti"])
+    assert other_worker.stats() == {"size": 1, "rejected": 1, "syncs": 2}
+
+
+def test_logout_without_jti_is_not_revoked(integration_db_session):
+    """Test that tokens issued before they carried an id are left alone."""
+    user = create_user(integration_db_session)
+    payload = {"sub": user["id"], "exp": 2_000_000_000}
+
+    assert not AuthService.logout(payload, integration_db_session)
+    assert Database(integration_db_session).get_revoked_tokens() == []
+
+
+def test_expired_revocations_are_purged(integration_db_session):
+    """Test that revocations are forgotten once their token has expired."""
+    user = create_user(integration_db_session)
+    database = Database(integration_db_session)
+    now = datetime.now(UTC)
+    database.revoke_token("expired", user["id"], now - timedelta(minutes=1))
+    database.revoke_token("live", user["id"], now + timedelta(hours=1))
+
+    revocations = TokenRevocationList()
+    revocations.sync(database)
+    assert revocations.is_revoked("live")
+    assert not revocations.is_revoked("expired")
+
+    assert revocations.purge(now=(now + timedelta(hours=2)).timestamp()) == 1
+    assert len(revocations) == 0
+
+    assert database.purge_expired_revoked_tokens() == 1
+    assert [row["jti"] for row in database.get_revoked_tokens()] == ["live"]
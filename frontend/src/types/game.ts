@@ -56,8 +56,11 @@ export interface AuthResponse {
 
 export interface ScoreResponse {
   message: string;
+  scoreId?: number | null;
   isNewHighScore: boolean;
-  rank: number;
+  // null while rankPending; fetch it later from /game/score/{scoreId}/rank
+  rank: number | null;
+  rankPending?: boolean;
 }
 
 export interface LeaderboardResponse {